@@ -8,8 +8,10 @@ from alembic import context
 from app.config import settings
 from app.database import Base
 from app.models.status import Status  # noqa: F401 (autogenerate用にimport)
-from app.models.task import Task  # noqa: F401 (autogenerate用にimport)
+from app.models.task import TRIGRAM_INDEXES, Task  # noqa: F401 (autogenerate用にimport)
+from app.models.task_deletion import TaskDeletion  # noqa: F401 (autogenerate用にimport)
 from app.models.user import User  # noqa: F401 (autogenerate用にimport)
+from app.models.user_data_version import UserDataVersion  # noqa: F401 (autogenerate用にimport)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -26,6 +28,14 @@ if config.config_file_name is not None:
 # autogenerate用にモデルのMetaDataを設定
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    """マイグレーションでのみ管理するインデックスを autogenerate の比較対象から除外する"""
+    if type_ == "index" and reflected and name in TRIGRAM_INDEXES:
+        return False
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -48,6 +58,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -71,7 +82,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
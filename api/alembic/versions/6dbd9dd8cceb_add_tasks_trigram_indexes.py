@@ -0,0 +1,40 @@
+"""add_tasks_trigram_indexes
+
+Revision ID: 6dbd9dd8cceb
+Revises: 9e33a355f3af
+Create Date: 2026-10-17 21:21:07.286882
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6dbd9dd8cceb'
+down_revision: Union[str, Sequence[str], None] = '9e33a355f3af'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 日本語タイトルでも部分一致検索（LIKE '%q%'）にインデックスを効かせるため、
+    # 形態素解析に依存しない pg_trgm の GIN インデックスを使う
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_tasks_title_trgm', 'tasks', ['title'], unique=False,
+        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_tasks_content_trgm', 'tasks', ['content'], unique=False,
+        postgresql_using='gin', postgresql_ops={'content': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_content_trgm', table_name='tasks')
+    op.drop_index('ix_tasks_title_trgm', table_name='tasks')
+    # pg_trgm は他のオブジェクトが依存している可能性があるため削除しない
@@ -0,0 +1,95 @@
+"""add change notification triggers
+
+Revision ID: 8e2f4b6c1d93
+Revises: c41e7d9a2b58
+Create Date: 2026-10-18 14:03:27.512907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2f4b6c1d93'
+down_revision: Union[str, Sequence[str], None] = 'c41e7d9a2b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EVENT_PAYLOAD_FUNCTION = """
+CREATE OR REPLACE FUNCTION app_event_payload(user_id integer, entity text, action text, ids integer[])
+RETURNS text LANGUAGE sql IMMUTABLE AS $$
+    SELECT json_build_object(
+        'user_id', user_id,
+        'entity', entity,
+        'action', action,
+        'ids', CASE WHEN cardinality(ids) > 500 THEN NULL ELSE to_json(ids) END
+    )::text
+$$
+"""
+NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_app_events() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF current_setting('app.events_enabled', true) = 'off' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'INSERT' THEN
+        PERFORM pg_notify('app_events', app_event_payload(user_id, TG_ARGV[0], 'created', array_agg(id ORDER BY id)))
+        FROM new_rows GROUP BY user_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('app_events', app_event_payload(user_id, TG_ARGV[0], 'deleted', array_agg(id ORDER BY id)))
+        FROM old_rows GROUP BY user_id;
+    ELSIF TG_TABLE_NAME = 'tasks' THEN
+        PERFORM pg_notify('app_events', app_event_payload(n.user_id, TG_ARGV[0], changed.action, array_agg(n.id ORDER BY n.id)))
+        FROM old_rows AS o
+        JOIN new_rows AS n ON n.id = o.id
+        CROSS JOIN LATERAL (
+            SELECT CASE
+                WHEN (o.title, o.content, o.due_date) IS NOT DISTINCT FROM (n.title, n.content, n.due_date)
+                THEN 'moved' ELSE 'updated'
+            END AS action
+        ) AS changed
+        GROUP BY n.user_id, changed.action;
+    ELSE
+        PERFORM pg_notify('app_events', app_event_payload(n.user_id, TG_ARGV[0], changed.action, array_agg(n.id ORDER BY n.id)))
+        FROM old_rows AS o
+        JOIN new_rows AS n ON n.id = o.id
+        CROSS JOIN LATERAL (
+            SELECT CASE
+                WHEN (o.name, o.color) IS NOT DISTINCT FROM (n.name, n.color) THEN 'reordered' ELSE 'updated'
+            END AS action
+        ) AS changed
+        GROUP BY n.user_id, changed.action;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+ENTITIES = {'tasks': 'task', 'statuses': 'status'}
+TRANSITIONS = {
+    'INSERT': 'NEW TABLE AS new_rows',
+    'UPDATE': 'OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'DELETE': 'OLD TABLE AS old_rows',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 変更通知（NOTIFY）を、tasks / statuses への書き込みと同じトランザクションでトリガーから送る
+    op.execute(EVENT_PAYLOAD_FUNCTION)
+    op.execute(NOTIFY_FUNCTION)
+    for table, entity in ENTITIES.items():
+        for operation, transition in TRANSITIONS.items():
+            op.execute(
+                f"CREATE TRIGGER {table}_notify_{operation.lower()} AFTER {operation} ON {table} "
+                f"REFERENCING {transition} FOR EACH STATEMENT EXECUTE FUNCTION notify_app_events('{entity}')"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ENTITIES:
+        for operation in TRANSITIONS:
+            op.execute(f"DROP TRIGGER {table}_notify_{operation.lower()} ON {table}")
+    op.execute("DROP FUNCTION notify_app_events()")
+    op.execute("DROP FUNCTION app_event_payload(integer, text, text, integer[])")
@@ -0,0 +1,77 @@
+"""add user_data_versions table and version triggers
+
+Revision ID: c41e7d9a2b58
+Revises: 5df53bb68cc8
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e7d9a2b58'
+down_revision: Union[str, Sequence[str], None] = '5df53bb68cc8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BUMP_VERSIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_user_data_versions() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    user_ids integer[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT user_id) INTO user_ids FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(DISTINCT user_id) INTO user_ids FROM old_rows;
+    ELSE
+        SELECT array_agg(DISTINCT user_id) INTO user_ids
+        FROM (SELECT user_id FROM old_rows UNION ALL SELECT user_id FROM new_rows) AS changed;
+    END IF;
+    IF user_ids IS NOT NULL THEN
+        INSERT INTO user_data_versions AS v (user_id, tasks_version, statuses_version)
+        SELECT changed.user_id, (TG_TABLE_NAME = 'tasks')::int, (TG_TABLE_NAME = 'statuses')::int
+        FROM unnest(user_ids) AS changed(user_id)
+        ON CONFLICT (user_id) DO UPDATE SET
+            tasks_version = v.tasks_version + excluded.tasks_version,
+            statuses_version = v.statuses_version + excluded.statuses_version;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+TRANSITIONS = {
+    'INSERT': 'NEW TABLE AS new_rows',
+    'UPDATE': 'OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'DELETE': 'OLD TABLE AS old_rows',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_data_versions',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('tasks_version', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('statuses_version', sa.BigInteger(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # 一覧の ETag 用の変更回数を、tasks / statuses への書き込みと同じトランザクションで加算する
+    op.execute(BUMP_VERSIONS_FUNCTION)
+    for table in ('tasks', 'statuses'):
+        for operation, transition in TRANSITIONS.items():
+            op.execute(
+                f"CREATE TRIGGER {table}_bump_version_{operation.lower()} AFTER {operation} ON {table} "
+                f"REFERENCING {transition} FOR EACH STATEMENT EXECUTE FUNCTION bump_user_data_versions()"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('tasks', 'statuses'):
+        for operation in TRANSITIONS:
+            op.execute(f"DROP TRIGGER {table}_bump_version_{operation.lower()} ON {table}")
+    op.execute("DROP FUNCTION bump_user_data_versions()")
+    op.drop_table('user_data_versions')
@@ -1,5 +1,13 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
 from enum import StrEnum
+from typing import TypeVar
 
 import jwt
 from fastapi import Depends, HTTPException, status
@@ -8,9 +16,12 @@ from fastapi.security import OAuth2PasswordBearer
 from pwdlib import PasswordHash
 from pwdlib.hashers.bcrypt import BcryptHasher
 
+from app.cache import TTLCache
 from app.config import settings
 
-pwd_context = PasswordHash((BcryptHasher(),))
+T = TypeVar("T")
+
+pwd_context = PasswordHash((BcryptHasher(rounds=settings.bcrypt_rounds),))
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
@@ -21,12 +32,14 @@ class TokenType(StrEnum):
     ACCESS = "access"
     REFRESH = "refresh"
     PASSWORD_RESET = "password_reset"
+    EVENTS_TICKET = "events_ticket"
 
 ACCESS_TOKEN_EXPIRES = timedelta(minutes=settings.access_token_expire_minutes)
 REFRESH_TOKEN_EXPIRES = timedelta(days=settings.refresh_token_expire_days)
 PASSWORD_RESET_TOKEN_EXPIRES = timedelta(
     minutes=settings.password_reset_token_expire_minutes
 )
+EVENTS_TICKET_EXPIRES = timedelta(seconds=settings.events_ticket_expire_seconds)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -37,6 +50,73 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """パスワードを検証し、コスト等が現在の設定と異なる場合は再計算したハッシュも返す"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHashPool:
+    """bcrypt の計算を専用のプロセスプールで実行する
+
+    計算中はイベントループや共有スレッドプールを占有しない。同時計算数は
+    max_concurrency で制限し、超過分は待ち行列（waiting）に積まれる。
+    """
+
+    def __init__(self, workers: int, max_concurrency: int) -> None:
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self._executor: ProcessPoolExecutor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        return await self._run(verify_and_update_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._semaphore = None
+
+
+_password_hash_workers = settings.password_hash_workers or os.cpu_count() or 1
+password_hash_pool = PasswordHashPool(
+    workers=_password_hash_workers,
+    max_concurrency=settings.password_hash_max_concurrency or _password_hash_workers,
+)
+
+
 def create_token(
     user_id: int,
     token_type: TokenType,
@@ -47,21 +127,44 @@ def create_token(
     return jwt.encode(payload, settings.secret_key, algorithm=ALGORITHM)
 
 
-def verify_token(token: str, expected_type: TokenType) -> int:
-    credentials_exception = HTTPException(
+# 検証済みアクセストークン（トークンの SHA-256 → ユーザーID）。有効期限（exp）まで保持する
+access_token_cache: TTLCache[bytes, int] = TTLCache(
+    maxsize=settings.access_token_cache_max_entries,
+    ttl=ACCESS_TOKEN_EXPIRES.total_seconds(),
+)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid token",
     )
+
+
+def verify_token(token: str, expected_type: TokenType) -> int:
+    # アクセストークンは一度検証したものを再検証しない（署名検証を省略）
+    cache_key = None
+    if expected_type == TokenType.ACCESS and access_token_cache.maxsize > 0:
+        cache_key = hashlib.sha256(token.encode()).digest()
+        cached_user_id = access_token_cache.get(cache_key)
+        if cached_user_id is not None:
+            return cached_user_id
+
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[ALGORITHM])
-        if payload.get("type") != expected_type:
-            raise credentials_exception
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-        return int(user_id)
     except jwt.InvalidTokenError:
-        raise credentials_exception
+        raise _credentials_exception()
+    if payload.get("type") != expected_type:
+        raise _credentials_exception()
+    user_id = payload.get("sub")
+    if user_id is None:
+        raise _credentials_exception()
+    user_id = int(user_id)
+
+    expires_at = payload.get("exp")
+    if cache_key is not None and expires_at is not None:
+        access_token_cache.set(cache_key, user_id, ttl=expires_at - time.time())
+    return user_id
 
 
 def set_refresh_cookie(response: Response, token: str) -> None:
@@ -85,9 +188,16 @@ def clear_refresh_cookie(response: Response) -> None:
     )
 
 
-def get_current_user_id(
+async def get_current_user_id(
     token: str = Depends(oauth2_scheme),
 ) -> int:
     return verify_token(token, TokenType.ACCESS)
 
 
+async def require_admin(user_id: int = Depends(get_current_user_id)) -> int:
+    """DEBUG_ADMIN_USER_IDS に含まれるユーザーのみ許可する（/debug と /metrics/* の運用向け API）"""
+    if user_id not in settings.debug_admin_user_id_set:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return user_id
+
+
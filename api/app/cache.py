@@ -0,0 +1,277 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, Generic, Hashable, ParamSpec, Protocol, TypeVar
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.schemas.auth import UserResponse
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class TTLCache(Generic[K, V]):
+    """TTL 付きの LRU キャッシュ（プロセス内・スレッドセーフ）"""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> V | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: K) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class CacheBackend(Protocol):
+    # True の場合、呼び出しがI/Oで待つため UserCache はスレッドプールで実行する
+    blocking: bool
+
+    def get(self, key: str) -> tuple[str | None, int]: ...
+    def set(self, key: str, value: str, ttl: int, generation: int) -> None: ...
+    def invalidate(self, key: str) -> None: ...
+    def clear(self) -> None: ...
+
+
+class LocalCacheBackend:
+    """プロセス内キャッシュ（ワーカー間では共有されない）"""
+
+    blocking = False
+
+    def __init__(self, maxsize: int) -> None:
+        self._cache: TTLCache[str, str] = TTLCache(maxsize=maxsize, ttl=0)
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[str | None, int]:
+        """値と世代（無効化の回数）"""
+        with self._lock:
+            return self._cache.get(key), self._generations.get(key, 0)
+
+    def set(self, key: str, value: str, ttl: int, generation: int) -> None:
+        """世代が generation から変わっていない（取得後に無効化されていない）場合のみ保存する"""
+        with self._lock:
+            if self._generations.get(key, 0) == generation:
+                self._cache.set(key, value, ttl=ttl)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._cache.delete(key)
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._generations.clear()
+
+
+# 世代が一致する場合のみ保存する（KEYS: 値, 世代 / ARGV: 値, 世代, TTL）
+_REDIS_SET_IF_GENERATION = """
+if tonumber(redis.call('get', KEYS[2]) or '0') == tonumber(ARGV[2]) then
+    redis.call('set', KEYS[1], ARGV[1], 'EX', ARGV[3])
+end
+"""
+
+
+class RedisCacheBackend:
+    """Redis を使った共有キャッシュ（複数ワーカー間で無効化が反映される）"""
+
+    blocking = True
+
+    def __init__(self, url: str, prefix: str) -> None:
+        # redis はオプション依存のため、使用する場合のみ import する
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+        self._set_if_generation = self._client.register_script(_REDIS_SET_IF_GENERATION)
+
+    def _keys(self, key: str) -> list[str]:
+        return [self._prefix + key, f"{self._prefix}generation:{key}"]
+
+    def get(self, key: str) -> tuple[str | None, int]:
+        value, generation = self._client.mget(self._keys(key))
+        return (value.decode() if value is not None else None), int(generation or 0)
+
+    def set(self, key: str, value: str, ttl: int, generation: int) -> None:
+        self._set_if_generation(keys=self._keys(key), args=[value, generation, ttl])
+
+    def invalidate(self, key: str) -> None:
+        value_key, generation_key = self._keys(key)
+        pipeline = self._client.pipeline()
+        pipeline.incr(generation_key)
+        pipeline.delete(value_key)
+        pipeline.execute()
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=self._prefix + "*"):
+            self._client.delete(key)
+
+
+class UserCache:
+    """/auth/me 用のユーザー情報キャッシュ（ユーザーIDをキーに UserResponse を保持）
+
+    キャッシュミス時に取得した世代を set に渡し、DB から読む間に無効化された場合は保存しない
+    （更新前の値が TTL の間残らないようにする）。
+    バックエンドのエラー（Redis の障害等）はキャッシュミスとして扱い、DB から取得させる。
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    async def _call(self, fn: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        if self.backend.blocking:
+            return await run_in_threadpool(fn, *args, **kwargs)
+        return fn(*args, **kwargs)
+
+    def _error(self, action: str) -> None:
+        self.errors += 1
+        logger.warning("User cache %s failed", action, exc_info=True)
+
+    async def get(self, user_id: int) -> tuple[UserResponse | None, int | None]:
+        """キャッシュしたユーザー情報と、set に渡す世代（エラー時は世代も None）"""
+        if not self.enabled:
+            return None, None
+        try:
+            value, generation = await self._call(self.backend.get, str(user_id))
+        except Exception:
+            self._error("get")
+            return None, None
+        if value is None:
+            self.misses += 1
+            return None, generation
+        self.hits += 1
+        return UserResponse.model_validate_json(value), generation
+
+    async def set(self, user: UserResponse, generation: int | None) -> None:
+        if not self.enabled or generation is None:
+            return
+        try:
+            await self._call(self.backend.set, str(user.id), user.model_dump_json(), self.ttl, generation)
+        except Exception:
+            self._error("set")
+
+    async def invalidate(self, user_id: int) -> None:
+        """ユーザー情報の更新後（コミット後）にルーターから呼ぶ
+
+        DB_ASYNC=true では CRUD 関数がイベントループ上で実行されるため、CRUD 関数からは呼ばない。
+        """
+        if not self.enabled:
+            return
+        try:
+            await self._call(self.backend.invalidate, str(user_id))
+        except Exception:
+            self._error("invalidate")
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+class TaskStatsCache:
+    """GET /tasks/stats の集計結果キャッシュ（プロセス内）
+
+    タスクの書き込み時にユーザー単位で世代を進めて無効化する。ワーカー間では共有されないため、
+    他のワーカーでの書き込みは最大 TTL 秒遅れて反映される。
+    """
+
+    def __init__(self, maxsize: int, ttl: int) -> None:
+        self.ttl = ttl
+        self._cache: TTLCache[tuple, Any] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    def key(self, user_id: int, *params: Hashable) -> tuple:
+        """キャッシュキー（集計の前に取得すること。集計中に無効化された結果は使われない）"""
+        return (user_id, self._generations.get(user_id, 0), *params)
+
+    def get(self, key: tuple) -> Any | None:
+        if not self.enabled:
+            return None
+        return self._cache.get(key)
+
+    def set(self, key: tuple, value: Any) -> None:
+        if self.enabled:
+            self._cache.set(key, value)
+
+    def invalidate(self, user_id: int) -> None:
+        if self.enabled:
+            with self._lock:
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def clear(self) -> None:
+        self._cache.clear()
+        with self._lock:
+            self._generations.clear()
+
+
+def _create_user_cache() -> UserCache:
+    if settings.user_cache_redis_url:
+        backend = RedisCacheBackend(settings.user_cache_redis_url, prefix="user:")
+    else:
+        backend = LocalCacheBackend(maxsize=settings.user_cache_max_entries)
+    return UserCache(backend, ttl=settings.user_cache_ttl_seconds)
+
+
+user_cache = _create_user_cache()
+task_stats_cache = TaskStatsCache(
+    maxsize=settings.task_stats_cache_max_entries, ttl=settings.task_stats_cache_ttl_seconds
+)
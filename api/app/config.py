@@ -1,25 +1,120 @@
 from functools import lru_cache
+from typing import Literal
 
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     database_url: str
+    # True の場合 asyncpg + AsyncSession でDBにアクセスする（移行期間中は False で同期ドライバ）
+    db_async: bool = False
+    # コネクションプール設定（SQLAlchemy の create_engine 引数）
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800  # 秒（-1 で無効）
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 0  # 0 で無効
+    # PgBouncer（transaction モード）経由で接続する場合は True（プリペアドステートメントを無効化）
+    db_pgbouncer: bool = False
+    # DB への接続数の上限（全ワーカーの合計。python -m app.server で使用し、ワーカー数より小さい場合は起動しない。
+    # 0 の場合はワーカーごとに db_pool_size + db_max_overflow まで）
+    db_max_connections: int = 0
     cors_origins: str
+    # デフォルトのレスポンスクラス（orjson は extras の orjson が必要）
+    json_response_class: Literal["json", "orjson"] = "json"
     secret_key: str
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 7
+    # 検証済みアクセストークンのキャッシュ件数（0 で無効）
+    access_token_cache_max_entries: int = 10000
     cookie_secure: bool = False
     smtp_host: str = "mailpit"
     smtp_port: int = 1025
     smtp_from: str = "noreply@example.com"
     frontend_url: str = "http://localhost:3000"
     password_reset_token_expire_minutes: int = 60
+    # bcrypt のコスト（変更するとログイン時に既存ハッシュを再計算する）
+    bcrypt_rounds: int = 12
+    # パスワードハッシュ計算用プロセスプール（0 の場合 CPU コア数）
+    password_hash_workers: int = 0
+    # 同時に計算するハッシュ数の上限（0 の場合 password_hash_workers と同数）
+    password_hash_max_concurrency: int = 0
+    # /auth/me のユーザー情報キャッシュ（TTL 0 で無効。Redis URL 指定時はワーカー間で共有）
+    user_cache_ttl_seconds: int = 60
+    user_cache_max_entries: int = 10000
+    user_cache_redis_url: str | None = None
+    # 差分同期用の削除記録の保持期間（これより古い同期トークンは全件再取得が必要）
+    task_deletion_retention_days: int = 30
+    # GET /tasks/stats の集計結果キャッシュ（TTL 0 で無効。タスクの書き込み時に無効化）
+    task_stats_cache_ttl_seconds: int = 10
+    task_stats_cache_max_entries: int = 10000
+    # ルートごとのリクエスト数・レイテンシを記録し GET /metrics（Prometheus 形式）で公開する
+    http_metrics_enabled: bool = True
+    # API のポートの GET /metrics に必要な Bearer トークン（空の場合は metrics_port からのみ取得できる）
+    metrics_token: str = ""
+    # リクエストごとのクエリ数・DB時間を Server-Timing ヘッダーとログ（app.query_stats）に出力する
+    query_stats_enabled: bool = True
+    # DB時間の合計がこれ以上のリクエストは WARNING でログに出す（0 で無効）
+    query_stats_slow_ms: float = 500
+    # サンプリングプロファイラ（GET /debug/profile）。有効時は profiler_sample_rate の割合のリクエストを計測する。
+    # 起動時の設定で、PUT /debug/profiler で再起動せずに切り替えられる
+    profiler_enabled: bool = False
+    profiler_sample_rate: float = 0.01
+    # 計測するルート（カンマ区切り。例: /tasks,/tasks/{task_id}）。空の場合は全ルート
+    profiler_routes: str = ""
+    profiler_interval_ms: float = 5
+    profiler_max_stacks: int = 10000  # ルートごとのスタックの種類数の上限
+    # /debug と /metrics/*（JSON）の API を使えるユーザーID（カンマ区切り）
+    debug_admin_user_ids: str = ""
+    # GET /events（SSE）。変更通知は LISTEN/NOTIFY でワーカー間に配信する
+    events_enabled: bool = True
+    # LISTEN 用の接続先（PgBouncer 経由の場合は直接接続のURLを指定。未指定時は database_url）
+    events_database_url: str | None = None
+    events_queue_size: int = 100  # 接続ごとに溜められるイベント数（超えたら resync を送る）
+    events_heartbeat_seconds: float = 15.0
+    events_max_connections: int = 1000  # ワーカーごとの SSE 接続数の上限
+    # GET /events のクエリパラメータに付けるチケット（POST /events/ticket）の有効期限（接続時のみ検証）
+    events_ticket_expire_seconds: int = 60
+
+    # 本番用の起動スクリプト（python -m app.server）
+    web_concurrency: int = 0  # ワーカー数（0 の場合は利用可能な CPU 数）
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    graceful_timeout: float = 30  # 終了時に処理中のリクエスト（SSE を含む）の完了を待つ秒数
+    max_requests: int = 0  # この件数を処理したワーカーを入れ替える（0 で無効）
+    max_requests_jitter: int = 0  # ワーカーごとに max_requests に加える乱数の上限
+    # 0 以外の場合、ワーカーごとに metrics_port + ワーカー番号 で GET /metrics を公開する
+    metrics_port: int = 0
+
+    @field_validator("debug_admin_user_ids")
+    @classmethod
+    def check_debug_admin_user_ids(cls, value: str) -> str:
+        # 不正な値は起動時にエラーにする（リクエストごとの変換で 500 にしない）
+        for user_id in value.split(","):
+            if user_id.strip() and not user_id.strip().isdigit():
+                raise ValueError(f"DEBUG_ADMIN_USER_IDS must be comma-separated user IDs: {user_id.strip()!r}")
+        return value
+
+    @property
+    def async_database_url(self) -> str:
+        """database_url のドライバを asyncpg に置き換えたURL"""
+        scheme, _, rest = self.database_url.partition("://")
+        return f"{scheme.split('+')[0]}+asyncpg://{rest}"
 
     @property
     def cors_origins_list(self) -> list[str]:
         return [origin.strip() for origin in self.cors_origins.split(",")]
 
+    @property
+    def profiler_routes_set(self) -> set[str]:
+        return {route.strip() for route in self.profiler_routes.split(",") if route.strip()}
+
+    @property
+    def debug_admin_user_id_set(self) -> set[int]:
+        return {int(user_id) for user_id in self.debug_admin_user_ids.split(",") if user_id.strip()}
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -1,10 +1,29 @@
-from sqlalchemy import asc, func, select
-from sqlalchemy.orm import Session
+from collections.abc import Collection
 
+from sqlalchemy import Integer, asc, column, delete, exists, func, select, update, values
+from sqlalchemy.orm import Session, aliased
+
+from app.cache import task_stats_cache
 from app.models.status import Status
 from app.models.task import Task
+from app.models.user_data_version import UserDataVersion
 from app.schemas.status import StatusCreate, StatusUpdate
 
+# 並び順の間隔。間に挿入する余地を残し、1件の移動で他の行を振り直さずに済むようにする
+ORDER_GAP = 1024
+
+
+class StatusNotFoundError(Exception):
+    """削除対象（または付け替え先）のステータスが存在しない（または他ユーザーのもの）"""
+
+    def __init__(self, status_id: int) -> None:
+        self.status_id = status_id
+        super().__init__(f"Status not found: {status_id}")
+
+
+class StatusInUseError(Exception):
+    """ステータスに紐付くタスクが存在するため削除できない"""
+
 
 def get_statuses(db: Session, user_id: int) -> list[Status]:
     return (
@@ -17,12 +36,31 @@ def get_statuses(db: Session, user_id: int) -> list[Status]:
     )
 
 
+def get_statuses_version(db: Session, user_id: int) -> int:
+    """ユーザーのステータス全体のバージョン（変更回数）を取得する（ETag 用）"""
+    version = db.scalar(
+        select(UserDataVersion.statuses_version).where(UserDataVersion.user_id == user_id)
+    )
+    return version or 0
+
+
 def get_status(db: Session, status_id: int, user_id: int) -> Status | None:
     return db.scalars(
         select(Status).where(Status.id == status_id, Status.user_id == user_id)
     ).first()
 
 
+def get_owned_status_ids(db: Session, status_ids: Collection[int], user_id: int) -> set[int]:
+    """指定したIDのうち、ユーザーが所有するステータスのIDを1クエリで取得"""
+    if not status_ids:
+        return set()
+    return set(
+        db.scalars(
+            select(Status.id).where(Status.id.in_(status_ids), Status.user_id == user_id)
+        )
+    )
+
+
 def create_status(db: Session, status_data: StatusCreate, user_id: int) -> Status:
     max_order = (
         db.scalar(
@@ -30,10 +68,9 @@ def create_status(db: Session, status_data: StatusCreate, user_id: int) -> Statu
         )
         or 0
     )
-    status = Status(**status_data.model_dump(), order=max_order + 1, user_id=user_id)
+    status = Status(**status_data.model_dump(), order=max_order + ORDER_GAP, user_id=user_id)
     db.add(status)
     db.commit()
-    db.refresh(status)
     return status
 
 
@@ -41,28 +78,149 @@ def update_status(db: Session, status: Status, status_data: StatusUpdate) -> Sta
     for key, value in status_data.model_dump().items():
         setattr(status, key, value)
     db.commit()
-    db.refresh(status)
     return status
 
 
-def reorder_statuses(db: Session, status_ids: list[int], user_id: int) -> list[Status]:
-    for new_order, status_id in enumerate(status_ids, start=1):
-        status = db.scalars(
-            select(Status).where(Status.id == status_id, Status.user_id == user_id)
-        ).first()
-        if status:
-            status.order = new_order
+def reorder_statuses(db: Session, status_ids: list[int], user_id: int) -> list[Status] | None:
+    """並び順を UPDATE ... FROM (VALUES ...) RETURNING の1文で更新する
+
+    status_ids がユーザーの全ステータスIDと一致しない場合は何も更新せず None を返す。
+    status_ids に重複がないことは呼び出し側で保証する。
+    """
+    positions = (
+        values(column("id", Integer), column("position", Integer), name="positions")
+        .data([(status_id, i) for i, status_id in enumerate(status_ids, start=1)])
+        .cte("positions")
+    )
+    total = (
+        select(func.count()).select_from(Status).where(Status.user_id == user_id)
+    ).scalar_subquery()
+    matched = (
+        select(func.count())
+        .select_from(Status)
+        .join(positions, Status.id == positions.c.id)
+        .where(Status.user_id == user_id)
+    ).scalar_subquery()
+    stmt = (
+        update(Status)
+        .add_cte(positions)
+        .where(
+            Status.id == positions.c.id,
+            Status.user_id == user_id,
+            # 過不足なく全ステータスが指定された場合のみ更新する
+            total == len(status_ids),
+            matched == len(status_ids),
+        )
+        .values(order=positions.c.position * ORDER_GAP)
+        .returning(Status)
+        .execution_options(populate_existing=True)
+    )
+    statuses = sorted(db.scalars(stmt), key=lambda status: status.order)
+    if not statuses:
+        db.rollback()
+        return None
     db.commit()
-    return get_statuses(db, user_id)
+    return statuses
 
 
-def has_tasks_with_status(db: Session, status_id: int) -> bool:
-    return (
-        db.scalars(select(Task).where(Task.status_id == status_id)).first()
-        is not None
+def _rebalance_orders(db: Session, user_id: int) -> None:
+    """並び順の間隔を詰め切った場合に、全ステータスを ORDER_GAP 間隔で振り直す"""
+    ranked = (
+        select(
+            Status.id,
+            (func.row_number().over(order_by=(Status.order, Status.id)) * ORDER_GAP).label("new_order"),
+        )
+        .where(Status.user_id == user_id)
+        .subquery()
+    )
+    db.execute(
+        update(Status)
+        .where(Status.id == ranked.c.id)
+        .values(order=ranked.c.new_order)
+        .execution_options(synchronize_session="fetch")
+    )
+
+
+def _neighbor_orders(db: Session, status: Status, after: Status | None) -> tuple[int | None, int | None]:
+    """移動先の直前・直後のステータスの並び順を取得する"""
+    prev_order = after.order if after is not None else None
+    query = select(func.min(Status.order)).where(
+        Status.user_id == status.user_id, Status.id != status.id
     )
+    if prev_order is not None:
+        query = query.where(Status.order > prev_order)
+    return prev_order, db.scalar(query)
+
+
+def move_status(db: Session, status: Status, after: Status | None) -> Status:
+    """ステータスを after の直後（None の場合は先頭）へ移動する
+
+    前後の並び順の中間値を割り当てるため、通常は移動する1行だけを更新する。
+    """
+    prev_order, next_order = _neighbor_orders(db, status, after)
+    if prev_order is not None and next_order is not None and next_order - prev_order < 2:
+        _rebalance_orders(db, status.user_id)
+        prev_order, next_order = _neighbor_orders(db, status, after)
+
+    if prev_order is None and next_order is None:
+        new_order = ORDER_GAP
+    elif prev_order is None:
+        new_order = next_order - ORDER_GAP
+    elif next_order is None:
+        new_order = prev_order + ORDER_GAP
+    else:
+        new_order = (prev_order + next_order) // 2
+    status.order = new_order
+    db.commit()
+    return status
 
 
-def delete_status(db: Session, status: Status) -> None:
-    db.delete(status)
+def has_tasks_with_status(db: Session, status_id: int) -> bool:
+    return db.scalar(select(exists().where(Task.status_id == status_id)))
+
+
+def _owned(status_id: int, user_id: int):
+    """ユーザーが所有するステータスか（DELETE FROM statuses 内でも外側と相関しないよう別名を使う）"""
+    target = aliased(Status)
+    return exists().where(target.id == status_id, target.user_id == user_id)
+
+
+def delete_status(db: Session, status_id: int, user_id: int, reassign_to: int | None = None) -> None:
+    """ステータス削除（紐付くタスクがない場合のみ削除する1文の DELETE）
+
+    reassign_to を指定した場合は、先に紐付くタスクを1文の UPDATE でそのステータスへ付け替える。
+    削除できなかった場合はロールバックし、原因に応じて StatusNotFoundError / StatusInUseError を送出する。
+    """
+    moved: list[int] = []
+    if reassign_to is not None:
+        moved = list(
+            db.scalars(
+                update(Task)
+                .where(Task.status_id == status_id, Task.user_id == user_id, _owned(reassign_to, user_id))
+                .values(status_id=reassign_to)
+                .returning(Task.id)
+            )
+        )
+    stmt = (
+        delete(Status)
+        .where(
+            Status.id == status_id,
+            Status.user_id == user_id,
+            ~exists().where(Task.status_id == status_id),
+        )
+        .returning(Status.id)
+    )
+    if reassign_to is not None:
+        stmt = stmt.where(_owned(reassign_to, user_id))
+    if db.scalar(stmt) is None:
+        db.rollback()
+        # 失敗した場合のみ、原因を判定するために存在を確認する
+        if not db.scalar(select(_owned(status_id, user_id))):
+            raise StatusNotFoundError(status_id)
+        if reassign_to is not None and not db.scalar(select(_owned(reassign_to, user_id))):
+            raise StatusNotFoundError(reassign_to)
+        raise StatusInUseError
+
     db.commit()
+    if moved:
+        task_stats_cache.invalidate(user_id)
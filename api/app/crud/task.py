@@ -1,30 +1,231 @@
-from datetime import date
+from collections.abc import Collection, Iterable, Iterator
+from datetime import date, datetime, timedelta
+from typing import Any
 
-from sqlalchemy import asc, desc
+from pydantic import ValidationError
+from sqlalchemy import (
+    Date, Row, Select, asc, case, cast, column, delete, desc, func, insert, literal_column, select,
+    tuple_, update, values,
+)
 from sqlalchemy.orm import Session
 
+from app.cache import task_stats_cache
+from app.config import settings
+from app.models.status import Status
 from app.models.task import Task
-from app.schemas.task import TaskCreate, TaskUpdate
+from app.models.task_deletion import TaskDeletion
+from app.models.user_data_version import UserDataVersion
+from app.pagination import decode_cursor, encode_cursor
+from app.schemas.task import (
+    IMPORT_MAX_ERRORS,
+    TASK_FIELDS,
+    TaskBulkRequest,
+    TaskCreate,
+    TaskImportRow,
+    TaskUpdate,
+)
 
+# updated_at はトランザクション開始時刻のため、同期トークンより前に開始して後からコミットされた
+# 変更を取りこぼさないよう、この時間だけ遡って取得する（クライアントは ID で重複を除く）
+SYNC_OVERLAP = timedelta(seconds=5)
+# インポート時に1回の INSERT でまとめて登録する件数
+IMPORT_BATCH_SIZE = 1000
 
-def get_tasks(
-    db: Session,
+
+class TaskNotFoundError(Exception):
+    """一括操作の対象に存在しない（または他ユーザーの）タスクが含まれている"""
+
+    def __init__(self, task_ids: set[int]) -> None:
+        self.task_ids = sorted(task_ids)
+        super().__init__(f"Task not found: {self.task_ids}")
+
+
+class TaskModifiedError(Exception):
+    """条件付き更新の対象タスクが、確認後に他のリクエストで更新されていた"""
+
+
+class SyncTokenExpiredError(Exception):
+    """同期トークンが削除記録の保持期間より古く、差分を返せない"""
+
+
+def _relevance(keyword: str):
+    """キーワードとの関連度（タイトル一致を本文一致より重く、先頭に近い一致ほど高く評価）
+
+    一致位置による簡易的な順位付けで、pg_trgm の類似度（similarity）は使わない
+    （2文字以下のキーワードや、LC_CTYPE が C の DB での日本語はトライグラムにならず、類似度が 0 になるため）。
+    """
+    title_position = func.strpos(Task.title, keyword)
+    return case(
+        (Task.title == keyword, 4),
+        (title_position == 1, 3),
+        (title_position > 0, 2),
+        else_=0,
+    ) + case((func.strpos(Task.content, keyword) > 0, 1), else_=0)
+
+
+def _task_columns(fields: Collection[str] | None = None) -> list:
+    """一覧で取得するカラム（fields を指定した場合はその項目と ID のみ）"""
+    names = [name for name in TASK_FIELDS if fields is None or name == "id" or name in fields]
+    return [getattr(Task, name) for name in names]
+
+
+def _build_tasks_query(
     user_id: int,
     order: str = "desc",
     keyword: str | None = None,
     due_date_from: date | None = None,
     due_date_to: date | None = None,
-) -> list[Task]:
-    """タスク一覧取得（締切日でソート）"""
+    sort: str = "due_date",
+    fields: Collection[str] | None = None,
+) -> Select:
+    """タスク一覧の検索条件・並び順を組み立てる（締切日 → ID の順でソート）
+
+    sort="relevance" かつキーワード指定時は関連度の高い順を優先する。
+    一覧はレスポンスに変換するだけのため、ORM インスタンスではなく必要なカラムだけを行として取得する
+    （識別マップへの登録や変更追跡のコストがかからない）。
+    """
     order_func = desc if order == "desc" else asc
-    query = db.query(Task).filter(Task.user_id == user_id)
+    query = select(*_task_columns(fields)).where(Task.user_id == user_id)
     if keyword:
-        query = query.filter(Task.title.contains(keyword) | Task.content.contains(keyword))
+        # pg_trgm の GIN インデックス（ix_tasks_*_trgm）で部分一致検索を高速化している。
+        # トライグラムを作れない2文字以下のキーワード（LC_CTYPE が C の DB では日本語も）にはインデックスが効かず、
+        # ユーザーのタスク（ix_tasks_user_id_due_date_id で絞った行）を順に照合する
+        query = query.where(Task.title.contains(keyword) | Task.content.contains(keyword))
+        if sort == "relevance":
+            query = query.order_by(desc(_relevance(keyword)))
     if due_date_from:
-        query = query.filter(Task.due_date >= due_date_from)
+        query = query.where(Task.due_date >= due_date_from)
     if due_date_to:
-        query = query.filter(Task.due_date <= due_date_to)
-    return query.order_by(order_func(Task.due_date)).all()
+        query = query.where(Task.due_date <= due_date_to)
+    return query.order_by(order_func(Task.due_date), order_func(Task.id))
+
+
+def get_tasks(
+    db: Session,
+    user_id: int,
+    order: str = "desc",
+    keyword: str | None = None,
+    due_date_from: date | None = None,
+    due_date_to: date | None = None,
+    sort: str = "due_date",
+    fields: Collection[str] | None = None,
+) -> list[Row]:
+    """タスク一覧取得（締切日でソート）
+
+    TaskResponse の項目（fields を指定した場合はその項目と ID）を持つ行を返す。
+    """
+    query = _build_tasks_query(user_id, order, keyword, due_date_from, due_date_to, sort, fields)
+    return list(db.execute(query).all())
+
+
+def get_tasks_page(
+    db: Session,
+    user_id: int,
+    limit: int,
+    cursor: str | None = None,
+    order: str = "desc",
+    keyword: str | None = None,
+    due_date_from: date | None = None,
+    due_date_to: date | None = None,
+    fields: Collection[str] | None = None,
+) -> tuple[list[Row], str | None]:
+    """タスク一覧をカーソル（締切日, ID）でページ単位に取得する
+
+    不正なカーソルの場合は ValueError を送出する。
+    """
+    if fields is not None:
+        # 次ページのカーソル生成に締切日が必要
+        fields = {*fields, "due_date"}
+    query = _build_tasks_query(
+        user_id, order, keyword, due_date_from, due_date_to, fields=fields
+    )
+    if cursor:
+        try:
+            cursor_due_date, cursor_id = decode_cursor(cursor)
+            position = (date.fromisoformat(cursor_due_date), int(cursor_id))
+        except (TypeError, ValueError) as e:
+            raise ValueError("Invalid cursor") from e
+        key = tuple_(Task.due_date, Task.id)
+        query = query.where(key < position if order == "desc" else key > position)
+
+    # 1件多く取得して次ページの有無を判定する
+    tasks = db.execute(query.limit(limit + 1)).all()
+    if len(tasks) <= limit:
+        return list(tasks), None
+    tasks = tasks[:limit]
+    last = tasks[-1]
+    return list(tasks), encode_cursor([last.due_date.isoformat(), last.id])
+
+
+def build_export_query(
+    user_id: int,
+    keyword: str | None = None,
+    due_date_from: date | None = None,
+    due_date_to: date | None = None,
+) -> Select:
+    """エクスポート用のクエリ（締切日 → ID の昇順。ステータス名を status として含む）"""
+    return (
+        _build_tasks_query(user_id, "asc", keyword, due_date_from, due_date_to)
+        # ステータスもユーザーで絞り、全ステータスとの結合にならないようにする
+        .join(Status, (Status.id == Task.status_id) & (Status.user_id == user_id))
+        .add_columns(Status.name.label("status"))
+    )
+
+
+def get_tasks_version(db: Session, user_id: int) -> int:
+    """ユーザーのタスク全体のバージョン（変更回数）を取得する（ETag 用）"""
+    version = db.scalar(select(UserDataVersion.tasks_version).where(UserDataVersion.user_id == user_id))
+    return version or 0
+
+
+def get_task_stats(
+    db: Session,
+    user_id: int,
+    today: date,
+    interval: str = "week",
+    due_date_from: date | None = None,
+    due_date_to: date | None = None,
+) -> dict[str, Any]:
+    """ステータスごとの件数・期限切れ件数・締切日ヒストグラムを集計する
+
+    どちらの集計も (user_id, due_date) のインデックスで対象を絞り、GROUP BY で集計する。
+    """
+    conditions = [Task.user_id == user_id]
+    if due_date_from:
+        conditions.append(Task.due_date >= due_date_from)
+    if due_date_to:
+        conditions.append(Task.due_date <= due_date_to)
+
+    by_status = db.execute(
+        select(
+            Task.status_id,
+            func.count().label("count"),
+            func.count().filter(Task.due_date < today).label("overdue"),
+        )
+        .where(*conditions)
+        .group_by(Task.status_id)
+        .order_by(Task.status_id)
+    ).all()
+
+    if interval == "day":
+        bucket = Task.due_date.label("start")
+    else:
+        # 集計単位は列挙値のため、GROUP BY と同じ式になるようリテラルで埋め込む
+        bucket = cast(func.date_trunc(literal_column(f"'{interval}'"), Task.due_date), Date).label("start")
+    histogram = db.execute(
+        select(bucket, func.count().label("count"))
+        .where(*conditions)
+        .group_by(bucket)
+        .order_by(bucket)
+    ).all()
+
+    return {
+        "total": sum(row.count for row in by_status),
+        "overdue": sum(row.overdue for row in by_status),
+        "by_status": [{"status_id": row.status_id, "count": row.count} for row in by_status],
+        "interval": interval,
+        "histogram": [{"start": row.start, "count": row.count} for row in histogram],
+    }
 
 
 def get_task(db: Session, task_id: int, user_id: int) -> Task | None:
@@ -37,21 +238,263 @@ def create_task(db: Session, task_data: TaskCreate, user_id: int) -> Task:
     task = Task(**task_data.model_dump(), user_id=user_id)
     db.add(task)
     db.commit()
-    db.refresh(task)
+    task_stats_cache.invalidate(user_id)
     return task
 
 
-def update_task(db: Session, task: Task, task_data: TaskUpdate) -> Task:
-    """タスク更新"""
+def update_task(
+    db: Session,
+    task: Task,
+    task_data: TaskUpdate,
+    expected_updated_at: datetime | None = None,
+) -> Task:
+    """タスク更新
+
+    expected_updated_at を指定した場合は行ロックを取って読み直し、
+    更新日時が一致しなければ TaskModifiedError を送出する。
+    """
+    if expected_updated_at is not None:
+        db.refresh(task, with_for_update=True)
+        if task.updated_at != expected_updated_at:
+            db.rollback()
+            raise TaskModifiedError
     for key, value in task_data.model_dump().items():
         setattr(task, key, value)
-
     db.commit()
-    db.refresh(task)
+    task_stats_cache.invalidate(task.user_id)
     return task
 
 
 def delete_task(db: Session, task: Task) -> None:
     """タスク削除"""
     db.delete(task)
+    _record_deletions(db, task.user_id, [task.id])
+    db.commit()
+    task_stats_cache.invalidate(task.user_id)
+
+
+def _record_deletions(db: Session, user_id: int, task_ids: list[int]) -> None:
+    """差分同期用に削除したタスクを記録し、保持期間を過ぎた記録を削除する"""
+    if not task_ids:
+        return
+    db.execute(insert(TaskDeletion), [{"task_id": task_id, "user_id": user_id} for task_id in task_ids])
+    db.execute(
+        delete(TaskDeletion).where(
+            TaskDeletion.user_id == user_id,
+            TaskDeletion.deleted_at
+            < func.now() - timedelta(days=settings.task_deletion_retention_days),
+        )
+    )
+
+
+def get_task_changes(
+    db: Session, user_id: int, token: str | None = None
+) -> tuple[list[Task], list[int], str]:
+    """同期トークン以降に作成・更新されたタスクと、削除されたタスクIDを取得する
+
+    token を省略した場合は全タスクを返す。戻り値の3つ目は次回用の同期トークン。
+    不正なトークンの場合は ValueError、古すぎる場合は SyncTokenExpiredError を送出する。
+    """
+    since = None
+    if token:
+        try:
+            (value,) = decode_cursor(token)
+            since = datetime.fromisoformat(value)
+        except (TypeError, ValueError) as e:
+            raise ValueError("Invalid sync token") from e
+        if since.tzinfo is None:
+            raise ValueError("Invalid sync token")
+
+    now = db.scalar(select(func.now()))
+    if since is not None and since < now - timedelta(days=settings.task_deletion_retention_days):
+        raise SyncTokenExpiredError
+
+    query = select(Task).where(Task.user_id == user_id)
+    deleted: list[int] = []
+    if since is not None:
+        query = query.where(Task.updated_at > since - SYNC_OVERLAP)
+        deleted = list(
+            db.scalars(
+                select(TaskDeletion.task_id)
+                .where(
+                    TaskDeletion.user_id == user_id,
+                    TaskDeletion.deleted_at > since - SYNC_OVERLAP,
+                )
+                .distinct()
+            )
+        )
+    tasks = list(db.scalars(query.order_by(Task.updated_at, Task.id)))
+    return tasks, deleted, encode_cursor([now.isoformat()])
+
+
+def _update_tasks(db: Session, user_id: int, items: list[TaskUpdate]) -> list[Task]:
+    """複数タスクの更新を UPDATE ... FROM (VALUES ...) RETURNING の1文で実行する"""
+    fields = list(TaskUpdate.model_fields)
+    rows = values(
+        column("id", Task.id.type),
+        *(column(name, Task.__table__.c[name].type) for name in fields),
+        name="bulk_update",
+    ).data([(item.id, *(getattr(item, name) for name in fields)) for item in items])
+    stmt = (
+        update(Task)
+        .where(Task.id == rows.c.id, Task.user_id == user_id)
+        .values({name: rows.c[name] for name in fields})
+        .returning(Task)
+        .execution_options(populate_existing=True)
+    )
+    # RETURNING の順序は保証されないため、リクエストの順に並べ直す
+    position = {item.id: i for i, item in enumerate(items)}
+    return sorted(db.scalars(stmt), key=lambda task: position[task.id])
+
+
+def bulk_tasks(db: Session, user_id: int, data: TaskBulkRequest) -> dict[str, Any]:
+    """タスクの作成・更新・ステータス移動・削除を1トランザクションで実行する
+
+    各操作は RETURNING で結果を受け取るため、行ごとの refresh は行わない。
+    対象に存在しないタスクが含まれる場合はロールバックして TaskNotFoundError を送出する。
+    ステータスの所有チェックは呼び出し側で行う。
+    """
+    created: list[Task] = []
+    updated: list[Task] = []
+    moved: list[Task] = []
+    deleted: list[int] = []
+
+    if data.create:
+        created = list(
+            db.scalars(
+                insert(Task).returning(Task, sort_by_parameter_order=True),
+                [{**item.model_dump(), "user_id": user_id} for item in data.create],
+            )
+        )
+    if data.update:
+        updated = _update_tasks(db, user_id, data.update)
+    for item in data.move:
+        moved += db.scalars(
+            update(Task)
+            .where(Task.id.in_(item.task_ids), Task.user_id == user_id)
+            .values(status_id=item.status_id)
+            .returning(Task)
+            .execution_options(populate_existing=True)
+        )
+    if data.delete:
+        deleted = list(
+            db.scalars(
+                delete(Task)
+                .where(Task.id.in_(data.delete), Task.user_id == user_id)
+                .returning(Task.id)
+            )
+        )
+        _record_deletions(db, user_id, deleted)
+
+    found = {task.id for task in updated} | {task.id for task in moved} | set(deleted)
+    missing = set(data.task_ids()) - found
+    if missing:
+        db.rollback()
+        raise TaskNotFoundError(missing)
+    db.commit()
+    task_stats_cache.invalidate(user_id)
+    return {"created": created, "updated": updated, "moved": moved, "deleted": deleted}
+
+
+def _format_error(error: dict[str, Any]) -> str:
+    location = ".".join(str(part) for part in error["loc"])
+    return f"{location}: {error['msg']}" if location else error["msg"]
+
+
+def get_import_statuses(db: Session, user_id: int) -> list[tuple[int, str]]:
+    """インポートでステータスを解決するための (ID, 名前) の一覧（並び順）"""
+    return [
+        (status_id, name)
+        for status_id, name in db.execute(
+            select(Status.id, Status.name).where(Status.user_id == user_id).order_by(asc(Status.order))
+        )
+    ]
+
+
+class TaskImportValidator:
+    """インポートする行の検証（DB を使わないため、イベントループの外で実行できる）
+
+    ステータスは事前に取得した名前・ID の対応表で解決する（名前を優先）。
+    エラー行がある場合は skip_invalid=False なら何も登録させず、True なら正しい行だけを登録させる。
+    """
+
+    def __init__(self, user_id: int, statuses: Iterable[tuple[int, str]], skip_invalid: bool = False) -> None:
+        self.user_id = user_id
+        self.skip_invalid = skip_invalid
+        self.status_ids: set[int] = set()
+        self.status_by_name: dict[str, int] = {}
+        for status_id, name in statuses:
+            self.status_ids.add(status_id)
+            # 同名のステータスがある場合は並び順が先のものを使う
+            self.status_by_name.setdefault(name, status_id)
+        self.imported = 0
+        self.error_count = 0
+        self.errors: list[dict[str, Any]] = []
+
+    @property
+    def failed(self) -> bool:
+        """エラー行があり、何も登録しない"""
+        return bool(self.error_count) and not self.skip_invalid
+
+    def validate(
+        self, rows: Iterator[tuple[int, dict[str, Any] | None]], batch_size: int = IMPORT_BATCH_SIZE
+    ) -> list[dict[str, Any]]:
+        """(行番号, 項目) の列から登録する行を最大 batch_size 件取り出す（空のリストは読み終わり）
+
+        何も登録しない場合も、エラー行を報告するため最後まで検証して空のリストを返す。
+        """
+        batch: list[dict[str, Any]] = []
+        for row_number, raw in rows:
+            messages: list[str] = []
+            item = None
+            if raw is None:
+                messages.append("JSON オブジェクトではありません")
+            else:
+                try:
+                    item = TaskImportRow.model_validate(raw)
+                except ValidationError as e:
+                    messages += [_format_error(error) for error in e.errors()]
+            if item is not None:
+                status_id = self.status_by_name.get(item.status)
+                if status_id is None and item.status_id in self.status_ids:
+                    status_id = item.status_id
+                if status_id is None:
+                    messages.append("ステータスが見つかりません")
+            if messages:
+                self.error_count += 1
+                if len(self.errors) < IMPORT_MAX_ERRORS:
+                    self.errors.append({"row": row_number, "errors": messages})
+                continue
+            if self.failed:
+                continue
+            batch.append({
+                "title": item.title,
+                "content": item.content,
+                "due_date": item.due_date,
+                "status_id": status_id,
+                "user_id": self.user_id,
+            })
+            if len(batch) >= batch_size:
+                break
+        if self.failed:
+            return []
+        self.imported += len(batch)
+        return batch
+
+
+def insert_tasks(db: Session, rows: list[dict[str, Any]]) -> None:
+    """検証済みの行を executemany で INSERT する（コミットは finish_import）"""
+    db.execute(insert(Task), rows)
+
+
+def finish_import(db: Session, validator: TaskImportValidator) -> dict[str, Any]:
+    """インポートを確定する（何も登録しない場合は登録済みのバッチも取り消す）
+
+    すべてのバッチを1トランザクションで登録するため、途中で失敗した場合はセッションを閉じれば取り消される。
+    """
+    if validator.failed:
+        db.rollback()
+        return {"imported": 0, "error_count": validator.error_count, "errors": validator.errors}
     db.commit()
+    task_stats_cache.invalidate(validator.user_id)
+    return {"imported": validator.imported, "error_count": validator.error_count, "errors": validator.errors}
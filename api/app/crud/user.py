@@ -1,45 +1,53 @@
+from psycopg2 import errorcodes
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.auth import get_password_hash
 from app.models.user import User
 from app.schemas.auth import UserCreate
 
 
-def get_user_by_email(db: Session, email: str) -> User | None:
-    return db.scalars(select(User).where(User.email == email)).first()
+class DuplicateUserError(Exception):
+    """ユーザー名またはメールアドレスが既に登録されている"""
 
 
-def update_username(db: Session, user: User, new_username: str) -> User:
-    user.username = new_username
+def _commit_user(db: Session) -> None:
+    # 一意制約違反はドライバ（psycopg2 / asyncpg）に依存しない例外に変換する
     try:
         db.commit()
     except IntegrityError as e:
         db.rollback()
-        raise e.orig
-    db.refresh(user)
+        if getattr(e.orig, "pgcode", None) == errorcodes.UNIQUE_VIOLATION:
+            raise DuplicateUserError from e
+        raise
+
+
+def get_user(db: Session, user_id: int) -> User | None:
+    return db.scalars(select(User).where(User.id == user_id)).first()
+
+
+def get_user_by_email(db: Session, email: str) -> User | None:
+    return db.scalars(select(User).where(User.email == email)).first()
+
+
+def update_username(db: Session, user: User, new_username: str) -> User:
+    user.username = new_username
+    _commit_user(db)
     return user
 
 
-def update_password(db: Session, user: User, new_password: str) -> User:
-    user.hashed_password = get_password_hash(new_password)
+def update_password(db: Session, user: User, hashed_password: str) -> User:
+    user.hashed_password = hashed_password
     db.commit()
-    db.refresh(user)
     return user
 
 
-def create_user(db: Session, user_data: UserCreate) -> User:
+def create_user(db: Session, user_data: UserCreate, hashed_password: str) -> User:
     user = User(
         username=user_data.username,
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=hashed_password,
     )
     db.add(user)
-    try:
-        db.commit()
-    except IntegrityError as e:
-        db.rollback()
-        raise e.orig
-    db.refresh(user)
+    _commit_user(db)
     return user
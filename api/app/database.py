@@ -1,22 +1,197 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Sequence
+from typing import Any, Concatenate, ParamSpec, TypeVar
+from uuid import uuid4
 
-from app.config import settings
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Executable, Row, create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.config import Settings, settings
+from app.profiler import profiled
+from app.query_stats import instrument
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class PoolWaitStats:
+    """コネクションプールからの取得待ち時間の累計"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+
+
+def _timed_pool_class(base: type[QueuePool], stats: PoolWaitStats) -> type[QueuePool]:
+    """コネクション取得（checkout）の待ち時間を stats に記録するプールクラスを作る"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return base._do_get(self)
+        finally:
+            stats.record(time.perf_counter() - start)
+
+    return type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+def engine_options(config: Settings, driver: str) -> dict[str, Any]:
+    """Settings から create_engine / create_async_engine の引数を組み立てる"""
+    options: dict[str, Any] = {
+        "pool_size": config.db_pool_size,
+        "max_overflow": config.db_max_overflow,
+        "pool_timeout": config.db_pool_timeout,
+        "pool_recycle": config.db_pool_recycle,
+        "pool_pre_ping": config.db_pool_pre_ping,
+    }
+    connect_args: dict[str, Any] = {}
+    server_settings: dict[str, str] = {}
+    if config.db_statement_timeout_ms:
+        server_settings["statement_timeout"] = str(config.db_statement_timeout_ms)
+    if not config.events_enabled:
+        # 変更通知のトリガー（app.events）は、このパラメータが off の接続では NOTIFY しない
+        server_settings["app.events_enabled"] = "off"
+    # PgBouncer は起動パラメータを転送しないため、その場合の statement_timeout などは
+    # DBロール側（ALTER ROLE ... SET statement_timeout）で設定する
+    if server_settings and not config.db_pgbouncer:
+        if driver == "asyncpg":
+            connect_args["server_settings"] = server_settings
+        else:
+            connect_args["options"] = " ".join(f"-c {name}={value}" for name, value in server_settings.items())
+    if config.db_pgbouncer and driver == "asyncpg":
+        # transaction モードではサーバー接続が入れ替わるため、名前付きプリペアドステートメントを使わない
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+pool_wait_stats = PoolWaitStats()
+async_pool_wait_stats = PoolWaitStats()
 
 # SQLAlchemyエンジン作成
-engine = create_engine(settings.database_url)
+engine = create_engine(
+    settings.database_url,
+    poolclass=_timed_pool_class(QueuePool, pool_wait_stats),
+    **engine_options(settings, "psycopg2"),
+)
 
 # セッションローカル
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# コミット後もロード済みの属性を使えるよう、非同期セッションと同じく expire_on_commit=False とする
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# 非同期エンジン（DB_ASYNC=true の場合のみ asyncpg で作成）
+async_engine = (
+    create_async_engine(
+        settings.async_database_url,
+        poolclass=_timed_pool_class(AsyncAdaptedQueuePool, async_pool_wait_stats),
+        **engine_options(settings, "asyncpg"),
+    )
+    if settings.db_async
+    else None
+)
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    if async_engine is not None
+    else None
+)
+
+# リクエストごとのクエリ数・DB時間の記録（app.query_stats.QueryStatsMiddleware）
+if settings.query_stats_enabled:
+    instrument(engine)
+    if async_engine is not None:
+        instrument(async_engine.sync_engine)
+
+# ルーターが受け取るセッション（同期 / 非同期は設定で切り替え）
+DbSession = Session | AsyncSession
 
 # ベースクラス
 Base = declarative_base()
 
 
+def pool_status(target: Engine, wait_stats: PoolWaitStats) -> dict[str, Any]:
+    """コネクションプールの使用状況を返す"""
+    pool = target.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.db_max_overflow,
+        "checkout_count": wait_stats.count,
+        "checkout_wait_seconds_total": wait_stats.total_seconds,
+        "checkout_wait_seconds_max": wait_stats.max_seconds,
+    }
+
+
 # 依存性注入用のDB取得関数
-def get_db():
+async def get_db() -> AsyncIterator[DbSession]:
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        # 接続を使っていない（キャッシュヒット等）場合は close がI/Oを伴わない
+        if db.in_transaction():
+            await run_in_threadpool(db.close)
+        else:
+            db.close()
+
+
+async def run_db(
+    db: DbSession,
+    fn: Callable[Concatenate[Session, P], T],
+    *args: P.args,
+    **kwargs: P.kwargs,
+) -> T:
+    """同期 Session を受け取る CRUD 関数をイベントループを塞がずに実行する
+
+    AsyncSession の場合は run_sync でそのまま非同期ドライバ上で実行し、
+    同期 Session の場合はスレッドプールで実行する（計測中のリクエストならプロファイラの採取対象にする）。
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(profiled(fn), db, *args, **kwargs)
+
+
+async def stream_db(db: DbSession, query: Executable, batch_size: int) -> AsyncIterator[Sequence[Row]]:
+    """クエリ結果をサーバーサイドカーソルで batch_size 件ずつ取得する
+
+    結果全体をメモリに載せないため、件数によらずメモリ使用量は一定になる。
+    同期 Session の場合は取得ごとにスレッドプールで実行する。
+    """
+    query = query.execution_options(yield_per=batch_size)
+    if isinstance(db, AsyncSession):
+        result = await db.stream(query)
+        try:
+            async for rows in result.partitions():
+                yield rows
+        finally:
+            await result.close()
+        return
+
+    result = await run_in_threadpool(profiled(db.execute), query)
+    try:
+        while rows := await run_in_threadpool(profiled(result.fetchmany), batch_size):
+            yield rows
+    finally:
+        await run_in_threadpool(result.close)
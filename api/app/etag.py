@@ -0,0 +1,45 @@
+import hashlib
+from collections.abc import Iterable
+from typing import Any
+
+from fastapi import Response
+
+# ブラウザに毎回再検証させる（If-None-Match 付きで問い合わせさせる）
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """バージョン情報から強い ETag を生成する"""
+    raw = ":".join(str(part) for part in parts)
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def _parse(header: str) -> Iterable[str]:
+    return (value.strip() for value in header.split(","))
+
+
+def none_match(header: str | None, etag: str) -> bool:
+    """If-None-Match が現在の ETag に一致するか（弱い比較）"""
+    if header is None:
+        return False
+    return any(value == "*" or value.removeprefix("W/") == etag for value in _parse(header))
+
+
+def match(header: str | None, etag: str) -> bool:
+    """If-Match が現在の ETag に一致するか（強い比較。ヘッダーがない場合は True）"""
+    if header is None:
+        return True
+    return any(value == "*" or value == etag for value in _parse(header))
+
+
+def etag_headers(etag: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers.update(etag_headers(etag))
+
+
+def not_modified(etag: str) -> Response:
+    """304 Not Modified レスポンス（ボディなし）"""
+    return Response(status_code=304, headers=etag_headers(etag))
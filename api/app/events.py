@@ -0,0 +1,268 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Any
+
+import psycopg2
+import psycopg2.extensions
+from sqlalchemy import DDL, event, make_url
+
+from app.config import settings
+from app.database import Base
+from app.models.status import Status
+from app.models.task import Task
+
+logger = logging.getLogger(__name__)
+
+# 変更通知に使う PostgreSQL の NOTIFY チャンネル
+CHANNEL = "app_events"
+# NOTIFY のペイロード上限（8000バイト）に収めるため、これを超える ID は送らず再取得を促す
+MAX_NOTIFY_IDS = 500
+# 購読者のキューがあふれた場合に送るイベント（クライアントは一覧を取得し直す）
+RESYNC_EVENT = {"entity": "sync", "action": "resync", "ids": None}
+
+
+# tasks / statuses への書き込みを、文単位のトリガーで書き込みと同じトランザクション内から通知する
+# （アプリから NOTIFY の SQL を別に発行しない）。変更行（遷移テーブル）をユーザー・操作ごとに1件の NOTIFY にまとめる。
+# 更新のうち、タスクのタイトル・内容・締切日が変わらないものは moved（ステータスの移動）、
+# ステータスの名前・色が変わらないものは reordered（並び順の変更）とする。
+# 接続パラメータ app.events_enabled が off（EVENTS_ENABLED=false）の場合は通知しない
+NOTIFY_FUNCTIONS = [
+    f"""
+CREATE OR REPLACE FUNCTION app_event_payload(user_id integer, entity text, action text, ids integer[])
+RETURNS text LANGUAGE sql IMMUTABLE AS $$
+    SELECT json_build_object(
+        'user_id', user_id,
+        'entity', entity,
+        'action', action,
+        'ids', CASE WHEN cardinality(ids) > {MAX_NOTIFY_IDS} THEN NULL ELSE to_json(ids) END
+    )::text
+$$
+""",
+    f"""
+CREATE OR REPLACE FUNCTION notify_app_events() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF current_setting('app.events_enabled', true) = 'off' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'INSERT' THEN
+        PERFORM pg_notify('{CHANNEL}', app_event_payload(user_id, TG_ARGV[0], 'created', array_agg(id ORDER BY id)))
+        FROM new_rows GROUP BY user_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('{CHANNEL}', app_event_payload(user_id, TG_ARGV[0], 'deleted', array_agg(id ORDER BY id)))
+        FROM old_rows GROUP BY user_id;
+    ELSIF TG_TABLE_NAME = 'tasks' THEN
+        PERFORM pg_notify('{CHANNEL}', app_event_payload(n.user_id, TG_ARGV[0], changed.action, array_agg(n.id ORDER BY n.id)))
+        FROM old_rows AS o
+        JOIN new_rows AS n ON n.id = o.id
+        CROSS JOIN LATERAL (
+            SELECT CASE
+                WHEN (o.title, o.content, o.due_date) IS NOT DISTINCT FROM (n.title, n.content, n.due_date)
+                THEN 'moved' ELSE 'updated'
+            END AS action
+        ) AS changed
+        GROUP BY n.user_id, changed.action;
+    ELSE
+        PERFORM pg_notify('{CHANNEL}', app_event_payload(n.user_id, TG_ARGV[0], changed.action, array_agg(n.id ORDER BY n.id)))
+        FROM old_rows AS o
+        JOIN new_rows AS n ON n.id = o.id
+        CROSS JOIN LATERAL (
+            SELECT CASE
+                WHEN (o.name, o.color) IS NOT DISTINCT FROM (n.name, n.color) THEN 'reordered' ELSE 'updated'
+            END AS action
+        ) AS changed
+        GROUP BY n.user_id, changed.action;
+    END IF;
+    RETURN NULL;
+END
+$$
+""",
+]
+# 通知するテーブルとイベントのエンティティ名
+NOTIFY_TABLES = {"tasks": "task", "statuses": "status"}
+
+
+def notify_triggers(table: str) -> list[str]:
+    """table に notify_app_events を呼ぶトリガーを作る SQL（遷移テーブルを使うため INSERT / UPDATE / DELETE で分ける）"""
+    transitions = {
+        "INSERT": "NEW TABLE AS new_rows",
+        "UPDATE": "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+        "DELETE": "OLD TABLE AS old_rows",
+    }
+    return [
+        f"CREATE TRIGGER {table}_notify_{operation.lower()} AFTER {operation} ON {table} "
+        f"REFERENCING {transition} FOR EACH STATEMENT EXECUTE FUNCTION notify_app_events('{NOTIFY_TABLES[table]}')"
+        for operation, transition in transitions.items()
+    ]
+
+
+# create_all（テスト）でもマイグレーションと同じトリガーを作る
+for _statement in NOTIFY_FUNCTIONS:
+    event.listen(Base.metadata, "before_create", DDL(_statement))
+for _table in (Task.__table__, Status.__table__):
+    for _statement in notify_triggers(_table.name):
+        event.listen(_table, "after_create", DDL(_statement))
+
+
+class Subscriber:
+    """SSE 接続1本分のイベントキュー（上限を超えたら溜まったイベントを捨てて resync を送る）"""
+
+    def __init__(self, user_id: int, maxsize: int) -> None:
+        self.user_id = user_id
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=maxsize)
+
+    def put(self, event: dict[str, Any]) -> int:
+        """イベントを追加し、破棄したイベント数を返す"""
+        try:
+            self.queue.put_nowait(event)
+            return 0
+        except asyncio.QueueFull:
+            # 読み出しが追いつかないクライアントのために無制限にメモリを使わない
+            dropped = self.queue.qsize() + 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_EVENT)
+            return dropped
+
+
+class EventBroker:
+    """LISTEN で受け取った変更通知を、同じワーカー内の SSE 購読者へ配信する
+
+    ワーカーごとに LISTEN 用の接続を1本だけ持ち、最初の購読時に接続する。
+    """
+
+    def __init__(self, dsn: str, queue_size: int) -> None:
+        self.dsn = dsn
+        self.queue_size = queue_size
+        self.received = 0
+        self.dropped = 0
+        self._subscribers: dict[int, set[Subscriber]] = defaultdict(set)
+        self._conn: psycopg2.extensions.connection | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop: asyncio.AbstractEventLoop | None = None
+        self._reconnect_task: asyncio.Task | None = None
+
+    @property
+    def connections(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    @property
+    def users(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def listening(self) -> bool:
+        return self._conn is not None
+
+    async def listen(self) -> None:
+        """LISTEN 用の接続を用意する（接続できない場合は psycopg2.Error を送出する）"""
+        await self._ensure_listening()
+
+    async def subscribe(self, user_id: int) -> Subscriber:
+        await self._ensure_listening()
+        subscriber = Subscriber(user_id, self.queue_size)
+        self._subscribers[user_id].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscribers = self._subscribers.get(subscriber.user_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._subscribers[subscriber.user_id]
+
+    async def _ensure_listening(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            # 別のイベントループ（テスト等）で作った接続・ロックは使えないため作り直す
+            self._close()
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        async with self._lock:
+            if self._conn is not None:
+                return
+            conn = await loop.run_in_executor(None, self._connect)
+            loop.add_reader(conn.fileno(), self._on_readable)
+            self._conn = conn
+            self._loop = loop
+
+    def _connect(self) -> psycopg2.extensions.connection:
+        conn = psycopg2.connect(self.dsn)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        return conn
+
+    def _on_readable(self) -> None:
+        conn = self._conn
+        if conn is None:
+            return
+        try:
+            conn.poll()
+        except psycopg2.Error:
+            logger.warning("event listener connection lost", exc_info=True)
+            loop = self._loop
+            self._close()
+            # 接続断の間の通知は失われるため、再接続後に全購読者へ再取得させる
+            self._reconnect_task = loop.create_task(self._reconnect())
+            return
+        while conn.notifies:
+            self.dispatch(conn.notifies.pop(0).payload)
+
+    async def _reconnect(self) -> None:
+        delay = 1.0
+        while self._subscribers and self._conn is None:
+            await asyncio.sleep(delay)
+            try:
+                await self._ensure_listening()
+            except psycopg2.Error:
+                logger.warning("event listener reconnect failed", exc_info=True)
+                delay = min(delay * 2, 30.0)
+        self._broadcast(None, RESYNC_EVENT)
+
+    def dispatch(self, payload: str) -> None:
+        """通知を対象ユーザーの購読者へ配信する"""
+        self.received += 1
+        try:
+            event = json.loads(payload)
+            user_id = event.pop("user_id")
+        except (ValueError, KeyError):
+            logger.warning("invalid event payload: %s", payload)
+            return
+        self._broadcast(user_id, event)
+
+    def _broadcast(self, user_id: int | None, event: dict[str, Any]) -> None:
+        """user_id の購読者（None の場合は全購読者）へイベントを配信する"""
+        if user_id is None:
+            targets = [s for subscribers in self._subscribers.values() for s in subscribers]
+        else:
+            targets = list(self._subscribers.get(user_id, ()))
+        for subscriber in targets:
+            self.dropped += subscriber.put(event)
+
+    def _close(self) -> None:
+        if self._conn is None:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(self._conn.fileno())
+        self._conn.close()
+        self._conn = None
+        self._loop = None
+
+    async def close(self) -> None:
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        self._close()
+
+
+def _listen_dsn() -> str:
+    # LISTEN は PgBouncer の transaction モードでは使えないため、直接接続用URLを指定できる
+    url = make_url(settings.events_database_url or settings.database_url)
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+event_broker = EventBroker(_listen_dsn(), queue_size=settings.events_queue_size)
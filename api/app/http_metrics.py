@@ -0,0 +1,184 @@
+import time
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# レイテンシのヒストグラムの境界（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# ルートに一致しなかったリクエスト（404 など）のラベル。パスをそのまま使うとラベルの種類が増え続けるため
+UNMATCHED_ROUTE = "<unmatched>"
+# レイテンシのヒストグラムに含めないレスポンス。SSE は接続を切るまで続くため、処理時間の分布を歪める
+UNTIMED_CONTENT_TYPES = (b"text/event-stream",)
+METRICS_PATH = "/metrics"
+# MetricsPortMiddleware がメトリクス用ポートで受けたリクエストの scope に設定するキー
+METRICS_PORT_SCOPE_KEY = "app.metrics_port"
+
+
+class Histogram:
+    """Prometheus のヒストグラム（バケットごとの件数・合計・件数）"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        # 最後の要素は +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> Iterator[tuple[str, int]]:
+        """(le, 累積件数)"""
+        total = 0
+        for bound, count in zip((*map(repr, self.buckets), "+Inf"), self.counts):
+            total += count
+            yield bound, total
+
+
+class HttpMetrics:
+    """ルート（パスのテンプレート）ごとのリクエスト数・レイテンシ・処理中の件数（ワーカー単位）
+
+    イベントループのスレッドからのみ更新するため、ロックは使わない。
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.requests: dict[tuple[str, str, str], int] = {}
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.in_progress: dict[str, int] = {}
+
+    def started(self, method: str) -> None:
+        self.in_progress[method] = self.in_progress.get(method, 0) + 1
+
+    def finished(self, method: str, route: str, status_code: int, seconds: float | None) -> None:
+        """seconds が None の場合はレイテンシを記録しない（リクエスト数のみ）"""
+        self.in_progress[method] -= 1
+        key = (method, route, str(status_code))
+        self.requests[key] = self.requests.get(key, 0) + 1
+        if seconds is None:
+            return
+        histogram = self.latency.get((method, route))
+        if histogram is None:
+            histogram = self.latency[(method, route)] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    def render(self) -> Iterator[str]:
+        """Prometheus のテキスト形式の行"""
+        yield "# HELP http_requests_total Total HTTP requests by route and status code."
+        yield "# TYPE http_requests_total counter"
+        for (method, route, status_code), count in sorted(self.requests.items()):
+            yield sample("http_requests_total", count, method=method, route=route, status=status_code)
+
+        yield "# HELP http_request_duration_seconds HTTP request latency by route."
+        yield "# TYPE http_request_duration_seconds histogram"
+        for (method, route), histogram in sorted(self.latency.items()):
+            for le, count in histogram.cumulative():
+                yield sample(
+                    "http_request_duration_seconds_bucket", count, method=method, route=route, le=le
+                )
+            yield sample("http_request_duration_seconds_sum", histogram.sum, method=method, route=route)
+            yield sample("http_request_duration_seconds_count", histogram.count, method=method, route=route)
+
+        yield "# HELP http_requests_in_progress HTTP requests currently being processed."
+        yield "# TYPE http_requests_in_progress gauge"
+        for method, count in sorted(self.in_progress.items()):
+            yield sample("http_requests_in_progress", count, method=method)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def sample(name: str, value: float, **labels: str) -> str:
+    """Prometheus のテキスト形式の1行"""
+    if labels:
+        label_text = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+        return f"{name}{{{label_text}}} {value}"
+    return f"{name} {value}"
+
+
+def render_metric(
+    name: str, help_text: str, kind: str, samples: Iterable[tuple[dict[str, str], Any]]
+) -> Iterator[str]:
+    """1つのメトリクスの HELP / TYPE と、(ラベル, 値) ごとの行"""
+    yield f"# HELP {name} {help_text}"
+    yield f"# TYPE {name} {kind}"
+    for labels, value in samples:
+        yield sample(name, value, **labels)
+
+
+http_metrics = HttpMetrics()
+
+
+class HttpMetricsMiddleware:
+    """ルートごとのリクエスト数・レイテンシ・処理中の件数を http_metrics に記録する
+
+    ルートのラベルは FastAPI がルーティング時に scope に設定するルートのパス（例: /tasks/{task_id}）。
+    レイテンシはレスポンスの送信完了まで（ストリーミングの場合は最後のチャンクまで）の時間。
+    SSE（GET /events）のレスポンスはレイテンシに含めない。
+    """
+
+    def __init__(self, app: ASGIApp, metrics: HttpMetrics = http_metrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        timed = True
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code, timed
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                timed = not any(
+                    name.lower() == b"content-type" and value.startswith(UNTIMED_CONTENT_TYPES)
+                    for name, value in message.get("headers", [])
+                )
+            await send(message)
+
+        self.metrics.started(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            self.metrics.finished(
+                method,
+                getattr(route, "path_format", None) or UNMATCHED_ROUTE,
+                status_code,
+                time.perf_counter() - start if timed else None,
+            )
+
+
+class MetricsPortMiddleware:
+    """port で受けたリクエストは GET /metrics だけを通し、それ以外は 404 を返す
+
+    python -m app.server で METRICS_PORT を指定した場合の、ワーカーごとのメトリクス用ポートに使う。
+    通したリクエストには scope の METRICS_PORT_SCOPE_KEY を設定する（GET /metrics を認証なしで許可する）。
+    """
+
+    def __init__(self, app: ASGIApp, port: int) -> None:
+        self.app = app
+        self.port = port
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        server = scope.get("server")
+        if scope["type"] == "http" and server is not None and server[1] == self.port:
+            if scope["path"] != METRICS_PATH:
+                await PlainTextResponse("Not Found", status_code=404)(scope, receive, send)
+                return
+            scope[METRICS_PORT_SCOPE_KEY] = True
+        await self.app(scope, receive, send)
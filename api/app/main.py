@@ -1,15 +1,39 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.auth import password_hash_pool
 from app.config import settings
+from app.database import async_engine
+from app.events import event_broker
+from app.http_metrics import HttpMetricsMiddleware
+from app.profiler import ProfilerMiddleware
+from app.query_stats import QueryStatsMiddleware
+from app.responses import get_default_response_class
 from app.routers import auth as auth_router
+from app.routers import debug as debug_router
+from app.routers import events as events_router
+from app.routers import metrics as metrics_router
 from app.routers import status as status_router
 from app.routers import task as task_router
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await event_broker.close()
+    password_hash_pool.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
 app = FastAPI(
     title="Task Management API",
     description="FastAPI + React Todo App",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=get_default_response_class(),
 )
 
 # CORS設定
@@ -19,9 +43,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# リクエストごとのクエリ数・DB時間（Server-Timing ヘッダー）
+if settings.query_stats_enabled:
+    app.add_middleware(QueryStatsMiddleware, slow_ms=settings.query_stats_slow_ms)
+
+# 一部のリクエストのサンプリングプロファイル（GET /debug/profile）。PUT /debug/profiler で実行中に有効にできるよう、
+# 無効の場合も組み込む
+app.add_middleware(ProfilerMiddleware)
+
+# ルートごとのリクエスト数・レイテンシ（GET /metrics）。最も外側で全体の時間を計測する
+if settings.http_metrics_enabled:
+    app.add_middleware(HttpMetricsMiddleware)
+
 # ルーター登録
 app.include_router(auth_router.router)
 app.include_router(status_router.router)
 app.include_router(task_router.router)
+app.include_router(events_router.router)
+app.include_router(metrics_router.router)
+app.include_router(debug_router.router)
@@ -5,7 +5,13 @@ from sqlalchemy.sql import func
 
 
 class TimestampMixin:
-    """created_at, updated_at を提供するMixin"""
+    """created_at, updated_at を提供するMixin
+
+    eager_defaults により、サーバー側で設定される値を INSERT/UPDATE の RETURNING で
+    同時に取得する（コミット後に refresh で再取得する必要がない）。
+    """
+    __mapper_args__ = {"eager_defaults": True}
+
     created_at = Column(
         DateTime(timezone=True),
         nullable=False,
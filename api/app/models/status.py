@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
 
 from app.database import Base
 from app.models.base import TimestampMixin
@@ -6,9 +6,14 @@ from app.models.base import TimestampMixin
 
 class Status(TimestampMixin, Base):
     __tablename__ = "statuses"
+    __table_args__ = (
+        # 一覧取得（ユーザー絞り込み + 並び順でのソート）・並び順の最大値の取得用
+        Index("ix_statuses_user_id_order", "user_id", "order"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(50), nullable=False)
     color = Column(String(7), nullable=False)
-    order = Column(Integer, nullable=False, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # order・user_id 単独のインデックスは ix_statuses_user_id_order で代用できるため作らない
+    order = Column(Integer, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
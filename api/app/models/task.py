@@ -1,15 +1,28 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Text, Date
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Text, Date
 
 from app.database import Base
 from app.models.base import TimestampMixin
 
+# キーワード検索（LIKE '%q%'）用の pg_trgm GIN インデックス。
+# pg_trgm 拡張に依存するためモデルには定義せず、マイグレーションでのみ管理する
+TRIGRAM_INDEXES = ("ix_tasks_title_trgm", "ix_tasks_content_trgm")
+
 
 class Task(TimestampMixin, Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # 一覧取得（ユーザー絞り込み + 締切日・IDでのソート/カーソル）用
+        Index("ix_tasks_user_id_due_date_id", "user_id", "due_date", "id"),
+        # 差分同期（ユーザー絞り込み + 更新日時での範囲検索）用
+        Index("ix_tasks_user_id_updated_at", "user_id", "updated_at"),
+        # ステータス削除時の使用中チェック用
+        Index("ix_tasks_status_id", "status_id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     title = Column(String(255), nullable=False)
     content = Column(Text, nullable=False)
     due_date = Column(Date, nullable=False, index=True)
     status_id = Column(Integer, ForeignKey("statuses.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # user_id 単独のインデックスは ix_tasks_user_id_due_date_id で代用できるため作らない
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
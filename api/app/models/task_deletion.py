@@ -0,0 +1,19 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class TaskDeletion(Base):
+    """削除されたタスクの記録（差分同期で削除をクライアントへ伝えるために使う）"""
+    __tablename__ = "task_deletions"
+    __table_args__ = (
+        # 差分同期（ユーザー絞り込み + 削除日時での範囲検索）用
+        Index("ix_task_deletions_user_id_deleted_at", "user_id", "deleted_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # タスク自体は削除済みのため外部キーにしない
+    task_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
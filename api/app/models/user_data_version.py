@@ -0,0 +1,71 @@
+from sqlalchemy import DDL, BigInteger, Column, ForeignKey, Integer, event
+
+from app.database import Base
+from app.models.status import Status
+from app.models.task import Task
+
+# tasks / statuses への書き込み（INSERT / UPDATE / DELETE）ごとに、対象ユーザーの変更回数を加算する。
+# 文単位のトリガーで変更行（遷移テーブル）のユーザーIDをまとめて処理する
+BUMP_VERSIONS_FUNCTION = DDL("""
+CREATE OR REPLACE FUNCTION bump_user_data_versions() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    user_ids integer[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT user_id) INTO user_ids FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(DISTINCT user_id) INTO user_ids FROM old_rows;
+    ELSE
+        SELECT array_agg(DISTINCT user_id) INTO user_ids
+        FROM (SELECT user_id FROM old_rows UNION ALL SELECT user_id FROM new_rows) AS changed;
+    END IF;
+    IF user_ids IS NOT NULL THEN
+        INSERT INTO user_data_versions AS v (user_id, tasks_version, statuses_version)
+        SELECT changed.user_id, (TG_TABLE_NAME = 'tasks')::int, (TG_TABLE_NAME = 'statuses')::int
+        FROM unnest(user_ids) AS changed(user_id)
+        ON CONFLICT (user_id) DO UPDATE SET
+            tasks_version = v.tasks_version + excluded.tasks_version,
+            statuses_version = v.statuses_version + excluded.statuses_version;
+    END IF;
+    RETURN NULL;
+END
+$$
+""")
+
+
+def bump_versions_triggers(table: str) -> list[str]:
+    """table に bump_user_data_versions を呼ぶトリガーを作る SQL
+
+    遷移テーブルを使うトリガーは1つのイベントにしか指定できないため、INSERT / UPDATE / DELETE で分ける。
+    """
+    transitions = {
+        "INSERT": "NEW TABLE AS new_rows",
+        "UPDATE": "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+        "DELETE": "OLD TABLE AS old_rows",
+    }
+    return [
+        f"CREATE TRIGGER {table}_bump_version_{operation.lower()} AFTER {operation} ON {table} "
+        f"REFERENCING {transition} FOR EACH STATEMENT EXECUTE FUNCTION bump_user_data_versions()"
+        for operation, transition in transitions.items()
+    ]
+
+
+class UserDataVersion(Base):
+    """ユーザーごとのタスク・ステータスの変更回数（一覧の ETag 用）
+
+    tasks / statuses のトリガーが書き込みと同じトランザクション内で加算するため、コミットされた変更は
+    必ず値を変える（トランザクション開始時刻の updated_at と違い、後からコミットされた変更も反映される）。
+    同じユーザーの書き込みは、この行のロックによりコミットまで直列化される。
+    """
+    __tablename__ = "user_data_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    tasks_version = Column(BigInteger, nullable=False, server_default="0")
+    statuses_version = Column(BigInteger, nullable=False, server_default="0")
+
+
+# create_all（テスト）でもマイグレーションと同じトリガーを作る
+event.listen(Base.metadata, "before_create", BUMP_VERSIONS_FUNCTION)
+for _table in (Task.__table__, Status.__table__):
+    for _statement in bump_versions_triggers(_table.name):
+        event.listen(_table, "after_create", DDL(_statement))
@@ -0,0 +1,22 @@
+import base64
+import binascii
+import json
+from typing import Any
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """カーソル値をクライアントに渡す不透明な文字列へ変換する"""
+    raw = json.dumps(values, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    """encode_cursor で作成した文字列を元の値へ戻す（不正な場合は ValueError）"""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,248 @@
+import fnmatch
+import functools
+import itertools
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar
+from types import FrameType
+from typing import ParamSpec, TypeVar
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# 待機中のスレッドとみなす最も内側のフレーム（fnmatch のパターン。selectors はイベントループの待機）
+IDLE_FRAMES = (
+    "threading.py:Condition.wait",
+    "threading.py:Event.wait",
+    "threading.py:Thread._wait_for_tstate_lock",
+    "queue.py:Queue.get",
+    "selectors.py:*.select",
+)
+_IDLE_FRAME = re.compile("|".join(fnmatch.translate(pattern) for pattern in IDLE_FRAMES))
+MAX_DEPTH = 128
+# 種類数の上限を超えたスタックをまとめるフレーム名
+TRUNCATED = "[truncated]"
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+
+
+def collapse(frame: FrameType | None) -> list[str] | None:
+    """フレームを呼び出し元から順のフレーム名のリストにする（待機中のスレッドは None）"""
+    names = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    if not names or _IDLE_FRAME.match(names[0]):
+        return None
+    names.reverse()
+    return names
+
+
+def _runs(frame: FrameType | None, root: FrameType) -> bool:
+    """frame から呼び出し元をたどって root に行き着くか（root のコルーチンを実行中か）"""
+    while frame is not None:
+        if frame is root:
+            return True
+        frame = frame.f_back
+    return False
+
+
+class SamplingProfiler:
+    """計測対象のリクエストを処理中のスレッドのスタックを一定間隔で採取して集計する（ワーカー単位）
+
+    採取はバックグラウンドのスレッドで行い、計測対象のリクエストがない間は停止している。
+    イベントループのスレッドは計測対象のリクエスト（ProfilerMiddleware の呼び出し）を実行している間だけ、
+    スレッドプールのスレッドは profiled() を通して計測対象のリクエストから呼ばれた処理の間だけ採取する。
+    同時に処理中の他のリクエストのスタックは含まれない。リクエストの中で起動した別タスクや、
+    別プロセスで実行するパスワードハッシュ計算などはスタックに現れない。
+    計測するかどうか（enabled・sample_rate・route_filter）は configure で実行中に切り替えられる。
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        max_stacks: int,
+        enabled: bool = False,
+        sample_rate: float = 0.0,
+        routes: set[str] | None = None,
+    ) -> None:
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        # 計測するルート（パスのテンプレート。空の場合は全ルート）
+        self.route_filter = frozenset(routes or ())
+        self.samples = 0
+        self._stacks: dict[str, Counter[str]] = {}
+        # 採取対象: ハンドル → (ルート, スレッドID, 実行中であることを判定するフレーム（None はスレッド全体）)
+        self._targets: dict[int, tuple[str, int, FrameType | None]] = {}
+        self._handles = itertools.count()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def configure(self, enabled: bool, sample_rate: float, routes: set[str]) -> None:
+        """計測の有無・割合・対象のルートを切り替える（ProfilerMiddleware はリクエストごとに参照する）"""
+        self.sample_rate = sample_rate
+        self.route_filter = frozenset(routes)
+        self.enabled = enabled
+
+    def start(self, route: str, root: FrameType | None = None) -> int:
+        """呼び出し元のスレッドを route の採取対象にし、stop に渡すハンドルを返す
+
+        root を指定した場合は、スレッドが root のフレームを実行している間だけ採取する。
+        """
+        with self._lock:
+            handle = next(self._handles)
+            self._targets[handle] = (route, threading.get_ident(), root)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+            self._wake.set()
+        return handle
+
+    def stop(self, handle: int) -> None:
+        with self._lock:
+            del self._targets[handle]
+            if not self._targets:
+                self._wake.clear()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            self.sample()
+
+    def sample(self) -> None:
+        """採取対象のスレッドのスタックを1回採取し、それぞれのルートに加算する"""
+        with self._lock:
+            targets = list(self._targets.values())
+        if not targets:
+            return
+        frames = sys._current_frames()
+        stacks = []
+        for route, ident, root in targets:
+            frame = frames.get(ident)
+            if root is not None and not _runs(frame, root):
+                continue
+            if (names := collapse(frame)) is not None:
+                stacks.append((route, ";".join(names)))
+        with self._lock:
+            self.samples += 1
+            for route, stack in stacks:
+                counts = self._stacks.setdefault(route, Counter())
+                if stack not in counts and len(counts) >= self.max_stacks:
+                    stack = TRUNCATED
+                counts[stack] += 1
+
+    def collapsed(self, route: str | None = None) -> Iterator[str]:
+        """collapsed 形式（"フレーム;フレーム;... 件数"）の行。flamegraph.pl や speedscope でそのまま読み込める
+
+        route を省略した場合は全ルートを、ルート名を最も外側のフレームとして出力する。
+        """
+        with self._lock:
+            stacks = {name: counts.copy() for name, counts in self._stacks.items()}
+        for name, counts in sorted(stacks.items()):
+            if route is not None and name != route:
+                continue
+            for stack, count in counts.most_common():
+                yield f"{stack} {count}" if route is not None else f"{name};{stack} {count}"
+
+    def routes(self) -> list[str]:
+        with self._lock:
+            return sorted(self._stacks)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+
+
+profiler = SamplingProfiler(
+    interval=settings.profiler_interval_ms / 1000,
+    max_stacks=settings.profiler_max_stacks,
+    enabled=settings.profiler_enabled,
+    sample_rate=settings.profiler_sample_rate,
+    routes=settings.profiler_routes_set,
+)
+
+# 計測中のリクエストの (プロファイラ, ルート)。run_in_threadpool で実行する関数にもコンテキストごと引き継がれる
+_current: ContextVar[tuple[SamplingProfiler, str] | None] = ContextVar("profiled_request", default=None)
+
+
+def profiled(fn: Callable[P, T]) -> Callable[P, T]:
+    """スレッドプールで実行する fn を、計測中のリクエストの処理として採取するようにする
+
+    リクエストの処理中（イベントループのスレッド）に呼ぶ。計測中でなければ fn をそのまま返す。
+    """
+    current = _current.get()
+    if current is None:
+        return fn
+    target, route = current
+
+    @functools.wraps(fn)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        handle = target.start(route)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            target.stop(handle)
+
+    return wrapper
+
+
+class ProfilerMiddleware:
+    """ルートごとに target.sample_rate の割合のリクエストを SamplingProfiler で計測する
+
+    常に組み込み、target.enabled をリクエストごとに確認する（無効の間はそのまま次に渡すだけ）。
+    ルートはパスのテンプレート（例: GET /tasks/{task_id}）。ルーティング前にはルートが分からないため、
+    アプリのルート一覧と照合して決める。target.route_filter を指定した場合はそのルートのみ計測する。
+    """
+
+    def __init__(self, app: ASGIApp, target: SamplingProfiler = profiler) -> None:
+        self.app = app
+        self.profiler = target
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        target = self.profiler
+        if scope["type"] != "http" or not target.enabled or random.random() >= target.sample_rate:
+            await self.app(scope, receive, send)
+            return
+        route = self._route(scope)
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        # このリクエストのコルーチン（このフレーム）を実行している間のイベントループのスレッドを採取する
+        handle = self.profiler.start(route, sys._getframe())
+        token = _current.set((self.profiler, route))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            self.profiler.stop(handle)
+
+    def _route(self, scope: Scope) -> str | None:
+        for candidate in scope["app"].routes:
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                path = getattr(candidate, "path_format", None)
+                routes = self.profiler.route_filter
+                if path is None or (routes and path not in routes):
+                    return None
+                return f"{scope['method']} {path}"
+        return None
@@ -0,0 +1,130 @@
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    """1リクエストで発行した SQL の件数と DB 時間"""
+    count: int = 0
+    total_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+    def server_timing(self) -> str:
+        """Server-Timing ヘッダーの値"""
+        return (
+            f'db;dur={self.total_seconds * 1000:.3f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest_seconds * 1000:.3f}"
+        )
+
+
+# スレッドプール（run_in_threadpool）や run_sync にもコンテキストごと引き継がれる
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # 開始時刻は文ごとの実行コンテキストに持たせる（接続に積むとエラー時に取り出されず対応がずれる）
+    if context is not None:
+        context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    _record(context, statement)
+
+
+def _handle_error(exception_context) -> None:
+    # エラーになった文は after_cursor_execute が呼ばれないため、ここで記録する
+    _record(exception_context.execution_context, exception_context.statement)
+
+
+def _record(context, statement: str | None) -> None:
+    start = getattr(context, "_query_start_time", None)
+    stats = _current.get()
+    if start is not None and stats is not None:
+        stats.record(statement or "", time.perf_counter() - start)
+
+
+def instrument(target: Engine) -> None:
+    """エンジンが発行する SQL を、実行中のリクエストの QueryStats に記録する
+
+    非同期エンジンの場合は sync_engine を渡す。エラーになった SQL も件数・DB時間に含める。
+    """
+    if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target, "after_cursor_execute", _after_cursor_execute)
+        event.listen(target, "handle_error", _handle_error)
+
+
+class QueryStatsMiddleware:
+    """リクエストごとのクエリ数・DB時間を Server-Timing ヘッダーとログに出力する
+
+    ヘッダーはレスポンス開始時点までの値（ストリーミング中の SQL は含まない）、
+    ログはレスポンス完了後の値を出力する。DB時間の合計が slow_ms 以上の場合は WARNING とする。
+    """
+
+    def __init__(self, app: ASGIApp, slow_ms: float = 0) -> None:
+        self.app = app
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 0
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        stats = QueryStats()
+        token = _current.set(stats)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._log(scope, status_code, stats)
+
+    def _log(self, scope: Scope, status_code: int, stats: QueryStats) -> None:
+        db_ms = stats.total_seconds * 1000
+        slow = self.slow_ms > 0 and db_ms >= self.slow_ms
+        level = logging.WARNING if slow else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        fields: dict[str, Any] = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "status_code": status_code,
+            "db_queries": stats.count,
+            "db_ms": round(db_ms, 3),
+            "db_slowest_ms": round(stats.slowest_seconds * 1000, 3),
+            "db_slowest_statement": stats.slowest_statement,
+        }
+        logger.log(
+            level,
+            "%(method)s %(path)s %(status_code)d db_queries=%(db_queries)d db_ms=%(db_ms).3f "
+            "db_slowest_ms=%(db_slowest_ms).3f",
+            fields,
+            extra=fields,
+        )
@@ -0,0 +1,38 @@
+from collections.abc import Mapping
+from typing import Any
+
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import BaseModel
+
+from app.config import settings
+
+
+def model_response(
+    model: BaseModel,
+    status_code: int = 200,
+    headers: Mapping[str, str] | None = None,
+    **dump_options: Any,
+) -> Response:
+    """構築済みのレスポンスモデルを、そのまま JSON のバイト列にして返す
+
+    FastAPI は response_model による再検証と dict への変換、JSON エンコードを順に行うため、
+    件数の多い一覧ではモデルの構築（1回の検証）と model_dump_json だけで済ませる。
+    response_model は OpenAPI のスキーマ用にエンドポイント側で指定しておく。
+    dump_options は model_dump_json にそのまま渡す（include など）。
+    """
+    return Response(
+        content=model.model_dump_json(**dump_options),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+def get_default_response_class() -> type[Response]:
+    """設定に応じた FastAPI のデフォルトレスポンスクラス"""
+    if settings.json_response_class == "orjson":
+        # orjson はオプション依存のため、未インストールの場合は起動時にエラーにする
+        import orjson  # noqa: F401
+
+        return ORJSONResponse
+    return JSONResponse
@@ -1,9 +1,5 @@
 from fastapi import APIRouter, BackgroundTasks, Cookie, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import select
-from sqlalchemy.orm import Session
-
-from psycopg2 import errors as psycopg2_errors
 
 from app.auth import (
     ACCESS_TOKEN_EXPIRES,
@@ -13,14 +9,14 @@ from app.auth import (
     clear_refresh_cookie,
     create_token,
     get_current_user_id,
+    password_hash_pool,
     set_refresh_cookie,
-    verify_password,
     verify_token,
 )
+from app.cache import user_cache
 from app.crud import user as user_crud
-from app.database import get_db
+from app.database import DbSession, get_db, run_db
 from app.email import send_password_reset_email
-from app.models.user import User
 from app.schemas.auth import (
     LoginResponse,
     PasswordResetConfirm,
@@ -35,10 +31,11 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/signup", response_model=UserResponse, status_code=201)
-def signup(user_data: UserCreate, db: Session = Depends(get_db)):
+async def signup(user_data: UserCreate, db: DbSession = Depends(get_db)):
+    hashed_password = await password_hash_pool.hash(user_data.password)
     try:
-        return user_crud.create_user(db, user_data)
-    except psycopg2_errors.UniqueViolation:
+        return await run_db(db, user_crud.create_user, user_data, hashed_password)
+    except user_crud.DuplicateUserError:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Username or email already registered",
@@ -46,18 +43,27 @@ def signup(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=LoginResponse)
-def login(
+async def login(
     response: Response,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
 ):
-    user = user_crud.get_user_by_email(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await run_db(db, user_crud.get_user_by_email, form_data.username)
+    valid, updated_hash = False, None
+    if user:
+        valid, updated_hash = await password_hash_pool.verify_and_update(
+            form_data.password, user.hashed_password
+        )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    # bcrypt のコスト設定が変わっていれば、ログイン時にハッシュを更新する
+    if updated_hash:
+        user = await run_db(db, user_crud.update_password, user, updated_hash)
+        await user_cache.invalidate(user.id)
     access_token = create_token(user.id, TokenType.ACCESS, ACCESS_TOKEN_EXPIRES)
     refresh_token = create_token(user.id, TokenType.REFRESH, REFRESH_TOKEN_EXPIRES)
     set_refresh_cookie(response, refresh_token)
@@ -68,7 +74,7 @@ def login(
 
 
 @router.post("/refresh", response_model=Token)
-def refresh(
+async def refresh(
     response: Response,
     refresh_token: str | None = Cookie(default=None),
 ):
@@ -85,41 +91,50 @@ def refresh(
 
 
 @router.post("/logout", status_code=204)
-def logout(response: Response):
+async def logout(response: Response):
     clear_refresh_cookie(response)
 
 
 @router.get("/me", response_model=UserResponse)
-def get_me(
+async def get_me(
     user_id: int = Depends(get_current_user_id),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
 ):
-    user = db.scalars(select(User).where(User.id == user_id)).first()
+    # キャッシュヒット時はDBに問い合わせない（セッションも接続を取得しない）
+    cached, generation = await user_cache.get(user_id)
+    if cached is not None:
+        return cached
+    user = await run_db(db, user_crud.get_user, user_id)
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    return user
+    user_response = UserResponse.model_validate(user)
+    # 読み込み中に更新（無効化）された場合は保存されない
+    await user_cache.set(user_response, generation)
+    return user_response
 
 
 @router.put("/me", response_model=UserResponse)
-def update_me(
+async def update_me(
     user_data: UsernameUpdate,
     user_id: int = Depends(get_current_user_id),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
 ):
-    user = db.scalars(select(User).where(User.id == user_id)).first()
+    user = await run_db(db, user_crud.get_user, user_id)
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     try:
-        return user_crud.update_username(db, user, user_data.username)
-    except psycopg2_errors.UniqueViolation:
+        user = await run_db(db, user_crud.update_username, user, user_data.username)
+    except user_crud.DuplicateUserError:
         raise HTTPException(status_code=409, detail="Username already taken")
+    await user_cache.invalidate(user.id)
+    return user
 
 
 @router.post("/password-reset/request", status_code=202)
-def request_password_reset(
-    data: PasswordResetRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)
+async def request_password_reset(
+    data: PasswordResetRequest, background_tasks: BackgroundTasks, db: DbSession = Depends(get_db)
 ):
-    user = user_crud.get_user_by_email(db, data.email)
+    user = await run_db(db, user_crud.get_user_by_email, data.email)
     if user:
         token = create_token(user.id, TokenType.PASSWORD_RESET, PASSWORD_RESET_TOKEN_EXPIRES)
         background_tasks.add_task(send_password_reset_email, user.email, token)
@@ -127,12 +142,14 @@ def request_password_reset(
 
 
 @router.post("/password-reset/confirm")
-def confirm_password_reset(
-    data: PasswordResetConfirm, db: Session = Depends(get_db)
+async def confirm_password_reset(
+    data: PasswordResetConfirm, db: DbSession = Depends(get_db)
 ):
     user_id = verify_token(data.token, TokenType.PASSWORD_RESET)
-    user = db.scalars(select(User).where(User.id == user_id)).first()
+    user = await run_db(db, user_crud.get_user, user_id)
     if not user:
         raise HTTPException(status_code=400, detail="Invalid or expired token")
-    user_crud.update_password(db, user, data.new_password)
+    hashed_password = await password_hash_pool.hash(data.new_password)
+    await run_db(db, user_crud.update_password, user, hashed_password)
+    await user_cache.invalidate(user.id)
     return {"message": "Password reset successful"}
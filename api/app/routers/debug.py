@@ -0,0 +1,66 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.auth import require_admin
+from app.profiler import profiler
+from app.schemas.debug import ProfilerConfig
+
+
+def require_profiler() -> None:
+    if not profiler.enabled:
+        raise HTTPException(status_code=404, detail="Profiler is disabled")
+
+
+router = APIRouter(
+    prefix="/debug",
+    tags=["debug"],
+    include_in_schema=False,
+    dependencies=[Depends(require_admin)],
+)
+
+
+def _profiler_config() -> ProfilerConfig:
+    return ProfilerConfig(
+        enabled=profiler.enabled, sample_rate=profiler.sample_rate, routes=sorted(profiler.route_filter)
+    )
+
+
+@router.get("/profiler", response_model=ProfilerConfig)
+async def get_profiler_config():
+    """このワーカーのサンプリングプロファイラの設定"""
+    return _profiler_config()
+
+
+@router.put("/profiler", response_model=ProfilerConfig)
+async def update_profiler_config(config: ProfilerConfig):
+    """このワーカーのサンプリングプロファイラを再起動せずに有効・無効にする
+
+    設定・集計はワーカー単位のため、複数ワーカーではリクエストを受けたワーカーにだけ反映される。
+    """
+    profiler.configure(config.enabled, config.sample_rate, set(config.routes))
+    return _profiler_config()
+
+
+@router.get("/profile", response_class=PlainTextResponse, dependencies=[Depends(require_profiler)])
+async def get_profile(
+    route: str | None = Query(default=None, description="ルート（例: GET /tasks）。省略時は全ルート"),
+    reset: bool = Query(default=False, description="取得後に集計をリセットする"),
+):
+    """サンプリングプロファイラで集計したスタック（collapsed 形式。flamegraph.pl や speedscope で表示できる）
+
+    X-Profile-Samples ヘッダーは採取回数、X-Profile-Routes ヘッダーは集計済みのルート。
+    """
+    lines = list(profiler.collapsed(route))
+    headers = {
+        "X-Profile-Samples": str(profiler.samples),
+        "X-Profile-Routes": ", ".join(profiler.routes()),
+    }
+    if reset:
+        profiler.clear()
+    return PlainTextResponse("".join(f"{line}\n" for line in lines), headers=headers)
+
+
+@router.delete("/profile", status_code=204, dependencies=[Depends(require_profiler)])
+async def clear_profile():
+    """集計をリセットする"""
+    profiler.clear()
@@ -0,0 +1,103 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+import psycopg2
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordBearer
+
+from app.auth import EVENTS_TICKET_EXPIRES, TokenType, create_token, get_current_user_id, verify_token
+from app.config import settings
+from app.events import EventBroker, event_broker
+from app.schemas.auth import EventsTicket
+
+router = APIRouter(tags=["events"])
+
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
+
+
+async def get_event_user_id(
+    token: str | None = Depends(optional_oauth2_scheme),
+    ticket: str | None = Query(default=None),
+) -> int:
+    """Authorization ヘッダーのアクセストークン、またはクエリパラメータのチケットで認証する
+
+    EventSource はヘッダーを付けられないため、URL で認証情報を渡す必要がある。URL はアクセスログ・
+    プロキシ・ブラウザの履歴に残るため、アクセストークンは受け付けず、GET /events にしか使えない
+    有効期限の短いチケット（POST /events/ticket）だけを受け付ける。
+    """
+    if token is not None:
+        return verify_token(token, TokenType.ACCESS)
+    if ticket is not None:
+        return verify_token(ticket, TokenType.EVENTS_TICKET)
+    raise HTTPException(
+        status_code=401,
+        detail="Not authenticated",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def format_event(event: dict[str, Any]) -> str:
+    """SSE 形式のメッセージに変換する（event 名はエンティティ種別）"""
+    return f"event: {event['entity']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def event_stream(broker: EventBroker, user_id: int) -> AsyncIterator[str]:
+    """購読者のキューからイベントを送り出す（一定時間イベントがなければハートビートを送る）
+
+    購読はレスポンスの送信開始時に登録し、終了時（切断を含む）に解除する。エンドポイントで登録すると、
+    送信を始める前に切断された場合に解除されず、購読が残り続けるため。
+    """
+    subscriber = await broker.subscribe(user_id)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscriber.queue.get(), timeout=settings.events_heartbeat_seconds
+                )
+            except TimeoutError:
+                # 切断済みの接続を検出し、プロキシのアイドルタイムアウトも防ぐ
+                yield ": ping\n\n"
+                continue
+            yield format_event(event)
+    finally:
+        broker.unsubscribe(subscriber)
+
+
+@router.post("/events/ticket", response_model=EventsTicket)
+async def create_events_ticket(user_id: int = Depends(get_current_user_id)):
+    """GET /events の ticket パラメータに使うチケットを発行する
+
+    有効期限（EVENTS_TICKET_EXPIRES）は接続時にのみ検証するため、接続後のストリームは期限後も続く。
+    EventSource が期限後に再接続して 401 になった場合は、チケットを発行し直して接続する。
+    """
+    ticket = create_token(user_id, TokenType.EVENTS_TICKET, EVENTS_TICKET_EXPIRES)
+    return EventsTicket(ticket=ticket, expires_in=int(EVENTS_TICKET_EXPIRES.total_seconds()))
+
+
+@router.get("/events")
+async def stream_events(
+    user_id: int = Depends(get_event_user_id),
+):
+    """タスク・ステータスの変更イベントを Server-Sent Events で配信する
+
+    DBセッションは使わないため、接続中もコネクションプールを占有しない。
+    """
+    if not settings.events_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if event_broker.connections >= settings.events_max_connections:
+        raise HTTPException(
+            status_code=503, detail="Too many event stream connections", headers={"Retry-After": "5"}
+        )
+    try:
+        await event_broker.listen()
+    except psycopg2.Error:
+        raise HTTPException(status_code=503, detail="Event stream unavailable", headers={"Retry-After": "5"})
+    return StreamingResponse(
+        event_stream(event_broker, user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,139 @@
+import secrets
+from collections.abc import Iterator
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+
+from app import database
+from app.auth import password_hash_pool, require_admin
+from app.cache import user_cache
+from app.config import settings
+from app.events import event_broker
+from app.http_metrics import METRICS_PORT_SCOPE_KEY, http_metrics, render_metric
+from app.schemas.metrics import (
+    DbPoolMetricsResponse,
+    EventStreamMetricsResponse,
+    PasswordHashMetricsResponse,
+    UserCacheMetricsResponse,
+)
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# JSON のメトリクス（内部のプール・キャッシュの状態）は管理者のみ。公開の API ドキュメントにも載せない
+ADMIN_ONLY = {"include_in_schema": False, "dependencies": [Depends(require_admin)]}
+
+# (メトリクス名, 説明, 種類, pool_status のキー)
+DB_POOL_METRICS = [
+    ("db_pool_size", "Configured connection pool size.", "gauge", "size"),
+    ("db_pool_checked_out", "Connections currently checked out.", "gauge", "checked_out"),
+    ("db_pool_overflow", "Overflow connections currently open.", "gauge", "overflow"),
+    ("db_pool_checkouts_total", "Total connection checkouts.", "counter", "checkout_count"),
+    (
+        "db_pool_checkout_wait_seconds_total",
+        "Total time spent waiting for a connection.",
+        "counter",
+        "checkout_wait_seconds_total",
+    ),
+    (
+        "db_pool_checkout_wait_seconds_max",
+        "Longest wait for a connection.",
+        "gauge",
+        "checkout_wait_seconds_max",
+    ),
+]
+
+
+def require_metrics_access(request: Request, authorization: str | None = Header(default=None)) -> None:
+    """GET /metrics はメトリクス用ポート（METRICS_PORT）か、METRICS_TOKEN の Bearer トークンでのみ許可する
+
+    DB コネクションプールの状態など、/metrics/db-pool と同じ運用情報を含むため、API のポートでは認証なしに返さない。
+    """
+    if request.scope.get(METRICS_PORT_SCOPE_KEY):
+        return
+    if settings.metrics_token and authorization:
+        expected = f"Bearer {settings.metrics_token}"
+        if secrets.compare_digest(authorization.encode(), expected.encode()):
+            return
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Not authenticated",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _db_pool_lines() -> Iterator[str]:
+    pools = {"sync": database.pool_status(database.engine, database.pool_wait_stats)}
+    if database.async_engine is not None:
+        pools["async"] = database.pool_status(
+            database.async_engine.sync_engine, database.async_pool_wait_stats
+        )
+    for name, help_text, kind, key in DB_POOL_METRICS:
+        yield from render_metric(
+            name, help_text, kind, (({"engine": engine}, stats[key]) for engine, stats in pools.items())
+        )
+
+
+@router.get(
+    "", response_class=PlainTextResponse, include_in_schema=False, dependencies=[Depends(require_metrics_access)]
+)
+async def get_prometheus_metrics():
+    """ルートごとのリクエスト数・レイテンシ・処理中の件数と DB コネクションプール（Prometheus のテキスト形式）
+
+    メトリクス用ポート、または METRICS_TOKEN を Bearer トークンに指定した場合のみ返す。
+    値はワーカー（プロセス）単位。複数ワーカーの場合は METRICS_PORT のワーカーごとのポートから収集し、
+    Prometheus 側で集約する（共有のポートではどのワーカーが応答するか決まらない）。
+    """
+    lines = [*http_metrics.render(), *_db_pool_lines()]
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@router.get("/db-pool", response_model=DbPoolMetricsResponse, **ADMIN_ONLY)
+async def get_db_pool_metrics():
+    """DBコネクションプールの使用状況（使用中・オーバーフロー・取得待ち時間）"""
+    async_stats = None
+    if database.async_engine is not None:
+        async_stats = database.pool_status(
+            database.async_engine.sync_engine, database.async_pool_wait_stats
+        )
+    return DbPoolMetricsResponse(
+        sync_engine=database.pool_status(database.engine, database.pool_wait_stats),
+        async_engine=async_stats,
+    )
+
+
+@router.get("/user-cache", response_model=UserCacheMetricsResponse, **ADMIN_ONLY)
+async def get_user_cache_metrics():
+    """/auth/me 用ユーザー情報キャッシュのヒット・ミス数"""
+    return UserCacheMetricsResponse(
+        backend=type(user_cache.backend).__name__,
+        enabled=user_cache.enabled,
+        hits=user_cache.hits,
+        misses=user_cache.misses,
+        errors=user_cache.errors,
+    )
+
+
+@router.get("/password-hashing", response_model=PasswordHashMetricsResponse, **ADMIN_ONLY)
+async def get_password_hashing_metrics():
+    """パスワードハッシュ計算プールの実行中・待ち行列の件数"""
+    return PasswordHashMetricsResponse(
+        workers=password_hash_pool.workers,
+        max_concurrency=password_hash_pool.max_concurrency,
+        in_flight=password_hash_pool.in_flight,
+        waiting=password_hash_pool.waiting,
+        completed=password_hash_pool.completed,
+    )
+
+
+@router.get("/events", response_model=EventStreamMetricsResponse, **ADMIN_ONLY)
+async def get_event_stream_metrics():
+    """SSE の接続数と、受信した通知数・キューあふれで破棄したイベント数"""
+    return EventStreamMetricsResponse(
+        enabled=settings.events_enabled,
+        listening=event_broker.listening,
+        connections=event_broker.connections,
+        users=event_broker.users,
+        received=event_broker.received,
+        dropped=event_broker.dropped,
+    )
@@ -1,88 +1,136 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 
+from app import etag
 from app.auth import get_current_user_id
-from app.database import get_db
+from app.database import DbSession, get_db, run_db
 from app.crud import status as status_crud
 from app.models.status import Status
+from app.responses import model_response
 from app.schemas.status import (
-    StatusCreate, StatusUpdate, StatusReorder,
+    StatusCreate, StatusUpdate, StatusReorder, StatusMove,
     StatusResponse, StatusListResponse,
 )
 
 router = APIRouter(prefix="/statuses", tags=["statuses"])
 
 
-def get_status_or_404(
+async def get_status_or_404(
     status_id: int,
     user_id: int = Depends(get_current_user_id),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
 ) -> Status:
-    status = status_crud.get_status(db, status_id, user_id=user_id)
+    status = await run_db(db, status_crud.get_status, status_id, user_id=user_id)
     if status is None:
         raise HTTPException(status_code=404, detail="Status not found")
     return status
 
 
 @router.get("", response_model=StatusListResponse)
-def list_statuses(
+async def list_statuses(
+    if_none_match: str | None = Header(default=None),
     user_id: int = Depends(get_current_user_id),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
 ):
-    statuses = status_crud.get_statuses(db, user_id=user_id)
-    return StatusListResponse(statuses=statuses)
+    # 一覧を読み込む前に、変更回数だけで変更の有無を判定する
+    version = await run_db(db, status_crud.get_statuses_version, user_id)
+    list_etag = etag.make_etag("statuses", version)
+    if etag.none_match(if_none_match, list_etag):
+        return etag.not_modified(list_etag)
+    statuses = await run_db(db, status_crud.get_statuses, user_id=user_id)
+    return model_response(StatusListResponse(statuses=statuses), headers=etag.etag_headers(list_etag))
 
 
 @router.get("/{status_id}", response_model=StatusResponse)
-def get_status(
+async def get_status(
     status: Status = Depends(get_status_or_404),
 ):
     return status
 
 
 @router.post("", response_model=StatusResponse, status_code=201)
-def create_status(
+async def create_status(
     status_data: StatusCreate,
     user_id: int = Depends(get_current_user_id),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
 ):
-    return status_crud.create_status(db, status_data, user_id=user_id)
+    return await run_db(db, status_crud.create_status, status_data, user_id=user_id)
 
 
 @router.put("/reorder", response_model=StatusListResponse)
-def reorder_statuses(
+async def reorder_statuses(
     reorder_data: StatusReorder,
     user_id: int = Depends(get_current_user_id),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
 ):
-    all_ids = {s.id for s in status_crud.get_statuses(db, user_id=user_id)}
-    request_ids = set(reorder_data.order)
-    if request_ids != all_ids:
-        raise HTTPException(
-            status_code=400,
-            detail="全てのステータスIDを過不足なく指定してください",
-        )
-    statuses = status_crud.reorder_statuses(db, reorder_data.order, user_id=user_id)
-    return StatusListResponse(statuses=statuses)
+    # 過不足のチェックは更新と同じ1文の中で行う
+    invalid = HTTPException(
+        status_code=400,
+        detail="全てのステータスIDを過不足なく指定してください",
+    )
+    if len(set(reorder_data.order)) != len(reorder_data.order):
+        raise invalid
+    statuses = await run_db(
+        db, status_crud.reorder_statuses, reorder_data.order, user_id=user_id
+    )
+    if statuses is None:
+        raise invalid
+    return model_response(StatusListResponse(statuses=statuses))
+
+
+@router.put("/{status_id}/move", response_model=StatusResponse)
+async def move_status(
+    move_data: StatusMove,
+    status: Status = Depends(get_status_or_404),
+    user_id: int = Depends(get_current_user_id),
+    db: DbSession = Depends(get_db),
+):
+    after = None
+    if move_data.after_id is not None:
+        if move_data.after_id == status.id:
+            raise HTTPException(
+                status_code=400,
+                detail="移動先に自身を指定することはできません",
+            )
+        after = await run_db(db, status_crud.get_status, move_data.after_id, user_id=user_id)
+        if after is None:
+            raise HTTPException(status_code=404, detail="Status not found")
+    return await run_db(db, status_crud.move_status, status, after)
 
 
 @router.put("/{status_id}", response_model=StatusResponse)
-def update_status(
+async def update_status(
     status_data: StatusUpdate,
     status: Status = Depends(get_status_or_404),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
 ):
-    return status_crud.update_status(db, status, status_data)
+    return await run_db(db, status_crud.update_status, status, status_data)
 
 
 @router.delete("/{status_id}", status_code=204)
-def delete_status(
-    status: Status = Depends(get_status_or_404),
-    db: Session = Depends(get_db),
+async def delete_status(
+    status_id: int,
+    reassign_to: int | None = Query(
+        default=None, description="削除前に紐付くタスクを付け替えるステータスID"
+    ),
+    user_id: int = Depends(get_current_user_id),
+    db: DbSession = Depends(get_db),
 ):
-    if status_crud.has_tasks_with_status(db, status.id):
+    """ステータス削除
+
+    紐付くタスクがある場合は 409 を返す。reassign_to を指定した場合は、
+    タスクをそのステータスへまとめて付け替えてから削除する。
+    """
+    if reassign_to == status_id:
+        raise HTTPException(
+            status_code=400,
+            detail="付け替え先に削除するステータスを指定することはできません",
+        )
+    try:
+        await run_db(db, status_crud.delete_status, status_id, user_id, reassign_to=reassign_to)
+    except status_crud.StatusNotFoundError:
+        raise HTTPException(status_code=404, detail="Status not found")
+    except status_crud.StatusInUseError:
         raise HTTPException(
             status_code=409,
             detail="このステータスに紐付くタスクが存在するため削除できません",
         )
-    status_crud.delete_status(db, status)
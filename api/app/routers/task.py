@@ -1,91 +1,336 @@
 from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
+from app import etag, task_io
 from app.auth import get_current_user_id
-from app.database import get_db
+from app.cache import task_stats_cache
+from app.database import DbSession, get_db, run_db, stream_db
 from app.crud import task as task_crud
 from app.crud import status as status_crud
 from app.models.task import Task
-from app.schemas.common import SortOrder
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, TaskListResponse
+from app.profiler import profiled
+from app.responses import model_response
+from app.schemas.common import ExportFormat, SortOrder, StatsInterval, TaskSortKey
+from app.schemas.task import (
+    TASK_FIELDS, TaskCreate, TaskUpdate, TaskResponse, TaskListResponse,
+    TaskPartialListResponse, TaskBulkRequest, TaskBulkResponse, TaskChangesResponse,
+    TaskImportResponse, TaskStatsResponse,
+)
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# エクスポート時に1回のフェッチで取得する件数
+EXPORT_BATCH_SIZE = 1000
 
-def get_task_or_404(
+
+async def get_task_or_404(
     task_id: int,
     user_id: int = Depends(get_current_user_id),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
 ) -> Task:
     """タスク取得（存在しない場合は404）"""
-    task = task_crud.get_task(db, task_id, user_id=user_id)
+    task = await run_db(db, task_crud.get_task, task_id, user_id=user_id)
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
 
 
+def task_etag(task: Task) -> str:
+    """タスク単体の ETag（更新日時から生成）"""
+    return etag.make_etag("task", task.id, task.updated_at.isoformat())
+
+
+def parse_fields(fields: str | None) -> set[str] | None:
+    """fields パラメータ（カンマ区切り）を項目名の集合にする（ID は常に含める）"""
+    if fields is None:
+        return None
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    if not names <= set(TASK_FIELDS):
+        raise HTTPException(status_code=400, detail="Invalid fields")
+    return names | {"id"}
+
+
+def task_list_response(
+    tasks: list, next_cursor: str | None, fields: set[str] | None, headers: dict[str, str]
+) -> Response:
+    """タスク一覧のレスポンス（fields 指定時は指定した項目のみ出力する）"""
+    if fields is None:
+        return model_response(TaskListResponse(tasks=tasks, next_cursor=next_cursor), headers=headers)
+    # カーソル生成用に取得した項目も含め、指定されなかった項目は出力しない
+    return model_response(
+        TaskPartialListResponse(tasks=tasks, next_cursor=next_cursor),
+        headers=headers,
+        include={"tasks": {"__all__": fields}, "next_cursor": True},
+    )
+
+
 @router.get("", response_model=TaskListResponse)
-def list_tasks(
+async def list_tasks(
     order: SortOrder = Query(default=SortOrder.desc),
     q: str | None = Query(default=None),
+    sort: TaskSortKey = Query(default=TaskSortKey.due_date),
     due_date_from: date | None = Query(default=None),
     due_date_to: date | None = Query(default=None),
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None),
+    fields: str | None = Query(
+        default=None,
+        description=(
+            "返す項目（カンマ区切り。例: title,due_date,status_id）。"
+            "指定した項目と id のみを返す（一覧表示で content を省く場合など）"
+        ),
+    ),
+    if_none_match: str | None = Header(default=None),
     user_id: int = Depends(get_current_user_id),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
 ):
-    """タスク一覧取得（締切日でソート）"""
-    tasks = task_crud.get_tasks(
-        db,
+    """タスク一覧取得（締切日でソート）
+
+    limit または cursor を指定した場合はカーソルページネーションで返す。
+    sort=relevance を指定した場合は q との関連度順で返す（q が必須。ページネーション不可）。
+    タスクに変更がなく If-None-Match が ETag と一致する場合は 304 を返す。
+    """
+    if sort == TaskSortKey.relevance and not q:
+        raise HTTPException(status_code=422, detail="sort=relevance requires q")
+    selected = parse_fields(fields)
+    filters = dict(
         user_id=user_id,
         order=order,
         keyword=q,
         due_date_from=due_date_from,
         due_date_to=due_date_to,
     )
-    return TaskListResponse(tasks=tasks)
+    # 一覧を読み込む前に、変更回数だけで変更の有無を判定する
+    version = await run_db(db, task_crud.get_tasks_version, user_id)
+    list_etag = etag.make_etag(
+        "tasks", version, sorted(filters.items()), sort, limit, cursor, sorted(selected or ())
+    )
+    if etag.none_match(if_none_match, list_etag):
+        return etag.not_modified(list_etag)
+    headers = etag.etag_headers(list_etag)
+
+    if limit is None and cursor is None:
+        tasks = await run_db(db, task_crud.get_tasks, sort=sort, fields=selected, **filters)
+        return task_list_response(tasks, None, selected, headers)
+
+    if sort == TaskSortKey.relevance:
+        raise HTTPException(
+            status_code=400,
+            detail="Cursor pagination is not supported with sort=relevance",
+        )
+    try:
+        tasks, next_cursor = await run_db(
+            db,
+            task_crud.get_tasks_page,
+            limit=limit or DEFAULT_PAGE_SIZE,
+            cursor=cursor,
+            fields=selected,
+            **filters,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return task_list_response(tasks, next_cursor, selected, headers)
+
+
+@router.get("/changes", response_model=TaskChangesResponse)
+async def list_task_changes(
+    since: str | None = Query(default=None, description="前回レスポンスの next_token"),
+    user_id: int = Depends(get_current_user_id),
+    db: DbSession = Depends(get_db),
+):
+    """差分同期（since 以降に作成・更新されたタスクと削除されたタスクIDを返す）
+
+    since を省略した場合は全タスクを返す。同期トークンが古すぎる場合は 410 を返すため、
+    クライアントは since なしで全件を取得し直す。
+    """
+    try:
+        tasks, deleted, next_token = await run_db(db, task_crud.get_task_changes, user_id, since)
+    except task_crud.SyncTokenExpiredError:
+        raise HTTPException(status_code=410, detail="Sync token expired")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+    return model_response(TaskChangesResponse(tasks=tasks, deleted=deleted, next_token=next_token))
+
+
+@router.get("/stats", response_model=TaskStatsResponse)
+async def get_task_stats(
+    interval: StatsInterval = Query(default=StatsInterval.week),
+    today: date | None = Query(
+        default=None, description="期限切れの基準日（クライアントの日付。省略時はサーバーの日付）"
+    ),
+    due_date_from: date | None = Query(default=None),
+    due_date_to: date | None = Query(default=None),
+    user_id: int = Depends(get_current_user_id),
+    db: DbSession = Depends(get_db),
+):
+    """タスクの集計（ステータスごとの件数・期限切れ件数・締切日ヒストグラム）
+
+    結果はユーザーごとに短時間キャッシュし、タスクの作成・更新・削除時に破棄する。
+    """
+    today = today or date.today()
+    params = dict(today=today, interval=interval.value, due_date_from=due_date_from, due_date_to=due_date_to)
+    key = task_stats_cache.key(user_id, *params.values())
+    stats = task_stats_cache.get(key)
+    if stats is None:
+        stats = TaskStatsResponse(**await run_db(db, task_crud.get_task_stats, user_id, **params))
+        task_stats_cache.set(key, stats)
+    return model_response(stats)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media_type: {} for media_type in task_io.MEDIA_TYPES.values()}}},
+)
+async def export_tasks(
+    format: ExportFormat = Query(default=ExportFormat.csv),
+    q: str | None = Query(default=None),
+    due_date_from: date | None = Query(default=None),
+    due_date_to: date | None = Query(default=None),
+    user_id: int = Depends(get_current_user_id),
+    db: DbSession = Depends(get_db),
+):
+    """タスクのエクスポート（CSV / NDJSON。締切日の昇順）
+
+    サーバーサイドカーソルで EXPORT_BATCH_SIZE 件ずつ取得しながら書き出すため、
+    タスク数によらずメモリ使用量は一定。一覧と同じ q / due_date_from / due_date_to で絞り込める。
+    """
+    query = task_crud.build_export_query(
+        user_id, keyword=q, due_date_from=due_date_from, due_date_to=due_date_to
+    )
+    encode = task_io.ENCODERS[format]
+    return StreamingResponse(
+        encode(stream_db(db, query, EXPORT_BATCH_SIZE)),
+        media_type=task_io.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format.value}"'},
+    )
+
+
+@router.post(
+    "/import",
+    response_model=TaskImportResponse,
+    responses={422: {"model": TaskImportResponse, "description": "エラー行があり何も登録しなかった"}},
+)
+async def import_tasks(
+    file: UploadFile,
+    format: ExportFormat = Query(default=ExportFormat.csv),
+    skip_invalid: bool = Query(default=False, description="true の場合はエラー行を除いて登録する"),
+    user_id: int = Depends(get_current_user_id),
+    db: DbSession = Depends(get_db),
+):
+    """タスクのインポート（CSV / NDJSON。エクスポートと同じ形式）
+
+    アップロードされたファイルを1行ずつ読みながら検証し、まとめて登録する（1トランザクション）。
+    ステータスは status（名前）または status_id で指定する。
+    エラー行がある場合、skip_invalid=false（デフォルト）では何も登録せず 422 でエラー行を返す。
+    """
+    statuses = await run_db(db, task_crud.get_import_statuses, user_id)
+    validator = task_crud.TaskImportValidator(user_id, statuses, skip_invalid=skip_invalid)
+    rows = task_io.READERS[format](file.file)
+    try:
+        # ファイルの読み込み・検証はスレッドプールで行い（DB_ASYNC=true の run_db はイベントループ上で実行されるため）、
+        # DB には検証済みのバッチだけを渡す
+        while batch := await run_in_threadpool(profiled(validator.validate), rows, task_crud.IMPORT_BATCH_SIZE):
+            await run_db(db, task_crud.insert_tasks, batch)
+    except ValueError:
+        # 登録済みのバッチはセッションを閉じるときに取り消される
+        raise HTTPException(status_code=400, detail=f"Invalid {format.value} file (must be UTF-8)")
+    result = await run_db(db, task_crud.finish_import, validator)
+    status_code = 422 if result["error_count"] and not skip_invalid else 200
+    return model_response(TaskImportResponse(**result), status_code=status_code)
+
+
+@router.post("/bulk", response_model=TaskBulkResponse)
+async def bulk_tasks(
+    data: TaskBulkRequest,
+    user_id: int = Depends(get_current_user_id),
+    db: DbSession = Depends(get_db),
+):
+    """タスクの一括作成・更新・ステータス移動・削除（1トランザクション）
+
+    いずれかの操作が失敗した場合はすべての操作を取り消す。
+    """
+    # 参照されるステータスは1クエリでまとめて所有チェックする
+    status_ids = data.status_ids()
+    owned = await run_db(db, status_crud.get_owned_status_ids, status_ids, user_id=user_id)
+    if owned != status_ids:
+        raise HTTPException(status_code=404, detail="Status not found")
+    try:
+        result = await run_db(db, task_crud.bulk_tasks, user_id, data)
+    except task_crud.TaskNotFoundError:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return model_response(TaskBulkResponse(**result))
 
 
 @router.get("/{task_id}", response_model=TaskResponse)
-def get_task(
+async def get_task(
+    response: Response,
+    if_none_match: str | None = Header(default=None),
     task: Task = Depends(get_task_or_404),
 ):
-    """タスク詳細取得"""
+    """タスク詳細取得（If-None-Match が ETag と一致する場合は 304）"""
+    current = task_etag(task)
+    if etag.none_match(if_none_match, current):
+        return etag.not_modified(current)
+    etag.set_etag(response, current)
     return task
 
 
 @router.post("", response_model=TaskResponse, status_code=201)
-def create_task(
+async def create_task(
     task_data: TaskCreate,
     user_id: int = Depends(get_current_user_id),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
 ):
     """タスク作成"""
     # 存在しないステータス、または他ユーザーのステータスへの紐付けを防ぐ
-    if status_crud.get_status(db, task_data.status_id, user_id=user_id) is None:
+    if await run_db(db, status_crud.get_status, task_data.status_id, user_id=user_id) is None:
         raise HTTPException(status_code=404, detail="Status not found")
-    return task_crud.create_task(db, task_data, user_id=user_id)
+    return await run_db(db, task_crud.create_task, task_data, user_id=user_id)
 
 
 @router.put("/{task_id}", response_model=TaskResponse)
-def update_task(
+async def update_task(
     task_data: TaskUpdate,
+    response: Response,
+    if_match: str | None = Header(default=None),
     task: Task = Depends(get_task_or_404),
     user_id: int = Depends(get_current_user_id),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
 ):
-    """タスク更新"""
+    """タスク更新
+
+    If-Match を指定した場合は、ETag が一致するとき（他で更新されていないとき）のみ更新する。
+    """
+    precondition_failed = HTTPException(status_code=412, detail="Task has been modified")
+    if not etag.match(if_match, task_etag(task)):
+        raise precondition_failed
     # 存在しないステータス、または他ユーザーのステータスへの紐付けを防ぐ
-    if status_crud.get_status(db, task_data.status_id, user_id=user_id) is None:
+    if await run_db(db, status_crud.get_status, task_data.status_id, user_id=user_id) is None:
         raise HTTPException(status_code=404, detail="Status not found")
-    return task_crud.update_task(db, task, task_data)
+    try:
+        task = await run_db(
+            db,
+            task_crud.update_task,
+            task,
+            task_data,
+            expected_updated_at=task.updated_at if if_match is not None else None,
+        )
+    except task_crud.TaskModifiedError:
+        raise precondition_failed
+    etag.set_etag(response, task_etag(task))
+    return task
 
 
 @router.delete("/{task_id}", status_code=204)
-def delete_task(
+async def delete_task(
     task: Task = Depends(get_task_or_404),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
 ):
     """タスク削除"""
-    task_crud.delete_task(db, task)
+    await run_db(db, task_crud.delete_task, task)
@@ -24,6 +24,11 @@ class Token(BaseModel):
     token_type: str = "bearer"
 
 
+class EventsTicket(BaseModel):
+    ticket: str
+    expires_in: int  # 秒
+
+
 class LoginResponse(BaseModel):
     token: Token
     user: UserResponse
@@ -5,3 +5,22 @@ class SortOrder(str, Enum):
     """ソート順"""
     asc = "asc"
     desc = "desc"
+
+
+class TaskSortKey(str, Enum):
+    """タスク一覧のソートキー"""
+    due_date = "due_date"
+    relevance = "relevance"
+
+
+class ExportFormat(str, Enum):
+    """タスクのエクスポート・インポートの形式"""
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+class StatsInterval(str, Enum):
+    """締切日ヒストグラムの集計単位"""
+    day = "day"
+    week = "week"
+    month = "month"
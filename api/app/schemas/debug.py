@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+
+
+class ProfilerConfig(BaseModel):
+    """サンプリングプロファイラの設定（ワーカー単位）"""
+    enabled: bool
+    sample_rate: float = Field(..., ge=0, le=1)
+    # 計測するルート（パスのテンプレート。例: /tasks/{task_id}）。空の場合は全ルート
+    routes: list[str] = []
@@ -0,0 +1,47 @@
+from pydantic import BaseModel
+
+
+class DbPoolStats(BaseModel):
+    """コネクションプールの使用状況"""
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    max_overflow: int
+    checkout_count: int
+    checkout_wait_seconds_total: float
+    checkout_wait_seconds_max: float
+
+
+class DbPoolMetricsResponse(BaseModel):
+    """コネクションプールのメトリクスレスポンス用スキーマ"""
+    sync_engine: DbPoolStats
+    async_engine: DbPoolStats | None = None
+
+
+class UserCacheMetricsResponse(BaseModel):
+    """ユーザー情報キャッシュのメトリクスレスポンス用スキーマ"""
+    backend: str
+    enabled: bool
+    hits: int
+    misses: int
+    errors: int  # バックエンドのエラー数（エラー時はキャッシュを使わず DB から取得する）
+
+
+class PasswordHashMetricsResponse(BaseModel):
+    """パスワードハッシュ計算プールのメトリクスレスポンス用スキーマ"""
+    workers: int
+    max_concurrency: int
+    in_flight: int
+    waiting: int
+    completed: int
+
+
+class EventStreamMetricsResponse(BaseModel):
+    """SSE（GET /events）のメトリクスレスポンス用スキーマ（ワーカー単位）"""
+    enabled: bool
+    listening: bool
+    connections: int
+    users: int
+    received: int
+    dropped: int
@@ -24,6 +24,13 @@ class StatusReorder(BaseModel):
     order: list[int] = Field(..., min_length=1, description="並び順のステータスIDリスト")
 
 
+class StatusMove(BaseModel):
+    """ステータス移動用スキーマ"""
+    after_id: int | None = Field(
+        default=None, description="移動先の直前に来るステータスID（null の場合は先頭へ移動）"
+    )
+
+
 class StatusResponse(StatusBase):
     """ステータスレスポンス用スキーマ"""
     id: int
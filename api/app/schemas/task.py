@@ -1,6 +1,13 @@
 from datetime import date, datetime
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+from app.schemas.common import StatsInterval
+
+# 一括操作で1リクエストに含められる操作数の上限
+BULK_MAX_OPERATIONS = 1000
+# インポート結果に含めるエラー行数の上限（それ以降は error_count にのみ数える）
+IMPORT_MAX_ERRORS = 100
 
 
 class TaskBase(BaseModel):
@@ -33,3 +40,143 @@ class TaskResponse(TaskBase):
 class TaskListResponse(BaseModel):
     """タスク一覧レスポンス用スキーマ"""
     tasks: list[TaskResponse]
+    next_cursor: str | None = Field(
+        default=None,
+        description="次ページ取得用カーソル（limit 指定時のみ。最終ページでは null）",
+    )
+
+
+# タスク一覧の fields パラメータで指定できる項目
+TASK_FIELDS = tuple(TaskResponse.model_fields)
+
+
+class TaskPartialResponse(BaseModel):
+    """項目を絞ったタスクレスポンス用スキーマ（一覧の fields 指定時）"""
+    id: int
+    title: str | None = None
+    content: str | None = None
+    due_date: date | None = None
+    status_id: int | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+    model_config = {"from_attributes": True}
+
+
+class TaskPartialListResponse(BaseModel):
+    """項目を絞ったタスク一覧レスポンス用スキーマ"""
+    tasks: list[TaskPartialResponse]
+    next_cursor: str | None = None
+
+
+class TaskBulkUpdate(TaskUpdate):
+    """一括更新用スキーマ（更新対象のタスクIDを含む）"""
+    id: int
+
+
+class TaskBulkMove(BaseModel):
+    """一括ステータス移動用スキーマ"""
+    task_ids: list[int] = Field(..., min_length=1)
+    status_id: int
+
+
+class TaskBulkRequest(BaseModel):
+    """タスク一括操作リクエスト用スキーマ（すべて1トランザクションで実行）"""
+    create: list[TaskCreate] = Field(default_factory=list)
+    update: list[TaskBulkUpdate] = Field(default_factory=list)
+    move: list[TaskBulkMove] = Field(default_factory=list)
+    delete: list[int] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def check_operations(self) -> "TaskBulkRequest":
+        task_ids = self.task_ids()
+        if len(self.create) + len(task_ids) > BULK_MAX_OPERATIONS:
+            raise ValueError(f"一度に実行できる操作は{BULK_MAX_OPERATIONS}件までです")
+        if len(task_ids) != len(set(task_ids)):
+            raise ValueError("同じタスクを複数の操作で指定することはできません")
+        return self
+
+    def task_ids(self) -> list[int]:
+        """更新・移動・削除の対象となるタスクID"""
+        return (
+            [item.id for item in self.update]
+            + [task_id for item in self.move for task_id in item.task_ids]
+            + self.delete
+        )
+
+    def status_ids(self) -> set[int]:
+        """作成・更新・移動で参照されるステータスID"""
+        return (
+            {item.status_id for item in self.create}
+            | {item.status_id for item in self.update}
+            | {item.status_id for item in self.move}
+        )
+
+
+class TaskBulkResponse(BaseModel):
+    """タスク一括操作レスポンス用スキーマ"""
+    created: list[TaskResponse]
+    updated: list[TaskResponse]
+    moved: list[TaskResponse]
+    deleted: list[int]
+
+
+class TaskChangesResponse(BaseModel):
+    """タスク差分同期レスポンス用スキーマ"""
+    tasks: list[TaskResponse] = Field(description="同期トークン以降に作成・更新されたタスク")
+    deleted: list[int] = Field(description="同期トークン以降に削除されたタスクID")
+    next_token: str = Field(description="次回の差分取得に指定する同期トークン")
+
+
+class TaskExport(TaskResponse):
+    """タスクエクスポート用スキーマ（ステータス名を含む）"""
+    status: str
+
+
+class TaskImportRow(BaseModel):
+    """インポートする1行分のタスク（ステータスは名前または ID で指定）"""
+    title: str = Field(..., min_length=1, max_length=255)
+    content: str = ""
+    due_date: date
+    status_id: int | None = None
+    status: str | None = None
+
+    @model_validator(mode="after")
+    def check_status(self) -> "TaskImportRow":
+        if self.status_id is None and self.status is None:
+            raise ValueError("status または status_id を指定してください")
+        return self
+
+
+class TaskImportError(BaseModel):
+    """インポートできなかった行"""
+    row: int = Field(description="行番号（CSV はヘッダーを1行目とする）")
+    errors: list[str]
+
+
+class TaskImportResponse(BaseModel):
+    """タスクインポートレスポンス用スキーマ"""
+    imported: int = Field(description="登録したタスク数")
+    error_count: int = Field(description="エラーになった行数")
+    errors: list[TaskImportError] = Field(description=f"エラーになった行（先頭から最大{IMPORT_MAX_ERRORS}行）")
+
+
+class TaskStatusCount(BaseModel):
+    """ステータスごとのタスク数"""
+    status_id: int
+    count: int
+
+
+class TaskDueDateBucket(BaseModel):
+    """締切日ヒストグラムの1区間"""
+    start: date = Field(description="区間の開始日（週は月曜日、月は1日）")
+    count: int
+
+
+class TaskStatsResponse(BaseModel):
+    """タスク集計レスポンス用スキーマ"""
+    total: int
+    overdue: int = Field(description="締切日が today より前のタスク数")
+    by_status: list[TaskStatusCount]
+    interval: StatsInterval
+    histogram: list[TaskDueDateBucket] = Field(description="締切日の区間ごとのタスク数（0件の区間は含まない）")
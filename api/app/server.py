@@ -0,0 +1,183 @@
+"""本番用の起動スクリプト（マルチワーカー）
+
+    python -m app.server
+
+- ワーカー数は WEB_CONCURRENCY（0 の場合は利用可能な CPU 数）
+- アプリをマスタープロセスで読み込んでから fork する（ワーカーごとの import を省き、起動を速くする）
+- DB_MAX_CONNECTIONS を指定した場合、全ワーカーの合計がその接続数に収まるようにプールサイズを決める
+- SIGTERM / SIGINT で新しい接続の受け付けを止め、処理中のリクエストの完了を GRACEFUL_TIMEOUT 秒まで待つ
+- MAX_REQUESTS 件を処理したワーカーは終了し、新しいワーカーに入れ替える（メモリの断片化・リーク対策）
+- METRICS_PORT を指定した場合、ワーカー番号 i（0 始まり）のワーカーが METRICS_PORT + i で GET /metrics を返す
+  （メトリクスはワーカー単位のため、共有のポートではどのワーカーの値が返るか決まらない）
+"""
+
+import logging
+import os
+import random
+import signal
+import socket
+import time
+
+import uvicorn
+
+from app.config import Settings, settings
+from app.http_metrics import MetricsPortMiddleware
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def available_cpus() -> int:
+    """このプロセスが使える CPU 数（コンテナの CPU 割り当て（affinity）を考慮）"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def share_resources(config: Settings, workers: int) -> None:
+    """全ワーカーの合計が上限を超えないよう、ワーカーごとの DB プールとハッシュ計算プールの大きさを決める
+
+    app.database / app.auth が読み込まれる（エンジン等が作られる）前に呼ぶ。
+    変更通知（GET /events）の LISTEN 用の接続は、プールとは別にワーカーごとに1本使う。
+    """
+    if config.db_max_connections:
+        if config.db_max_connections < workers:
+            # 1ワーカーに1本も割り当てられない（合計が上限を超える）ため起動しない
+            raise ValueError(
+                f"DB_MAX_CONNECTIONS ({config.db_max_connections}) must be at least "
+                f"the number of workers ({workers})"
+            )
+        per_worker = config.db_max_connections // workers
+        config.db_pool_size = min(config.db_pool_size, per_worker)
+        # 設定値より増やさない
+        config.db_max_overflow = min(config.db_max_overflow, per_worker - config.db_pool_size)
+    if not config.password_hash_workers:
+        # 各ワーカーが CPU 数だけプロセスを作ると、合計でワーカー数倍になるため
+        config.password_hash_workers = max(1, available_cpus() // workers)
+
+
+def max_requests(config: Settings) -> int | None:
+    """ワーカーごとのリクエスト数の上限（全ワーカーが同時に入れ替わらないよう乱数を加える）"""
+    if not config.max_requests:
+        return None
+    return config.max_requests + random.randint(0, config.max_requests_jitter)
+
+
+class Arbiter:
+    """ワーカーを fork して監視し、終了したワーカーを起動し直すマスタープロセス"""
+
+    def __init__(self, server_config: uvicorn.Config, config: Settings, workers: int) -> None:
+        self.server_config = server_config
+        self.config = config
+        self.workers = workers
+        # pid → ワーカー番号（入れ替えたワーカーも同じ番号・メトリクス用ポートを引き継ぐ）
+        self.pids: dict[int, int] = {}
+        self.stopping = False
+        self.socket: socket.socket | None = None
+        self.metrics_sockets: list[socket.socket] = []
+
+    def run(self) -> None:
+        self.socket = self.server_config.bind_socket()
+        if self.config.metrics_port:
+            ports = range(self.config.metrics_port, self.config.metrics_port + self.workers)
+            self.metrics_sockets = [socket.create_server((self.server_config.host, port)) for port in ports]
+            logger.info("Serving per-worker metrics on ports %d-%d", ports[0], ports[-1])
+        signal.signal(signal.SIGTERM, self._handle_exit)
+        signal.signal(signal.SIGINT, self._handle_exit)
+        logger.info("Starting %d workers (pid %d)", self.workers, os.getpid())
+        for slot in range(self.workers):
+            self.spawn(slot)
+        while not self.stopping:
+            self.reap(respawn=True)
+            time.sleep(0.2)
+        self.shutdown()
+
+    def _handle_exit(self, signum: int, frame: object) -> None:
+        self.stopping = True
+
+    def spawn(self, slot: int) -> None:
+        pid = os.fork()
+        if pid:
+            self.pids[pid] = slot
+            return
+        code = 1
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = self.run_worker(slot)
+        except BaseException:
+            logger.exception("Worker failed")
+        finally:
+            os._exit(code)
+
+    def run_worker(self, slot: int) -> int:
+        # マスターで読み込み済みのモジュール（fork で引き継いだもの）
+        from app import database
+
+        # fork 前の接続を子プロセスで共有しない（通常はマスターでは接続していない）
+        database.engine.dispose(close=False)
+        if database.async_engine is not None:
+            database.async_engine.sync_engine.dispose(close=False)
+        self.server_config.limit_max_requests = max_requests(self.config)
+        sockets = [self.socket]
+        if self.metrics_sockets:
+            metrics_socket = self.metrics_sockets[slot]
+            sockets.append(metrics_socket)
+            self.server_config.app = MetricsPortMiddleware(
+                self.server_config.app, metrics_socket.getsockname()[1]
+            )
+        server = uvicorn.Server(self.server_config)
+        # SIGTERM は uvicorn が処理する（受け付けを止め、処理中のリクエストを待ってから終了）
+        server.run(sockets=sockets)
+        return 0 if server.started else 1
+
+    def reap(self, respawn: bool) -> None:
+        """終了したワーカーを回収し、respawn の場合は代わりを起動する"""
+        while self.pids:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            slot = self.pids.pop(pid)
+            code = os.waitstatus_to_exitcode(status)
+            if respawn:
+                logger.info("Worker %d exited with code %d, restarting", pid, code)
+                if code != 0:
+                    # 起動直後に失敗し続ける場合に fork を繰り返さないよう間隔をあける
+                    time.sleep(1)
+                self.spawn(slot)
+
+    def shutdown(self) -> None:
+        """ワーカーに SIGTERM を送り、GRACEFUL_TIMEOUT 秒（+ 余裕）待っても終わらなければ強制終了する"""
+        logger.info("Shutting down %d workers", len(self.pids))
+        for pid in self.pids:
+            os.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.config.graceful_timeout + 5
+        while self.pids and time.monotonic() < deadline:
+            self.reap(respawn=False)
+            time.sleep(0.1)
+        for pid in self.pids:
+            logger.warning("Killing worker %d", pid)
+            os.kill(pid, signal.SIGKILL)
+        self.socket.close()
+        for metrics_socket in self.metrics_sockets:
+            metrics_socket.close()
+
+
+def main() -> None:
+    workers = settings.web_concurrency or available_cpus()
+    share_resources(settings, workers)
+    # エンジン・プールの作成は share_resources の後
+    from app.main import app
+
+    server_config = uvicorn.Config(
+        app,
+        host=settings.server_host,
+        port=settings.server_port,
+        timeout_graceful_shutdown=settings.graceful_timeout,
+        proxy_headers=True,
+    )
+    Arbiter(server_config, settings, workers).run()
+
+
+if __name__ == "__main__":
+    main()
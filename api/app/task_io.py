@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any, BinaryIO
+
+from sqlalchemy import Row
+
+from app.schemas.common import ExportFormat
+from app.schemas.task import TaskExport
+
+# エクスポートの列（CSV のヘッダー順）
+EXPORT_FIELDS = ("id", "title", "content", "due_date", "status_id", "status", "created_at", "updated_at")
+
+MEDIA_TYPES = {
+    ExportFormat.csv: "text/csv; charset=utf-8",
+    ExportFormat.ndjson: "application/x-ndjson",
+}
+
+# Excel で開いたときに UTF-8 として認識させるための BOM
+UTF8_BOM = "\ufeff"
+# 表計算ソフトが数式の開始とみなす先頭文字
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+async def encode_csv(batches: AsyncIterator[Sequence[Row]]) -> AsyncIterator[bytes]:
+    """行のバッチを CSV（ヘッダー付き）のチャンクに変換する"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write(UTF8_BOM)
+    writer.writerow(EXPORT_FIELDS)
+    async for rows in batches:
+        for row in rows:
+            writer.writerow(_csv_value(getattr(row, name)) for name in EXPORT_FIELDS)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # 0件の場合もヘッダーだけは返す
+        yield buffer.getvalue().encode()
+
+
+def _csv_value(value: object) -> object:
+    # 日付・日時は JSON レスポンスと同じく ISO 8601 で出力する
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, str) and _is_formula(value):
+        # 表計算ソフトで数式として実行されないよう、先頭に ' を付けて文字列として扱わせる（CSV インジェクション対策）
+        return "'" + value
+    return value
+
+
+def _is_formula(value: str) -> bool:
+    """エクスポート時に ' を付ける値か（' を付けた値と区別できるよう、' + 対象の値も含める）"""
+    return value.startswith(FORMULA_PREFIXES) or (value.startswith("'") and _is_formula(value[1:]))
+
+
+def _unescape_csv_value(value: str) -> str:
+    """エクスポート時に付けた先頭の ' を取り除く"""
+    return value[1:] if value.startswith("'") and _is_formula(value[1:]) else value
+
+
+async def encode_ndjson(batches: AsyncIterator[Sequence[Row]]) -> AsyncIterator[bytes]:
+    """行のバッチを NDJSON（1行1タスク）のチャンクに変換する"""
+    async for rows in batches:
+        yield b"".join(TaskExport.model_validate(row).model_dump_json().encode() + b"\n" for row in rows)
+
+
+ENCODERS = {
+    ExportFormat.csv: encode_csv,
+    ExportFormat.ndjson: encode_ndjson,
+}
+
+
+def read_csv(file: BinaryIO) -> Iterator[tuple[int, dict[str, Any] | None]]:
+    """ヘッダー付き CSV を1行ずつ (行番号, 項目) として読み込む（空欄の項目は指定なしとして扱う）
+
+    ファイル全体は読み込まない。UTF-8 でない場合や CSV として不正な場合は ValueError を送出する。
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        # 値に改行を含む行は複数行にまたがるため、レコードの数ではなく読み込んだ行数（レコードの最終行）を使う
+        for row in reader:
+            yield reader.line_num, {
+                key: _unescape_csv_value(value)
+                for key, value in row.items()
+                if key is not None and value not in (None, "")
+            }
+    except csv.Error as e:
+        raise ValueError(f"Invalid CSV: {e}") from e
+    finally:
+        # アップロードファイル自体は閉じない
+        text.detach()
+
+
+def read_ndjson(file: BinaryIO) -> Iterator[tuple[int, dict[str, Any] | None]]:
+    """NDJSON を1行ずつ (行番号, 項目) として読み込む（JSON オブジェクトでない行は None）
+
+    UTF-8 でない場合は ValueError を送出する。
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig")
+    try:
+        for row_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                value = json.loads(line)
+            except ValueError:
+                value = None
+            yield row_number, value if isinstance(value, dict) else None
+    finally:
+        text.detach()
+
+
+READERS = {
+    ExportFormat.csv: read_csv,
+    ExportFormat.ndjson: read_ndjson,
+}
@@ -0,0 +1,47 @@
+"""get_current_user_id（JWT検証）のスループットをキャッシュ有無で比較する
+
+    python -m benchmarks.bench_auth --iterations 100000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from app.auth import (
+    ACCESS_TOKEN_EXPIRES,
+    TokenType,
+    access_token_cache,
+    create_token,
+    get_current_user_id,
+)
+
+
+async def run(token: str, iterations: int, cached: bool) -> float:
+    """iterations 回呼び出した際の 1 秒あたりの処理数"""
+    access_token_cache.clear()
+    maxsize = access_token_cache.maxsize
+    access_token_cache.maxsize = maxsize if cached else 0
+    try:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await get_current_user_id(token)
+        elapsed = time.perf_counter() - start
+    finally:
+        access_token_cache.maxsize = maxsize
+    return iterations / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    token = create_token(1, TokenType.ACCESS, ACCESS_TOKEN_EXPIRES)
+    for cached in (False, True):
+        ops = asyncio.run(run(token, args.iterations, cached))
+        print(json.dumps({"cache": cached, "ops_per_sec": round(ops), "us_per_op": round(1e6 / ops, 2)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""タスクエクスポートのピークメモリを件数別に計測する
+
+- stream: サーバーサイドカーソルで EXPORT_BATCH_SIZE 件ずつ取得して書き出す（/tasks/export）
+- materialize: 全件を取得してから書き出した場合（比較用）
+
+レスポンスのチャンクは送信済みとして破棄し、tracemalloc のピークメモリを比較する。
+
+    python -m benchmarks.bench_export --sizes 1000 100000 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import tracemalloc
+from collections.abc import AsyncIterator
+
+from app.crud import task as task_crud
+from app.database import SessionLocal, stream_db
+from app.routers.task import EXPORT_BATCH_SIZE
+from app.schemas.common import ExportFormat
+from app.task_io import ENCODERS
+from benchmarks.common import create_bench_user, drop_bench_user, seed_tasks
+
+
+async def drain(chunks: AsyncIterator[bytes]) -> int:
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+    return size
+
+
+async def materialized(db, query) -> AsyncIterator[list]:
+    yield db.execute(query).all()
+
+
+def run(method: str, fmt: ExportFormat, user_id: int) -> dict:
+    with SessionLocal() as db:
+        query = task_crud.build_export_query(user_id)
+        batches = stream_db(db, query, EXPORT_BATCH_SIZE) if method == "stream" else materialized(db, query)
+        tracemalloc.start()
+        try:
+            size = asyncio.run(drain(ENCODERS[fmt](batches)))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {"bytes": size, "peak_kib": round(peak / 1024, 1)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    user, status = create_bench_user(db, "bench_export")
+    seeded = 0
+    try:
+        for size in sorted(args.sizes):
+            seed_tasks(db, user.id, status.id, size - seeded, seed=seeded)
+            seeded = size
+            for fmt in ExportFormat:
+                for method in ("stream", "materialize"):
+                    result = {"tasks": size, "format": fmt.value, "method": method, **run(method, fmt, user.id)}
+                    print(json.dumps(result))
+    finally:
+        db.rollback()
+        drop_bench_user(db, user.id)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
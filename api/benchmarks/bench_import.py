@@ -0,0 +1,90 @@
+"""タスクインポートのスループット（行/分）を計測する
+
+- import: CSV を /tasks/import と同じ処理（read_csv → TaskImportValidator.validate → insert_tasks のバッチ）で登録する
+- create_task: 1件ずつ create_task で登録した場合（比較用。--baseline-rows 件だけ計測）
+
+    python -m benchmarks.bench_import --rows 100000
+"""
+
+import argparse
+import csv
+import io
+import json
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from app.crud import task as task_crud
+from app.database import SessionLocal
+from app.schemas.task import TaskCreate
+from app.task_io import read_csv
+from benchmarks.common import CONTENT_WORDS, TITLE_WORDS, create_bench_user, drop_bench_user
+
+
+def make_csv(rows: int, status_name: str, seed: int = 0) -> tempfile.SpooledTemporaryFile:
+    """アップロードされたファイルと同じく SpooledTemporaryFile に CSV を書き出す"""
+    rng = random.Random(seed)
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(["title", "content", "due_date", "status"])
+    for i in range(rows):
+        writer.writerow([
+            f"{rng.choice(TITLE_WORDS)} #{i}",
+            "、".join(rng.sample(CONTENT_WORDS, 2)),
+            (date(2025, 1, 1) + timedelta(days=rng.randrange(730))).isoformat(),
+            status_name,
+        ])
+    file = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    file.write(text.getvalue().encode())
+    file.seek(0)
+    return file
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--baseline-rows", type=int, default=1_000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    user, status = create_bench_user(db, "bench_import")
+    try:
+        file = make_csv(args.rows, status.name)
+        start = time.perf_counter()
+        rows = read_csv(file)
+        validator = task_crud.TaskImportValidator(user.id, task_crud.get_import_statuses(db, user.id))
+        while batch := validator.validate(rows):
+            task_crud.insert_tasks(db, batch)
+        result = task_crud.finish_import(db, validator)
+        elapsed = time.perf_counter() - start
+        assert result["imported"] == args.rows, result
+        print(json.dumps({
+            "method": "import",
+            "rows": args.rows,
+            "seconds": round(elapsed, 2),
+            "rows_per_minute": round(args.rows / elapsed * 60),
+        }))
+
+        start = time.perf_counter()
+        for i in range(args.baseline_rows):
+            task_crud.create_task(
+                db,
+                TaskCreate(title=f"task #{i}", content="", due_date=date(2025, 1, 1), status_id=status.id),
+                user.id,
+            )
+        elapsed = time.perf_counter() - start
+        print(json.dumps({
+            "method": "create_task",
+            "rows": args.baseline_rows,
+            "seconds": round(elapsed, 2),
+            "rows_per_minute": round(args.baseline_rows / elapsed * 60),
+        }))
+    finally:
+        db.rollback()
+        drop_bench_user(db, user.id)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
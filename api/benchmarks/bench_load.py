@@ -0,0 +1,429 @@
+"""API の負荷試験：エンドポイントごとに一定の同時実行数でリクエストを送り、レイテンシと RPS を計測する
+
+tests/factories.py でベンチマーク用のユーザー（--users 人）とステータスを作成し、タスクを --sizes の
+件数まで（ユーザーに均等に分散して）投入するたびに、uvicorn で起動した API に各シナリオを実行する。
+結果は1シナリオ1行の JSON で出力し、--output を指定するとまとめて JSON ファイルに保存する。
+
+--baseline を指定すると保存済みの結果（--output で書き出したファイル）と比較し、次のいずれかに
+該当するシナリオがあれば終了コード 1 で終了する。
+
+- p95 がベースラインの (1 + --threshold) 倍を超えた
+- RPS がベースラインの (1 - --threshold) 倍を下回った
+- エラー（ステータスコード 400 以上）が発生した
+
+    python -m benchmarks.bench_load --sizes 1000 100000 1000000 --output baseline.json
+    python -m benchmarks.bench_load --sizes 1000 100000 1000000 --baseline baseline.json
+
+削除などの対象が必要なシナリオは、実行前にリクエスト数分の対象を DB に直接作成する。
+--url を指定した場合は起動済みのサーバーを使う（DATABASE_URL と同じ DB に接続していること）。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, NamedTuple
+from uuid import uuid4
+
+import httpx
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.auth import TokenType, create_token, get_password_hash
+from app.crud.status import ORDER_GAP
+from app.database import SessionLocal
+from app.models.status import Status
+from app.models.task import Task
+from app.models.user import User
+from benchmarks.common import TITLE_WORDS, drop_bench_user, percentile, seed_tasks
+from tests.factories import StatusFactory, UserFactory
+
+USERNAME_PREFIX = "bench_load"
+PASSWORD = "benchpassword"
+STATUS_NAMES = ["未着手", "進行中", "完了"]
+# 詳細取得・更新の対象にするユーザーごとのタスク数
+SAMPLE_TASKS = 100
+# インポートのシナリオで1リクエストに含める行数
+IMPORT_ROWS = 100
+STATUS_COLOR = "#6B7280"
+TOKEN_EXPIRES = timedelta(hours=12)
+
+
+@dataclass
+class BenchUser:
+    """リクエストに使うユーザーの情報"""
+    id: int
+    email: str
+    token: str
+    refresh_token: str
+    status_ids: list[int]
+    task_ids: list[int] = field(default_factory=list)
+    # 削除のシナリオ用に作成し、リクエストごとに1件ずつ使う
+    disposable_task_ids: list[int] = field(default_factory=list)
+    disposable_status_ids: list[int] = field(default_factory=list)
+
+
+# (メソッド, パス, httpx.AsyncClient.request の追加引数)
+Request = tuple[str, str, dict[str, Any]]
+
+
+class Scenario(NamedTuple):
+    build: Callable[[random.Random, BenchUser], Request]
+    # 1リクエストが重いシナリオ（ログインのハッシュ計算、全件取得など）は --heavy-requests 回だけ実行する
+    heavy: bool = False
+    # リクエストを組み立てる前に、ユーザーごとのリクエスト数を受け取って DB 側を準備する
+    prepare: Callable[[Session, BenchUser, int], None] | None = None
+
+
+def _task_body(rng: random.Random, user: BenchUser) -> dict[str, Any]:
+    return {
+        "title": f"{rng.choice(TITLE_WORDS)} (load)",
+        "content": "負荷試験",
+        "due_date": (date(2025, 1, 1) + timedelta(days=rng.randrange(730))).isoformat(),
+        "status_id": rng.choice(user.status_ids),
+    }
+
+
+def _bulk_body(rng: random.Random, user: BenchUser) -> dict[str, Any]:
+    # 同じタスクを複数の操作で指定できないため、更新と移動の対象は重ならないように選ぶ
+    targets = rng.sample(user.task_ids, min(15, len(user.task_ids)))
+    updated, moved = targets[:5], targets[5:]
+    return {
+        "create": [_task_body(rng, user) for _ in range(5)],
+        "update": [{"id": task_id, **_task_body(rng, user)} for task_id in updated],
+        "move": [{"task_ids": moved, "status_id": rng.choice(user.status_ids)}] if moved else [],
+        "delete": [user.disposable_task_ids.pop()],
+    }
+
+
+def _import_file(rng: random.Random, user: BenchUser) -> dict[str, Any]:
+    lines = ["title,content,due_date,status_id"] + [
+        f"{body['title']},{body['content']},{body['due_date']},{body['status_id']}"
+        for body in (_task_body(rng, user) for _ in range(IMPORT_ROWS))
+    ]
+    return {"file": ("tasks.csv", "\n".join(lines).encode(), "text/csv")}
+
+
+def _signup_body() -> dict[str, Any]:
+    # 作成したユーザーも drop_bench_users で削除されるよう、同じ接頭辞を付ける
+    # （乱数のシードはウォームアップと本計測で同じ値になりうるため、uuid で重複を避ける）
+    username = f"{USERNAME_PREFIX}_signup_{uuid4().hex}"
+    return {"username": username, "email": f"{username}@example.com", "password": PASSWORD}
+
+
+def _move_after(rng: random.Random, user: BenchUser) -> Request:
+    status_id, after_id = rng.sample(user.status_ids, 2)
+    return ("PUT", f"/statuses/{status_id}/move", {"json": {"after_id": after_id}})
+
+
+def _create_disposable_tasks(db: Session, user: BenchUser, count: int) -> None:
+    row = {
+        "title": "削除用", "content": "", "due_date": date(2025, 1, 1), "status_id": user.status_ids[0], "user_id": user.id
+    }
+    rows = [row] * count
+    user.disposable_task_ids.extend(db.scalars(insert(Task).returning(Task.id), rows))
+    db.commit()
+
+
+def _create_disposable_statuses(db: Session, user: BenchUser, count: int) -> None:
+    last = max(db.scalars(select(Status.order).where(Status.user_id == user.id)), default=0)
+    rows = [
+        {"name": "削除用", "color": STATUS_COLOR, "order": last + (i + 1) * ORDER_GAP, "user_id": user.id}
+        for i in range(count)
+    ]
+    user.disposable_status_ids.extend(db.scalars(insert(Status).returning(Status.id), rows))
+    db.commit()
+
+
+def _load_status_ids(db: Session, user: BenchUser, count: int) -> None:
+    # 並び替えは全ステータスの指定が必要なため、作成のシナリオで増えた分も含めて取得し直す
+    user.status_ids = list(db.scalars(
+        select(Status.id).where(Status.user_id == user.id).order_by(Status.order)
+    ))
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "auth_login": Scenario(
+        lambda rng, u: ("POST", "/auth/login", {"data": {"username": u.email, "password": PASSWORD}}),
+        heavy=True,
+    ),
+    "auth_signup": Scenario(lambda rng, u: ("POST", "/auth/signup", {"json": _signup_body()}), heavy=True),
+    "auth_refresh": Scenario(
+        lambda rng, u: ("POST", "/auth/refresh", {"headers": {"Cookie": f"refresh_token={u.refresh_token}"}})
+    ),
+    "auth_me": Scenario(lambda rng, u: ("GET", "/auth/me", {})),
+    "statuses_list": Scenario(lambda rng, u: ("GET", "/statuses", {})),
+    "statuses_get": Scenario(lambda rng, u: ("GET", f"/statuses/{rng.choice(u.status_ids)}", {})),
+    "statuses_create": Scenario(
+        lambda rng, u: ("POST", "/statuses", {"json": {"name": "負荷試験", "color": STATUS_COLOR}})
+    ),
+    "statuses_update": Scenario(lambda rng, u: (
+        "PUT", f"/statuses/{rng.choice(u.status_ids)}",
+        {"json": {"name": rng.choice(STATUS_NAMES), "color": STATUS_COLOR}},
+    )),
+    "statuses_reorder": Scenario(
+        lambda rng, u: ("PUT", "/statuses/reorder", {"json": {"order": rng.sample(u.status_ids, len(u.status_ids))}}),
+        prepare=_load_status_ids,
+    ),
+    "statuses_move": Scenario(_move_after),
+    "statuses_delete": Scenario(
+        lambda rng, u: ("DELETE", f"/statuses/{u.disposable_status_ids.pop()}", {}),
+        prepare=_create_disposable_statuses,
+    ),
+    "tasks_list": Scenario(lambda rng, u: ("GET", "/tasks", {}), heavy=True),
+    "tasks_page": Scenario(lambda rng, u: ("GET", "/tasks", {"params": {"limit": 50}})),
+    "tasks_fields": Scenario(
+        lambda rng, u: ("GET", "/tasks", {"params": {"limit": 50, "fields": "title,due_date,status_id"}})
+    ),
+    "tasks_search": Scenario(
+        lambda rng, u: ("GET", "/tasks", {"params": {"q": rng.choice(TITLE_WORDS), "limit": 50}})
+    ),
+    "tasks_changes": Scenario(lambda rng, u: ("GET", "/tasks/changes", {}), heavy=True),
+    "tasks_stats": Scenario(lambda rng, u: ("GET", "/tasks/stats", {})),
+    "tasks_export": Scenario(
+        lambda rng, u: ("GET", "/tasks/export", {"params": {"format": "ndjson"}}), heavy=True
+    ),
+    "tasks_get": Scenario(lambda rng, u: ("GET", f"/tasks/{rng.choice(u.task_ids)}", {})),
+    "tasks_create": Scenario(lambda rng, u: ("POST", "/tasks", {"json": _task_body(rng, u)})),
+    "tasks_update": Scenario(
+        lambda rng, u: ("PUT", f"/tasks/{rng.choice(u.task_ids)}", {"json": _task_body(rng, u)})
+    ),
+    "tasks_delete": Scenario(
+        lambda rng, u: ("DELETE", f"/tasks/{u.disposable_task_ids.pop()}", {}),
+        prepare=_create_disposable_tasks,
+    ),
+    "tasks_bulk": Scenario(
+        lambda rng, u: ("POST", "/tasks/bulk", {"json": _bulk_body(rng, u)}),
+        prepare=_create_disposable_tasks,
+    ),
+    "tasks_import": Scenario(
+        lambda rng, u: ("POST", "/tasks/import", {"files": _import_file(rng, u)}), heavy=True
+    ),
+}
+
+
+def drop_bench_users(db: Session) -> None:
+    """前回の実行で残ったベンチマーク用ユーザーも含めて削除する"""
+    user_ids = db.scalars(select(User.id).where(User.username.startswith(USERNAME_PREFIX))).all()
+    for user_id in user_ids:
+        drop_bench_user(db, user_id)
+
+
+def create_users(db: Session, count: int) -> list[BenchUser]:
+    """factories でユーザーと既定のステータスを作成する"""
+    UserFactory._meta.sqlalchemy_session = db
+    StatusFactory._meta.sqlalchemy_session = db
+    # bcrypt の計算は1回だけにして、全ユーザーで同じパスワードを使う
+    hashed_password = get_password_hash(PASSWORD)
+    users = []
+    for i in range(count):
+        user = UserFactory(username=f"{USERNAME_PREFIX}{i}", hashed_password=hashed_password)
+        statuses = [
+            StatusFactory(name=name, order=(j + 1) * ORDER_GAP, user_id=user.id)
+            for j, name in enumerate(STATUS_NAMES)
+        ]
+        users.append(BenchUser(
+            id=user.id,
+            email=user.email,
+            token=create_token(user.id, TokenType.ACCESS, TOKEN_EXPIRES),
+            refresh_token=create_token(user.id, TokenType.REFRESH, TOKEN_EXPIRES),
+            status_ids=[status.id for status in statuses],
+        ))
+    return users
+
+
+def seed_users(db: Session, users: list[BenchUser], seeded: int, size: int) -> None:
+    """タスクの総数が size になるまで、各ユーザーに均等に追加する"""
+    for index, user in enumerate(users):
+        before = seeded // len(users) + (index < seeded % len(users))
+        after = size // len(users) + (index < size % len(users))
+        if after > before:
+            seed_tasks(db, user.id, user.status_ids[0], after - before, seed=user.id * 1_000_003 + before)
+        user.task_ids = list(db.scalars(
+            select(Task.id).where(Task.user_id == user.id).order_by(Task.id).limit(SAMPLE_TASKS)
+        ))
+
+
+def wait_ready(url: str, process: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{url}/openapi.json").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server did not start within {timeout} seconds")
+
+
+@contextmanager
+def launch(command: list[str], url: str, env: dict[str, str] | None = None) -> Iterator[str]:
+    """command でサーバーを起動し、応答するようになったらベース URL を返す（終了時は SIGTERM）"""
+    process = subprocess.Popen(command, env={**os.environ, **(env or {})})
+    try:
+        wait_ready(url, process)
+        yield url
+    finally:
+        process.terminate()
+        process.wait(timeout=60)
+
+
+def serve(port: int, workers: int) -> AbstractContextManager[str]:
+    """uvicorn で API を起動し、ベース URL を返す"""
+    return launch(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--workers", str(workers),
+            "--log-level", "warning",
+            "--no-access-log",
+        ],
+        f"http://127.0.0.1:{port}",
+    )
+
+
+@contextmanager
+def running(url: str) -> Iterator[str]:
+    """起動済みのサーバーを使う場合"""
+    yield url.rstrip("/")
+
+
+def make_plan(
+    db: Session, users: list[BenchUser], scenario: Scenario, requests: int, seed: int
+) -> list[tuple[BenchUser, Request]]:
+    """requests 回分のリクエストを、ランダムに選んだユーザーで組み立てる"""
+    rng = random.Random(seed)
+    chosen = [rng.choice(users) for _ in range(requests)]
+    if scenario.prepare is not None:
+        counts = Counter(user.id for user in chosen)
+        for user in users:
+            if counts[user.id]:
+                scenario.prepare(db, user, counts[user.id])
+    return [(user, scenario.build(rng, user)) for user in chosen]
+
+
+async def run_scenario(url: str, plan: list[tuple[BenchUser, Request]], concurrency: int) -> dict[str, float]:
+    """concurrency 本のワーカーで plan のリクエストを送り、レイテンシ（ミリ秒）と RPS を返す"""
+    requests = len(plan)
+    pending = iter(plan)
+    latencies: list[float] = []
+    errors = 0
+
+    async with httpx.AsyncClient(
+        base_url=url,
+        timeout=300,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+    ) as client:
+
+        async def worker() -> None:
+            nonlocal errors
+            # 全ワーカーで1つのイテレーターを共有し、合計 requests 回で終わるようにする
+            for user, (method, path, kwargs) in pending:
+                headers = {"Authorization": f"Bearer {user.token}", **kwargs.pop("headers", {})}
+                start = time.perf_counter()
+                res = await client.request(method, path, headers=headers, **kwargs)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if res.status_code >= 400:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+def compare(results: list[dict], baseline: list[dict], threshold: float) -> list[str]:
+    """ベースラインより悪化したシナリオの説明を返す"""
+    base = {(result["tasks"], result["scenario"]): result for result in baseline}
+    failures = []
+    for result in results:
+        name = f"{result['scenario']} ({result['tasks']} tasks)"
+        if result["errors"]:
+            failures.append(f"{name}: {result['errors']} errors")
+        before = base.get((result["tasks"], result["scenario"]))
+        if before is None:
+            continue
+        if result["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            failures.append(f"{name}: p95 {before['p95_ms']}ms -> {result['p95_ms']}ms")
+        if result["rps"] < before["rps"] * (1 - threshold):
+            failures.append(f"{name}: rps {before['rps']} -> {result['rps']}")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--heavy-requests", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = []
+    db = SessionLocal()
+    drop_bench_users(db)
+    try:
+        users = create_users(db, args.users)
+        with serve(args.port, args.workers) if args.url is None else running(args.url) as url:
+            seeded = 0
+            for size in sorted(args.sizes):
+                seed_users(db, users, seeded, size)
+                seeded = size
+                for name in args.scenarios:
+                    scenario = SCENARIOS[name]
+                    requests = args.heavy_requests if scenario.heavy else args.requests
+                    if args.warmup:
+                        warmup = make_plan(db, users, scenario, args.warmup, seed=-size)
+                        asyncio.run(run_scenario(url, warmup, args.concurrency))
+                    plan = make_plan(db, users, scenario, requests, seed=size)
+                    stats = asyncio.run(run_scenario(url, plan, args.concurrency))
+                    result = {"tasks": size, "scenario": name, "concurrency": args.concurrency, **stats}
+                    print(json.dumps(result), flush=True)
+                    results.append(result)
+    finally:
+        db.rollback()
+        drop_bench_users(db)
+        db.close()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"users": args.users, "workers": args.workers, "results": results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = compare(results, json.load(f)["results"], args.threshold)
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""計測用ミドルウェアのオーバーヘッド（1リクエストあたり）を計測する
+
+- none: ミドルウェアなし
+- http_metrics: HttpMetricsMiddleware（GET /metrics）
+- query_stats: QueryStatsMiddleware（Server-Timing ヘッダー）
+- both: 両方（app.main と同じ構成）
+- profiler_unsampled: ProfilerMiddleware（PROFILER_ENABLED=true）で計測対象にならなかったリクエスト
+
+ネットワーク・DB・ルーティングの時間を除くため、ルートを scope に設定して空のレスポンスを返すだけの
+ASGI アプリをミドルウェアで包んで直接呼び出す。比較用に、パスパラメータ付きの最小の FastAPI
+エンドポイント（fastapi_endpoint）の1リクエストあたりの時間も出力する。
+各構成を --rounds 回ずつ交互に計測し、最も速い回の1リクエストあたりの時間を比較する。
+
+    python -m benchmarks.bench_middleware --requests 20000 --rounds 20
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.http_metrics import HttpMetrics, HttpMetricsMiddleware
+from app.profiler import ProfilerMiddleware, SamplingProfiler
+from app.query_stats import QueryStatsMiddleware
+
+ROUTE = APIRoute("/tasks/{task_id}", lambda task_id: None)
+
+
+async def endpoint(scope: Scope, receive: Receive, send: Send) -> None:
+    # FastAPI のルーティングと同じく、一致したルートを scope に設定する
+    scope["route"] = ROUTE
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def fastapi_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/tasks/{task_id}")
+    async def get_task(task_id: int):
+        return {"id": task_id}
+
+    return app
+
+
+async def call(app: ASGIApp, task_id: int) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": f"/tasks/{task_id}",
+        "raw_path": f"/tasks/{task_id}".encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("127.0.0.1", 80),
+    }
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        pass
+
+    await app(scope, receive, send)
+
+
+async def run_round(app: ASGIApp, requests: int) -> float:
+    """1リクエストあたりの時間（マイクロ秒）"""
+    start = time.perf_counter()
+    for i in range(requests):
+        await call(app, i)
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+async def run(apps: dict[str, ASGIApp], requests: int, rounds: int) -> dict[str, float]:
+    """構成ごとの、最も速い回の1リクエストあたりの時間（マイクロ秒）
+
+    負荷の変動が特定の構成に偏らないよう、各回で全構成を順に計測する。
+    """
+    # 初回のルート解決・ミドルウェアスタックの構築を除く
+    for app in apps.values():
+        await run_round(app, 100)
+    best = dict.fromkeys(apps, float("inf"))
+    for _ in range(rounds):
+        for name, app in apps.items():
+            best[name] = min(best[name], await run_round(app, requests))
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    # 本番と同じく INFO のリクエストログは出力しない設定で計測する
+    logging.getLogger("app.query_stats").setLevel(logging.WARNING)
+
+    apps = {
+        "none": endpoint,
+        "http_metrics": HttpMetricsMiddleware(endpoint, metrics=HttpMetrics()),
+        "query_stats": QueryStatsMiddleware(endpoint),
+        # app.main では HttpMetricsMiddleware が外側
+        "both": HttpMetricsMiddleware(QueryStatsMiddleware(endpoint), metrics=HttpMetrics()),
+        "profiler_unsampled": ProfilerMiddleware(
+            endpoint, sample_rate=0, target=SamplingProfiler(interval=0.005, max_stacks=1)
+        ),
+        "fastapi_endpoint": fastapi_app(),
+    }
+    results = asyncio.run(run(apps, args.requests, args.rounds))
+    baseline = results["none"]
+    for name, us in results.items():
+        result = {"middleware": name, "us_per_request": round(us, 2)}
+        if name != "fastapi_endpoint":
+            result["overhead_us"] = round(us - baseline, 2)
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
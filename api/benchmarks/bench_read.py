@@ -0,0 +1,104 @@
+"""タスク一覧の読み込み方式ごとに、1リクエストあたりの時間とメモリを比較する
+
+- orm: Task の ORM インスタンスを読み込んでレスポンスに変換する（従来）
+- columns: TaskResponse の項目だけを行として取得する（get_tasks）
+- columns_no_content: fields で content を除いた場合
+
+リクエストごとにセッションを作り直し、DB取得からJSONのバイト列の生成までを計測する。
+peak_kib は tracemalloc で計測したピークメモリ（計測中は遅くなるため時間とは別に1回だけ実行する）。
+
+    python -m benchmarks.bench_read --sizes 1000 10000 50000 --content-chars 1000
+"""
+
+import argparse
+import json
+import tracemalloc
+from collections.abc import Callable
+
+from sqlalchemy import desc, func, select, update
+
+from app.crud import task as task_crud
+from app.database import SessionLocal
+from app.models.task import Task
+from app.schemas.task import TASK_FIELDS, TaskListResponse, TaskPartialListResponse
+from benchmarks.common import create_bench_user, drop_bench_user, measure, seed_tasks
+
+LIST_FIELDS = {name for name in TASK_FIELDS if name != "content"}
+
+
+def via_orm(user_id: int) -> bytes:
+    with SessionLocal() as db:
+        query = (
+            select(Task)
+            .where(Task.user_id == user_id)
+            .order_by(desc(Task.due_date), desc(Task.id))
+        )
+        return TaskListResponse(tasks=db.scalars(query).all()).model_dump_json().encode()
+
+
+def via_columns(user_id: int) -> bytes:
+    with SessionLocal() as db:
+        tasks = task_crud.get_tasks(db, user_id=user_id)
+        return TaskListResponse(tasks=tasks).model_dump_json().encode()
+
+
+def via_columns_no_content(user_id: int) -> bytes:
+    with SessionLocal() as db:
+        tasks = task_crud.get_tasks(db, user_id=user_id, fields=LIST_FIELDS)
+        model = TaskPartialListResponse(tasks=tasks)
+        return model.model_dump_json(include={"tasks": {"__all__": LIST_FIELDS}}).encode()
+
+
+def peak_kib(fn: Callable[[], object]) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--content-chars", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    user, status = create_bench_user(db, "bench_read")
+    seeded = 0
+    try:
+        for size in sorted(args.sizes):
+            seed_tasks(db, user.id, status.id, size - seeded, seed=seeded)
+            seeded = size
+            # 本文の長いボードを想定して content を伸ばす
+            db.execute(
+                update(Task)
+                .where(Task.user_id == user.id)
+                .values(content=func.rpad(Task.content, args.content_chars, "。"))
+            )
+            db.commit()
+            for name, fn in [
+                ("orm", via_orm),
+                ("columns", via_columns),
+                ("columns_no_content", via_columns_no_content),
+            ]:
+                stats = measure(lambda: fn(user.id), repeat=args.repeat)
+                result = {
+                    "tasks": size,
+                    "method": name,
+                    "bytes": len(fn(user.id)),
+                    "peak_kib": peak_kib(lambda: fn(user.id)),
+                    **stats,
+                }
+                print(json.dumps(result))
+    finally:
+        db.rollback()
+        drop_bench_user(db, user.id)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
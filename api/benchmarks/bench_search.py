@@ -0,0 +1,52 @@
+"""タスクのキーワード検索レイテンシを件数別に計測する
+
+DATABASE_URL はマイグレーション適用済み（pg_trgm インデックスあり）のDBを指定すること。
+
+    python -m benchmarks.bench_search --sizes 10000 100000 1000000
+"""
+
+import argparse
+import json
+
+from app.crud import task as task_crud
+from app.database import SessionLocal
+from benchmarks.common import create_bench_user, drop_bench_user, measure, seed_tasks
+
+QUERIES = {
+    "title_ja": "請求書",
+    "content_ja": "日程調整",
+    "ascii": "review",
+    "no_match": "存在しないキーワード",
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    user, status = create_bench_user(db, "bench_search")
+    results = []
+    seeded = 0
+    try:
+        for size in sorted(args.sizes):
+            seed_tasks(db, user.id, status.id, size - seeded, seed=seeded)
+            seeded = size
+            for name, keyword in QUERIES.items():
+                for sort in ("due_date", "relevance"):
+                    stats = measure(
+                        lambda: task_crud.get_tasks(db, user_id=user.id, keyword=keyword, sort=sort),
+                        repeat=args.repeat,
+                    )
+                    results.append({"tasks": size, "query": name, "sort": sort, **stats})
+                    print(json.dumps(results[-1], ensure_ascii=False))
+    finally:
+        db.rollback()
+        drop_bench_user(db, user.id)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""タスク一覧レスポンスのシリアライズ時間を方式別に比較する（DB不要）
+
+- fastapi_json: モデルを返し、FastAPI が response_model で再検証して JSONResponse で返す（従来）
+- fastapi_orjson: 同上で、デフォルトのレスポンスクラスを ORJSONResponse にした場合
+- model_response: モデルを1回だけ構築し、model_dump_json のバイト列をそのまま返す
+
+    python -m benchmarks.bench_serialize --tasks 10000
+"""
+
+import argparse
+import asyncio
+import json
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from app.main import app
+from app.models.task import Task
+from app.responses import model_response
+from app.schemas.task import TaskListResponse
+from benchmarks.common import CONTENT_WORDS, TITLE_WORDS, measure
+
+
+def make_tasks(count: int) -> list[Task]:
+    """DBに保存しない Task インスタンスを count 件作成する"""
+    now = datetime.now(timezone.utc)
+    return [
+        Task(
+            id=i,
+            title=f"{TITLE_WORDS[i % len(TITLE_WORDS)]} #{i}",
+            content="、".join(CONTENT_WORDS[i % 3:i % 3 + 2]),
+            due_date=date(2025, 1, 1) + timedelta(days=i % 730),
+            status_id=1,
+            user_id=1,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def list_tasks_field():
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.path == "/tasks" and "GET" in route.methods:
+            return route.response_field
+    raise RuntimeError("GET /tasks route not found")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.tasks)
+    field = list_tasks_field()
+
+    def via_fastapi(response_class):
+        def run() -> bytes:
+            content = asyncio.run(
+                serialize_response(field=field, response_content=TaskListResponse(tasks=tasks))
+            )
+            return response_class(content).body
+        return run
+
+    def via_model_response() -> bytes:
+        return model_response(TaskListResponse(tasks=tasks)).body
+
+    for name, fn in [
+        ("fastapi_json", via_fastapi(JSONResponse)),
+        ("fastapi_orjson", via_fastapi(ORJSONResponse)),
+        ("model_response", via_model_response),
+    ]:
+        stats = measure(fn, repeat=args.repeat)
+        print(json.dumps({"tasks": args.tasks, "method": name, "bytes": len(fn()), **stats}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""ワーカー数（WEB_CONCURRENCY）ごとのスループットを計測する（python -m app.server）
+
+--workers の各ワーカー数で app.server を起動し、bench_load と同じシナリオを同時実行数 --concurrency で
+実行して RPS と p95 を比較する（speedup は1つ目のワーカー数に対する RPS の比）。
+スケールの仕方は利用可能な CPU 数（cpus）や DB を同じマシンで動かすかに依存するため、結果は cpus と合わせて記録する。
+
+    python -m benchmarks.bench_workers --workers 1 2 4 8 --tasks 100000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from app.database import SessionLocal
+from app.server import available_cpus
+from benchmarks.bench_load import (
+    SCENARIOS,
+    create_users,
+    drop_bench_users,
+    launch,
+    run_scenario,
+    seed_users,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIOS), default=["auth_me", "tasks_page", "tasks_get"]
+    )
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--port", type=int, default=8765)
+    # 全ワーカー合計の DB 接続数（ワーカー数によらず同じ上限で比較する）
+    parser.add_argument("--db-max-connections", type=int, default=40)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    drop_bench_users(db)
+    try:
+        users = create_users(db, args.users)
+        seed_users(db, users, 0, args.tasks)
+        base_rps: dict[str, float] = {}
+        for workers in args.workers:
+            env = {
+                "WEB_CONCURRENCY": str(workers),
+                "SERVER_HOST": "127.0.0.1",
+                "SERVER_PORT": str(args.port),
+                "DB_MAX_CONNECTIONS": str(args.db_max_connections),
+            }
+            with launch([sys.executable, "-m", "app.server"], f"http://127.0.0.1:{args.port}", env) as url:
+                for name in args.scenarios:
+                    scenario = SCENARIOS[name]
+                    # ウォームアップ（全ワーカーの接続プールを温める）
+                    asyncio.run(
+                        run_scenario(url, users, scenario, args.concurrency * 4, args.concurrency, seed=-1)
+                    )
+                    stats = asyncio.run(
+                        run_scenario(url, users, scenario, args.requests, args.concurrency, seed=workers)
+                    )
+                    base_rps.setdefault(name, stats["rps"])
+                    print(json.dumps({
+                        "workers": workers,
+                        "cpus": available_cpus(),
+                        "scenario": name,
+                        "rps": stats["rps"],
+                        "p95_ms": stats["p95_ms"],
+                        "errors": stats["errors"],
+                        "speedup": round(stats["rps"] / base_rps[name], 2),
+                    }), flush=True)
+    finally:
+        db.rollback()
+        drop_bench_users(db)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
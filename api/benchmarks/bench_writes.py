@@ -0,0 +1,106 @@
+"""タスク・ステータスの書き込みスループットを計測する（コミット後の refresh 有無を比較）
+
+--refresh を付けると、各書き込みの後に従来どおり db.refresh を実行した場合を計測する。
+
+    python -m benchmarks.bench_writes --count 2000
+    python -m benchmarks.bench_writes --count 2000 --refresh
+"""
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+from datetime import date
+
+from sqlalchemy import event
+
+from app.crud import status as status_crud
+from app.crud import task as task_crud
+from app.database import SessionLocal, engine
+from app.schemas.status import StatusCreate, StatusUpdate
+from app.schemas.task import TaskCreate, TaskUpdate
+from benchmarks.common import create_bench_user, drop_bench_user
+
+
+class StatementCounter:
+    """エンジンで実行された SQL 文の数を数える"""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *args) -> None:
+        self.count += 1
+
+
+def run(name: str, count: int, write: Callable[[int], object], refresh: bool, db, counter: StatementCounter) -> dict:
+    """write を count 回実行し、1 秒あたりの処理数と 1 回あたりの SQL 文数を返す"""
+    counter.count = 0
+    start = time.perf_counter()
+    for i in range(count):
+        obj = write(i)
+        if refresh:
+            db.refresh(obj)
+    elapsed = time.perf_counter() - start
+    return {
+        "operation": name,
+        "refresh": refresh,
+        "count": count,
+        "ops_per_sec": round(count / elapsed),
+        "statements_per_op": round(counter.count / count, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--refresh", action="store_true", help="書き込み後に db.refresh を実行する（変更前の挙動）")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    user, status = create_bench_user(db, "bench_writes")
+    counter = StatementCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        tasks = []
+        statuses = []
+
+        def create_task(i: int):
+            task = task_crud.create_task(
+                db,
+                TaskCreate(title=f"task {i}", content="", due_date=date(2025, 1, 1), status_id=status.id),
+                user_id=user.id,
+            )
+            tasks.append(task)
+            return task
+
+        def update_task(i: int):
+            return task_crud.update_task(
+                db,
+                tasks[i],
+                TaskUpdate(title=f"task {i} updated", content="", due_date=date(2025, 1, 2), status_id=status.id),
+            )
+
+        def create_status(i: int):
+            created = status_crud.create_status(db, StatusCreate(name=f"status {i}", color="#000000"), user_id=user.id)
+            statuses.append(created)
+            return created
+
+        def update_status(i: int):
+            return status_crud.update_status(db, statuses[i], StatusUpdate(name=f"status {i}!", color="#FFFFFF"))
+
+        for name, write in [
+            ("create_task", create_task),
+            ("update_task", update_task),
+            ("create_status", create_status),
+            ("update_status", update_status),
+        ]:
+            print(json.dumps(run(name, args.count, write, args.refresh, db, counter)))
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+        db.rollback()
+        drop_bench_user(db, user.id)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
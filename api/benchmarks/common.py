@@ -0,0 +1,97 @@
+"""ベンチマーク共通処理（データ投入・計測）"""
+
+import random
+import statistics
+import time
+from collections.abc import Callable
+from datetime import date, timedelta
+
+from sqlalchemy import delete, insert, text
+from sqlalchemy.orm import Session
+
+from app.models.status import Status
+from app.models.task import Task
+from app.models.task_deletion import TaskDeletion
+from app.models.user import User
+
+TITLE_WORDS = [
+    "会議資料の作成", "請求書の送付", "買い物", "週次レポート", "議事録の共有",
+    "デザインレビュー", "API設計", "障害対応", "採用面接", "経費精算",
+    "Release notes", "Code review", "Refactoring", "Deploy to staging",
+]
+CONTENT_WORDS = [
+    "関係者に確認する", "期限までに提出", "資料を添付する", "先方と日程調整",
+    "テストを追加する", "ドキュメントを更新", "follow up with the team", "check metrics",
+]
+
+
+def create_bench_user(db: Session, username: str) -> tuple[User, Status]:
+    """ベンチマーク用のユーザーとステータスを作成する"""
+    user = User(username=username, email=f"{username}@example.com", hashed_password="!")
+    db.add(user)
+    db.flush()
+    status = Status(name="未着手", color="#6B7280", order=1, user_id=user.id)
+    db.add(status)
+    db.commit()
+    return user, status
+
+
+def drop_bench_user(db: Session, user_id: int) -> None:
+    """ベンチマーク用ユーザーと関連データを削除する"""
+    db.execute(delete(Task).where(Task.user_id == user_id))
+    db.execute(delete(TaskDeletion).where(TaskDeletion.user_id == user_id))
+    db.execute(delete(Status).where(Status.user_id == user_id))
+    db.execute(delete(User).where(User.id == user_id))
+    db.commit()
+
+
+def seed_tasks(
+    db: Session,
+    user_id: int,
+    status_id: int,
+    count: int,
+    batch_size: int = 10_000,
+    seed: int = 0,
+) -> None:
+    """ランダムなタスクを count 件投入し、統計情報を更新する"""
+    rng = random.Random(seed)
+    base = date(2025, 1, 1)
+    for start in range(0, count, batch_size):
+        rows = [
+            {
+                "title": f"{rng.choice(TITLE_WORDS)} #{start + i}",
+                "content": "、".join(rng.sample(CONTENT_WORDS, 2)),
+                "due_date": base + timedelta(days=rng.randrange(730)),
+                "status_id": status_id,
+                "user_id": user_id,
+            }
+            for i in range(min(batch_size, count - start))
+        ]
+        db.execute(insert(Task), rows)
+        db.commit()
+    db.execute(text("ANALYZE tasks"))
+    db.commit()
+
+
+def percentile(values: list[float], p: float) -> float:
+    """values の p パーセンタイル（最近傍法）"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(fn: Callable[[], object], repeat: int, warmup: int = 3) -> dict[str, float]:
+    """fn を repeat 回実行し、レイテンシ（ミリ秒）の統計を返す"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+    }
@@ -2,21 +2,33 @@ import os
 
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 
-from app.auth import ACCESS_TOKEN_EXPIRES, TokenType, create_token
+from app import database
+from app.auth import ACCESS_TOKEN_EXPIRES, TokenType, access_token_cache, create_token
+from app.cache import task_stats_cache, user_cache
+from app.config import settings
 from app.database import Base, get_db
 from app.main import app
+from app.query_stats import instrument
 from app.models.status import Status
 from app.models.task import Task
 from app.models.user import User
 from tests.factories import UserFactory, StatusFactory, TaskFactory
 
+pytest_plugins = ["tests.query_budget"]
+
 TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
 
 engine = create_engine(TEST_DATABASE_URL)
-TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# アプリのエンジンと同じく、リクエストごとのクエリ数を記録する（Server-Timing, query_budget）
+instrument(engine)
+TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+# DB_ASYNC=true の場合と同じ asyncpg のURL
+TEST_ASYNC_DATABASE_URL = settings.model_copy(update={"database_url": TEST_DATABASE_URL}).async_database_url
 
 
 @pytest.fixture()
@@ -30,15 +42,36 @@ def db():
     yield session
     session.close()
     Base.metadata.drop_all(bind=engine)
-
-
-@pytest.fixture()
-def client(db: Session):
-    """テスト用HTTPクライアントを提供する。DI overrideでテスト用セッションを注入"""
-    app.dependency_overrides[get_db] = lambda: db
+    # テストごとにIDが再利用されるため、プロセス内キャッシュも破棄する
+    user_cache.clear()
+    task_stats_cache.clear()
+    access_token_cache.clear()
+
+
+@pytest.fixture(params=["sync", "async"])
+def client(request: pytest.FixtureRequest, db: Session, monkeypatch: pytest.MonkeyPatch):
+    """テスト用HTTPクライアントを提供する（同期 Session / AsyncSession（DB_ASYNC=true）の両方で実行）
+
+    sync: DI overrideでテスト用セッションを注入する
+    async: get_db が asyncpg のテスト用DBの AsyncSession を返すようにする（データはコミット済みのものが見える）
+    """
+    if request.param == "sync":
+        app.dependency_overrides[get_db] = lambda: db
+        with TestClient(app) as c:
+            yield c
+        app.dependency_overrides.clear()
+        return
+
+    # TestClient ごとにイベントループが変わるため、接続はプールしない
+    async_engine = create_async_engine(TEST_ASYNC_DATABASE_URL, poolclass=NullPool)
+    instrument(async_engine.sync_engine)
+    monkeypatch.setattr(
+        database,
+        "AsyncSessionLocal",
+        async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False),
+    )
     with TestClient(app) as c:
         yield c
-    app.dependency_overrides.clear()
 
 
 @pytest.fixture()
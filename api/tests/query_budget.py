@@ -0,0 +1,48 @@
+"""pytest プラグイン：1リクエストあたりの SQL 件数の上限（クエリバジェット）を検証する
+
+conftest の pytest_plugins で読み込む。件数は QueryStatsMiddleware が付ける Server-Timing ヘッダーから取得する。
+
+    def test_list(client, auth_headers, query_budget):
+        with query_budget(2):
+            client.get("/tasks", headers=auth_headers)
+"""
+
+import re
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+SERVER_TIMING_DB = re.compile(r'(?:^|,)\s*db;[^,]*desc="(\d+) queries"')
+
+
+def query_count(response: httpx.Response) -> int:
+    """レスポンスの Server-Timing ヘッダーから SQL の件数を取得する"""
+    match = SERVER_TIMING_DB.search(response.headers.get("server-timing", ""))
+    assert match, f"Server-Timing has no db metric: {response.request.method} {response.request.url}"
+    return int(match.group(1))
+
+
+@pytest.fixture()
+def query_budget(client: TestClient) -> Callable[[int], AbstractContextManager[list[httpx.Response]]]:
+    """ブロック内のリクエストがそれぞれ max_queries 件以下の SQL で済むことを検証する"""
+
+    @contextmanager
+    def check(max_queries: int) -> Iterator[list[httpx.Response]]:
+        responses: list[httpx.Response] = []
+        client.event_hooks["response"].append(responses.append)
+        try:
+            yield responses
+        finally:
+            client.event_hooks["response"].remove(responses.append)
+        assert responses, "no requests were made"
+        exceeded = [
+            f"{res.request.method} {res.request.url.path}: {query_count(res)} queries"
+            for res in responses
+            if query_count(res) > max_queries
+        ]
+        assert not exceeded, f"query budget ({max_queries}) exceeded:\n" + "\n".join(exceeded)
+
+    return check
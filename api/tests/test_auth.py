@@ -1,19 +1,29 @@
+import time
 from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, patch
 
 import jwt
+import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
+from pwdlib.hashers.bcrypt import BcryptHasher
 
 from app.auth import (
+    ACCESS_TOKEN_EXPIRES,
     ALGORITHM,
     PASSWORD_RESET_TOKEN_EXPIRES,
     REFRESH_TOKEN_EXPIRES,
     TokenType,
+    access_token_cache,
     create_token,
+    verify_password,
+    verify_token,
 )
+from app.cache import user_cache
 from app.config import settings
 from app.models.user import User
 from tests.factories import UserFactory
+from tests.test_cache import FailingBackend
 
 
 SIGNUP_JSON = {
@@ -87,6 +97,21 @@ class TestLogin:
         })
         assert res.status_code == 401
 
+    def test_rehash_when_cost_changed(self, client: TestClient, db):
+        """設定と異なるコストのハッシュはログイン時に再計算される"""
+        user = UserFactory(
+            email="old@example.com",
+            hashed_password=BcryptHasher(rounds=4).hash("testpassword"),
+        )
+        res = client.post("/auth/login", data={
+            "username": "old@example.com",
+            "password": "testpassword",
+        })
+        assert res.status_code == 200
+        db.refresh(user)
+        assert user.hashed_password.startswith(f"$2b${settings.bcrypt_rounds:02d}$")
+        assert verify_password("testpassword", user.hashed_password)
+
     def test_nonexistent_user(self, client: TestClient):
         res = client.post("/auth/login", data={
             "username": "noone@example.com",
@@ -115,6 +140,30 @@ class TestMe:
         res = client.get("/auth/me", headers={"Authorization": f"Bearer {refresh}"})
         assert res.status_code == 401
 
+    def test_cached_after_first_call(self, client: TestClient, test_user: User, auth_headers: dict):
+        client.get("/auth/me", headers=auth_headers)
+        hits = user_cache.hits
+        res = client.get("/auth/me", headers=auth_headers)
+        assert res.status_code == 200
+        assert res.json()["username"] == "testuser"
+        assert user_cache.hits == hits + 1
+
+    def test_update_invalidates_cache(self, client: TestClient, test_user: User, auth_headers: dict):
+        client.get("/auth/me", headers=auth_headers)
+        client.put("/auth/me", json={"username": "newname"}, headers=auth_headers)
+        res = client.get("/auth/me", headers=auth_headers)
+        assert res.json()["username"] == "newname"
+
+    def test_cache_error_falls_back_to_db(
+        self, client: TestClient, test_user: User, auth_headers: dict, monkeypatch
+    ):
+        monkeypatch.setattr(user_cache, "backend", FailingBackend())
+        res = client.get("/auth/me", headers=auth_headers)
+        assert res.status_code == 200
+        assert res.json()["username"] == "testuser"
+        res = client.put("/auth/me", json={"username": "newname"}, headers=auth_headers)
+        assert res.status_code == 200
+
 
 class TestRefresh:
     def test_refresh_success(self, client: TestClient, test_user: User):
@@ -234,3 +283,31 @@ class TestPasswordReset:
             "new_password": "newpassword123",
         })
         assert res.status_code == 401
+
+
+class TestAccessTokenCache:
+    def test_second_verify_skips_decode(self, test_user: User):
+        token = create_token(test_user.id, TokenType.ACCESS, ACCESS_TOKEN_EXPIRES)
+        with patch("app.auth.jwt.decode", wraps=jwt.decode) as decode:
+            assert verify_token(token, TokenType.ACCESS) == test_user.id
+            assert verify_token(token, TokenType.ACCESS) == test_user.id
+        assert decode.call_count == 1
+
+    def test_cached_access_token_not_accepted_as_refresh(self, test_user: User):
+        token = create_token(test_user.id, TokenType.ACCESS, ACCESS_TOKEN_EXPIRES)
+        verify_token(token, TokenType.ACCESS)
+        with pytest.raises(HTTPException):
+            verify_token(token, TokenType.REFRESH)
+
+    def test_expired_token_is_evicted(self, test_user: User):
+        token = create_token(test_user.id, TokenType.ACCESS, timedelta(seconds=1))
+        verify_token(token, TokenType.ACCESS)
+        time.sleep(1.1)
+        with pytest.raises(HTTPException):
+            verify_token(token, TokenType.ACCESS)
+
+    def test_invalid_token_not_cached(self):
+        size = len(access_token_cache)
+        with pytest.raises(HTTPException):
+            verify_token("invalid", TokenType.ACCESS)
+        assert len(access_token_cache) == size
@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+
+from app.cache import LocalCacheBackend, TTLCache, UserCache
+from app.schemas.auth import UserResponse
+
+
+class FailingBackend:
+    """すべての操作でエラーになるバックエンド（Redis の障害を想定）"""
+
+    blocking = False
+
+    def get(self, key):
+        raise ConnectionError
+
+    def set(self, key, value, ttl, generation):
+        raise ConnectionError
+
+    def invalidate(self, key):
+        raise ConnectionError
+
+    def clear(self):
+        pass
+
+
+def make_user(username: str = "cached") -> UserResponse:
+    return UserResponse(id=1, username=username, email="cached@example.com")
+
+
+class TestTTLCache:
+    def test_get_and_set(self):
+        cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_expired_entry_is_miss(self):
+        cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1, ttl=-1)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_delete(self):
+        cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+        cache.delete("a")
+        assert cache.get("a") is None
+
+
+class TestUserCache:
+    @pytest.mark.asyncio
+    async def test_get_and_set(self):
+        cache = UserCache(LocalCacheBackend(maxsize=10), ttl=60)
+        cached, generation = await cache.get(1)
+        assert cached is None
+        await cache.set(make_user(), generation)
+        cached, _ = await cache.get(1)
+        assert cached == make_user()
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_set_after_invalidate_is_skipped(self):
+        cache = UserCache(LocalCacheBackend(maxsize=10), ttl=60)
+        _, generation = await cache.get(1)
+        # DB から読んでいる間に他のリクエストで更新された場合、読んだ値（更新前）は保存しない
+        await cache.invalidate(1)
+        await cache.set(make_user("stale"), generation)
+        cached, generation = await cache.get(1)
+        assert cached is None
+        await cache.set(make_user("fresh"), generation)
+        cached, _ = await cache.get(1)
+        assert cached.username == "fresh"
+
+    @pytest.mark.asyncio
+    async def test_backend_error_is_miss(self):
+        cache = UserCache(FailingBackend(), ttl=60)
+        assert await cache.get(1) == (None, None)
+        await cache.set(make_user(), 0)
+        await cache.invalidate(1)
+        assert cache.errors == 3
+
+    @pytest.mark.asyncio
+    async def test_blocking_backend_runs_off_event_loop(self):
+        class BlockingBackend(LocalCacheBackend):
+            blocking = True
+
+            def invalidate(self, key):
+                threads.append(threading.get_ident())
+                super().invalidate(key)
+
+        threads: list[int] = []
+        cache = UserCache(BlockingBackend(maxsize=10), ttl=60)
+        await cache.invalidate(1)
+        assert threads and threads[0] != threading.get_ident()
@@ -0,0 +1,170 @@
+import asyncio
+import json
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.crud import task as task_crud
+from app.events import RESYNC_EVENT, EventBroker, Subscriber
+from app.models.status import Status
+from app.models.user import User
+from app.routers.events import event_stream, format_event
+from app.schemas.task import TaskBulkMove, TaskBulkRequest, TaskCreate
+from tests.conftest import TEST_DATABASE_URL
+
+
+def make_broker() -> EventBroker:
+    dsn = make_url(TEST_DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+    return EventBroker(dsn, queue_size=10)
+
+
+def task_data(status: Status) -> TaskCreate:
+    return TaskCreate(title="通知", content="", due_date=date(2025, 1, 1), status_id=status.id)
+
+
+class TestEventBroker:
+    @pytest.mark.asyncio
+    async def test_delivered_on_commit(self, db: Session, test_user: User, test_status: Status):
+        broker = make_broker()
+        try:
+            subscriber = await broker.subscribe(test_user.id)
+            task = task_crud.create_task(db, task_data(test_status), user_id=test_user.id)
+            event = await asyncio.wait_for(subscriber.queue.get(), timeout=5)
+            assert event == {"entity": "task", "action": "created", "ids": [task.id]}
+        finally:
+            await broker.close()
+
+    @pytest.mark.asyncio
+    async def test_other_user_not_delivered(self, db: Session, test_user: User, test_status: Status):
+        broker = make_broker()
+        try:
+            subscriber = await broker.subscribe(test_user.id + 1)
+            task_crud.create_task(db, task_data(test_status), user_id=test_user.id)
+            with pytest.raises(TimeoutError):
+                await asyncio.wait_for(subscriber.queue.get(), timeout=0.5)
+            assert broker.received == 1
+        finally:
+            await broker.close()
+
+    @pytest.mark.asyncio
+    async def test_bulk_move_sends_one_event(self, db: Session, test_user: User, test_status: Status):
+        tasks = [task_crud.create_task(db, task_data(test_status), user_id=test_user.id) for _ in range(3)]
+        task_ids = [task.id for task in tasks]
+        broker = make_broker()
+        try:
+            subscriber = await broker.subscribe(test_user.id)
+            move = TaskBulkMove(task_ids=task_ids, status_id=test_status.id)
+            task_crud.bulk_tasks(db, test_user.id, TaskBulkRequest(move=[move]))
+            event = await asyncio.wait_for(subscriber.queue.get(), timeout=5)
+            assert event == {"entity": "task", "action": "moved", "ids": task_ids}
+            assert subscriber.queue.empty()
+        finally:
+            await broker.close()
+
+    @pytest.mark.asyncio
+    async def test_not_sent_when_disabled(self, test_user: User, test_status: Status):
+        engine = create_engine(
+            TEST_DATABASE_URL, poolclass=NullPool, connect_args={"options": "-c app.events_enabled=off"}
+        )
+        broker = make_broker()
+        try:
+            subscriber = await broker.subscribe(test_user.id)
+            with Session(engine) as session:
+                task_crud.create_task(session, task_data(test_status), user_id=test_user.id)
+            with pytest.raises(TimeoutError):
+                await asyncio.wait_for(subscriber.queue.get(), timeout=0.5)
+            assert broker.received == 0
+        finally:
+            await broker.close()
+            engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe(self, test_user: User):
+        broker = make_broker()
+        try:
+            subscriber = await broker.subscribe(test_user.id)
+            assert broker.connections == 1
+            broker.unsubscribe(subscriber)
+            assert broker.connections == 0
+            assert broker.users == 0
+        finally:
+            await broker.close()
+
+
+class TestSubscriber:
+    def test_overflow_replaced_with_resync(self):
+        subscriber = Subscriber(user_id=1, maxsize=2)
+        for i in range(2):
+            assert subscriber.put({"entity": "task", "action": "updated", "ids": [i]}) == 0
+        assert subscriber.put({"entity": "task", "action": "updated", "ids": [2]}) == 3
+        assert subscriber.queue.qsize() == 1
+        assert subscriber.queue.get_nowait() == RESYNC_EVENT
+
+
+class TestEventStream:
+    @pytest.mark.asyncio
+    async def test_sends_events_and_heartbeat(self, test_user: User):
+        broker = make_broker()
+        event = {"entity": "status", "action": "reordered", "ids": [1, 2]}
+        try:
+            with patch("app.routers.events.settings.events_heartbeat_seconds", 0.01):
+                stream = event_stream(broker, test_user.id)
+                assert (await anext(stream)).startswith("retry:")
+                broker.dispatch(json.dumps({"user_id": test_user.id, **event}))
+                assert await anext(stream) == format_event(event)
+                assert await anext(stream) == ": ping\n\n"
+                await stream.aclose()
+            assert broker.connections == 0
+        finally:
+            await broker.close()
+
+    @pytest.mark.asyncio
+    async def test_not_subscribed_until_streaming(self, test_user: User):
+        broker = make_broker()
+        try:
+            # 送信を始める前に切断された（ストリームを読まずに閉じた）場合は購読が残らない
+            stream = event_stream(broker, test_user.id)
+            assert broker.connections == 0
+            await stream.aclose()
+            assert broker.connections == 0
+        finally:
+            await broker.close()
+
+    def test_unauthenticated_returns_401(self, client: TestClient):
+        res = client.get("/events")
+        assert res.status_code == 401
+
+    def test_too_many_connections_returns_503(self, client: TestClient, auth_headers: dict):
+        with patch("app.routers.events.settings.events_max_connections", 0):
+            res = client.get("/events", headers=auth_headers)
+        assert res.status_code == 503
+
+
+class TestEventsTicket:
+    # 接続数の上限を 0 にして、認証を通過したか（503）だけを確認する
+    def get_events(self, client: TestClient, **params) -> int:
+        with patch("app.routers.events.settings.events_max_connections", 0):
+            return client.get("/events", params=params).status_code
+
+    def test_ticket_authenticates_events(self, client: TestClient, auth_headers: dict):
+        res = client.post("/events/ticket", headers=auth_headers)
+        assert res.status_code == 200
+        assert res.json()["expires_in"] == 60
+        assert self.get_events(client, ticket=res.json()["ticket"]) == 503
+
+    def test_access_token_not_accepted_in_url(self, client: TestClient, auth_headers: dict):
+        access_token = auth_headers["Authorization"].removeprefix("Bearer ")
+        assert self.get_events(client, access_token=access_token) == 401
+        assert self.get_events(client, ticket=access_token) == 401
+
+    def test_ticket_not_usable_as_access_token(self, client: TestClient, auth_headers: dict):
+        ticket = client.post("/events/ticket", headers=auth_headers).json()["ticket"]
+        assert client.get("/tasks", headers={"Authorization": f"Bearer {ticket}"}).status_code == 401
+
+    def test_requires_authentication(self, client: TestClient):
+        assert client.post("/events/ticket").status_code == 401
@@ -0,0 +1,227 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.config import Settings, settings
+from app.database import engine_options
+from app.http_metrics import Histogram, HttpMetrics, HttpMetricsMiddleware, MetricsPortMiddleware
+from app.main import app
+
+
+def metric_value(text: str, line_prefix: str) -> float:
+    """Prometheus のテキスト形式から、ラベルを含む行頭が一致する値を取得する（なければ 0）"""
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0
+
+
+def make_settings(**kwargs) -> Settings:
+    return Settings(database_url="postgresql://u:p@db/x", cors_origins="*", secret_key="s", **kwargs)
+
+
+@pytest.fixture()
+def admin_headers(monkeypatch, test_user, auth_headers: dict) -> dict[str, str]:
+    """DEBUG_ADMIN_USER_IDS に含まれるユーザーの認証済みヘッダー"""
+    monkeypatch.setattr(settings, "debug_admin_user_ids", str(test_user.id))
+    return auth_headers
+
+
+@pytest.fixture()
+def scrape_headers(monkeypatch) -> dict[str, str]:
+    """METRICS_TOKEN を設定し、API のポートで GET /metrics を取得するヘッダー"""
+    monkeypatch.setattr(settings, "metrics_token", "scrape-token")
+    return {"Authorization": "Bearer scrape-token"}
+
+
+class TestAdminOnly:
+    @pytest.mark.parametrize(
+        "path", ["/metrics/db-pool", "/metrics/user-cache", "/metrics/password-hashing", "/metrics/events"]
+    )
+    def test_requires_admin(self, client: TestClient, auth_headers: dict, path: str):
+        assert client.get(path).status_code == 401
+        assert client.get(path, headers=auth_headers).status_code == 403
+
+    def test_hidden_from_schema(self, client: TestClient):
+        paths = client.get("/openapi.json").json()["paths"]
+        assert not [path for path in paths if path.startswith("/metrics")]
+
+    def test_admin_user_ids(self):
+        assert make_settings(debug_admin_user_ids=" 1, 2 ,").debug_admin_user_id_set == {1, 2}
+
+    def test_invalid_admin_user_ids_rejected(self):
+        # 起動時の設定読み込みで失敗させ、リクエスト時の 500 にしない
+        with pytest.raises(ValidationError, match="DEBUG_ADMIN_USER_IDS"):
+            make_settings(debug_admin_user_ids="1,admin")
+
+
+class TestDbPoolMetrics:
+    def test_get(self, client: TestClient, admin_headers: dict):
+        res = client.get("/metrics/db-pool", headers=admin_headers)
+        assert res.status_code == 200
+        body = res.json()
+        assert body["sync_engine"]["size"] >= 1
+        assert "checked_out" in body["sync_engine"]
+        assert "checkout_wait_seconds_total" in body["sync_engine"]
+
+
+class TestUserCacheMetrics:
+    def test_counts_hits_and_misses(self, client: TestClient, admin_headers: dict):
+        before = client.get("/metrics/user-cache", headers=admin_headers).json()
+        client.get("/auth/me", headers=admin_headers)
+        client.get("/auth/me", headers=admin_headers)
+        after = client.get("/metrics/user-cache", headers=admin_headers).json()
+        assert after["misses"] == before["misses"] + 1
+        assert after["hits"] == before["hits"] + 1
+
+
+class TestPasswordHashingMetrics:
+    def test_counts_completed(self, client: TestClient, admin_headers: dict):
+        before = client.get("/metrics/password-hashing", headers=admin_headers).json()
+        client.post("/auth/login", data={"username": "test@example.com", "password": "testpassword"})
+        after = client.get("/metrics/password-hashing", headers=admin_headers).json()
+        assert after["completed"] == before["completed"] + 1
+        assert after["in_flight"] == 0
+        assert after["waiting"] == 0
+
+
+class TestEngineOptions:
+    def test_pool_settings(self):
+        options = engine_options(make_settings(db_pool_size=20, db_max_overflow=0), "psycopg2")
+        assert options["pool_size"] == 20
+        assert options["max_overflow"] == 0
+        assert "connect_args" not in options
+
+    def test_statement_timeout_psycopg2(self):
+        options = engine_options(make_settings(db_statement_timeout_ms=500), "psycopg2")
+        assert options["connect_args"] == {"options": "-c statement_timeout=500"}
+
+    def test_statement_timeout_asyncpg(self):
+        options = engine_options(make_settings(db_statement_timeout_ms=500), "asyncpg")
+        assert options["connect_args"] == {"server_settings": {"statement_timeout": "500"}}
+
+    def test_events_disabled_psycopg2(self):
+        options = engine_options(
+            make_settings(events_enabled=False, db_statement_timeout_ms=500), "psycopg2"
+        )
+        assert options["connect_args"] == {
+            "options": "-c statement_timeout=500 -c app.events_enabled=off"
+        }
+
+    def test_events_disabled_asyncpg(self):
+        options = engine_options(make_settings(events_enabled=False), "asyncpg")
+        assert options["connect_args"] == {"server_settings": {"app.events_enabled": "off"}}
+
+    def test_pgbouncer_disables_prepared_statements(self):
+        options = engine_options(
+            make_settings(db_pgbouncer=True, db_statement_timeout_ms=500), "asyncpg"
+        )
+        connect_args = options["connect_args"]
+        assert connect_args["statement_cache_size"] == 0
+        assert connect_args["prepared_statement_cache_size"] == 0
+        assert "server_settings" not in connect_args
+
+
+class TestEventStreamMetrics:
+    def test_event_stream_metrics(self, client: TestClient, admin_headers: dict):
+        res = client.get("/metrics/events", headers=admin_headers)
+        assert res.status_code == 200
+        body = res.json()
+        assert body["enabled"] is True
+        assert body["connections"] == 0
+        assert set(body) >= {"listening", "users", "received", "dropped"}
+
+
+class TestPrometheusMetrics:
+    def test_counts_by_route_template(
+        self, client: TestClient, auth_headers: dict, scrape_headers: dict, test_task
+    ):
+        route = 'method="GET",route="/tasks/{task_id}"'
+        before = client.get("/metrics", headers=scrape_headers).text
+        client.get(f"/tasks/{test_task.id}", headers=auth_headers)
+        client.get(f"/tasks/{test_task.id + 1}", headers=auth_headers)
+        res = client.get("/metrics", headers=scrape_headers)
+        assert res.status_code == 200
+        assert res.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+        after = res.text
+        for status_code in ("200", "404"):
+            prefix = f'http_requests_total{{{route},status="{status_code}"}}'
+            assert metric_value(after, prefix) == metric_value(before, prefix) + 1
+        prefix = f"http_request_duration_seconds_count{{{route}}}"
+        assert metric_value(after, prefix) == metric_value(before, prefix) + 2
+        inf = f'http_request_duration_seconds_bucket{{{route},le="+Inf"}}'
+        assert metric_value(after, inf) == metric_value(after, prefix)
+
+    def test_unmatched_route(self, client: TestClient, scrape_headers: dict):
+        prefix = 'http_requests_total{method="GET",route="<unmatched>",status="404"}'
+        before = metric_value(client.get("/metrics", headers=scrape_headers).text, prefix)
+        client.get("/no-such-path/1")
+        client.get("/no-such-path/2")
+        assert metric_value(client.get("/metrics", headers=scrape_headers).text, prefix) == before + 2
+
+    def test_in_progress_and_db_pool(self, client: TestClient, scrape_headers: dict):
+        text = client.get("/metrics", headers=scrape_headers).text
+        # /metrics 自身が処理中
+        assert metric_value(text, 'http_requests_in_progress{method="GET"}') == 1
+        assert metric_value(text, 'db_pool_size{engine="sync"}') >= 1
+        assert "# TYPE db_pool_checkouts_total counter" in text
+
+    def test_requires_token_on_api_port(self, client: TestClient, auth_headers: dict):
+        # METRICS_TOKEN が空の場合はメトリクス用ポートからのみ取得できる
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer "}).status_code == 401
+
+    def test_rejects_other_tokens(self, client: TestClient, auth_headers: dict, scrape_headers: dict):
+        assert client.get("/metrics").status_code == 401
+        # ユーザーのアクセストークンでは取得できない
+        assert client.get("/metrics", headers=auth_headers).status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    def test_not_in_openapi(self, client: TestClient):
+        assert "/metrics" not in client.get("/openapi.json").json()["paths"]
+
+
+class TestHistogram:
+    def test_cumulative_buckets(self):
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        assert list(histogram.cumulative()) == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+        assert histogram.count == 4
+        assert histogram.sum == 3.65
+
+
+class TestHttpMetricsMiddleware:
+    def test_event_stream_not_timed(self):
+        metrics = HttpMetrics()
+        stream_app = FastAPI()
+
+        @stream_app.get("/events")
+        async def events():
+            return StreamingResponse(iter(["data: {}\n\n"]), media_type="text/event-stream")
+
+        @stream_app.get("/tasks")
+        async def tasks():
+            return []
+
+        client = TestClient(HttpMetricsMiddleware(stream_app, metrics=metrics))
+        client.get("/events")
+        client.get("/tasks")
+        assert metrics.requests == {("GET", "/events", "200"): 1, ("GET", "/tasks", "200"): 1}
+        assert list(metrics.latency) == [("GET", "/tasks")]
+
+
+class TestMetricsPort:
+    def test_only_metrics_on_metrics_port(self):
+        # TestClient のサーバーのポートは 80
+        client = TestClient(MetricsPortMiddleware(app, port=80))
+        assert client.get("/metrics").status_code == 200
+        assert client.get("/tasks").status_code == 404
+        assert client.get("/metrics/db-pool").status_code == 404
+
+    def test_other_ports_pass_through(self):
+        client = TestClient(MetricsPortMiddleware(app, port=9100))
+        assert client.get("/tasks").status_code == 401
+
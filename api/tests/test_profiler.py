@@ -0,0 +1,237 @@
+import selectors
+import socket
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.models.user import User
+from app.profiler import TRUNCATED, ProfilerMiddleware, SamplingProfiler, collapse, profiled, profiler
+
+
+def busy(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def sample_here(target: SamplingProfiler, *routes: str) -> None:
+    """呼び出し元のスレッドを routes の採取対象にして1回採取する"""
+    handles = [target.start(route) for route in routes]
+    target.sample()
+    for handle in handles:
+        target.stop(handle)
+
+
+class TestSamplingProfiler:
+    def test_sample_collapses_current_stack(self):
+        target = SamplingProfiler(interval=0.001, max_stacks=100)
+        sample_here(target, "GET /tasks")
+        lines = list(target.collapsed("GET /tasks"))
+        assert target.samples == 1
+        line = next(line for line in lines if "TestSamplingProfiler.test_sample" in line)
+        stack, count = line.rsplit(" ", 1)
+        assert count == "1"
+        # 呼び出し元から順に並ぶ
+        assert stack.endswith(
+            "test_profiler.py:TestSamplingProfiler.test_sample_collapses_current_stack;"
+            "test_profiler.py:sample_here;profiler.py:SamplingProfiler.sample"
+        )
+
+    def test_all_routes_prefixed(self):
+        target = SamplingProfiler(interval=0.001, max_stacks=100)
+        sample_here(target, "GET /tasks", "GET /statuses")
+        lines = list(target.collapsed())
+        assert {line.split(";", 1)[0] for line in lines} == {"GET /tasks", "GET /statuses"}
+        assert target.routes() == ["GET /statuses", "GET /tasks"]
+
+    def test_max_stacks(self):
+        target = SamplingProfiler(interval=0.001, max_stacks=1)
+        sample_here(target, "GET /tasks")
+
+        def other_stack():
+            sample_here(target, "GET /tasks")
+
+        other_stack()
+        assert any(line.startswith(f"{TRUNCATED} ") for line in target.collapsed("GET /tasks"))
+
+    def test_clear(self):
+        target = SamplingProfiler(interval=0.001, max_stacks=100)
+        sample_here(target, "GET /tasks")
+        target.clear()
+        assert list(target.collapsed()) == []
+        assert target.samples == 0
+
+    def test_other_threads_not_sampled(self):
+        target = SamplingProfiler(interval=0.001, max_stacks=100)
+        stop = threading.Event()
+
+        def unrelated_request():
+            while not stop.is_set():
+                busy(0.001)
+
+        thread = threading.Thread(target=unrelated_request)
+        thread.start()
+        try:
+            sample_here(target, "GET /tasks")
+        finally:
+            stop.set()
+            thread.join()
+        assert not any("unrelated_request" in line for line in target.collapsed())
+
+    def test_root_frame_not_running(self):
+        target = SamplingProfiler(interval=0.001, max_stacks=100)
+
+        def other_request():
+            return sys._getframe()
+
+        handle = target.start("GET /tasks", root=other_request())
+        target.sample()
+        target.stop(handle)
+        assert target.samples == 1
+        assert list(target.collapsed()) == []
+
+    def test_selector_wait_is_idle(self):
+        left, right = socket.socketpair()
+        selector = selectors.DefaultSelector()
+        selector.register(left, selectors.EVENT_READ)
+        thread = threading.Thread(target=selector.select, args=(5,))
+        thread.start()
+        try:
+            time.sleep(0.05)
+            assert collapse(sys._current_frames()[thread.ident]) is None
+        finally:
+            right.send(b"x")
+            thread.join()
+            selector.close()
+            left.close()
+            right.close()
+
+
+class TestProfilerMiddleware:
+    def make_target(self, sample_rate: float, routes: set[str] | None = None) -> SamplingProfiler:
+        return SamplingProfiler(
+            interval=0.001, max_stacks=1000, enabled=True, sample_rate=sample_rate, routes=routes
+        )
+
+    def make_client(self, target: SamplingProfiler):
+        app = FastAPI()
+
+        @app.get("/slow/{n}")
+        async def slow(n: int):
+            busy(0.05)
+            await run_in_threadpool(profiled(busy), 0.05)
+            return {"n": n}
+
+        app.add_middleware(ProfilerMiddleware, target=target)
+        return TestClient(app)
+
+    def test_profiles_sampled_route(self):
+        target = self.make_target(sample_rate=1)
+        with self.make_client(target) as client:
+            assert client.get("/slow/1").status_code == 200
+        assert target.routes() == ["GET /slow/{n}"]
+        lines = list(target.collapsed())
+        # イベントループのスレッドで実行した処理と、profiled でスレッドプールに渡した処理の両方が採取される
+        assert any("TestProfilerMiddleware.make_client.<locals>.slow;test_profiler.py:busy" in line for line in lines)
+        assert any("test_profiler.py:busy" in line and ".slow;" not in line for line in lines)
+
+    def test_not_sampled(self):
+        target = self.make_target(sample_rate=0)
+        with self.make_client(target) as client:
+            client.get("/slow/1")
+        assert target.samples == 0
+
+    def test_route_filter(self):
+        target = self.make_target(sample_rate=1, routes={"/other"})
+        with self.make_client(target) as client:
+            client.get("/slow/1")
+        assert target.samples == 0
+
+    def test_enabled_at_runtime(self):
+        target = SamplingProfiler(interval=0.001, max_stacks=1000)
+        with self.make_client(target) as client:
+            client.get("/slow/1")
+            assert target.samples == 0
+            # ミドルウェアを組み込み直さずに有効にできる
+            target.configure(enabled=True, sample_rate=1, routes={"/slow/{n}"})
+            client.get("/slow/1")
+            assert target.routes() == ["GET /slow/{n}"]
+            target.configure(enabled=False, sample_rate=1, routes=set())
+            target.clear()
+            client.get("/slow/1")
+        assert target.samples == 0
+
+
+class TestDebugProfile:
+    @pytest.fixture()
+    def enabled(self, monkeypatch, test_user: User):
+        monkeypatch.setattr(settings, "debug_admin_user_ids", str(test_user.id))
+        saved = (profiler.enabled, profiler.sample_rate, set(profiler.route_filter))
+        # テスト自身のリクエストは計測しない
+        profiler.configure(enabled=True, sample_rate=0, routes=set())
+        profiler.clear()
+        yield
+        profiler.configure(*saved)
+        profiler.clear()
+
+    def test_get(self, client: TestClient, auth_headers: dict, enabled):
+        sample_here(profiler, "GET /tasks")
+        res = client.get("/debug/profile", params={"route": "GET /tasks"}, headers=auth_headers)
+        assert res.status_code == 200
+        assert res.headers["x-profile-samples"] == "1"
+        assert res.headers["x-profile-routes"] == "GET /tasks"
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in res.text.splitlines())
+        assert "TestDebugProfile.test_get" in res.text
+
+    def test_reset(self, client: TestClient, auth_headers: dict, enabled):
+        sample_here(profiler, "GET /tasks")
+        client.get("/debug/profile", params={"reset": True}, headers=auth_headers)
+        assert client.get("/debug/profile", headers=auth_headers).text == ""
+        sample_here(profiler, "GET /tasks")
+        assert client.delete("/debug/profile", headers=auth_headers).status_code == 204
+        assert profiler.samples == 0
+
+    def test_requires_admin(self, client: TestClient, auth_headers: dict, enabled, monkeypatch):
+        monkeypatch.setattr(settings, "debug_admin_user_ids", "")
+        assert client.get("/debug/profile", headers=auth_headers).status_code == 403
+
+    def test_disabled(self, client: TestClient, auth_headers: dict, enabled):
+        profiler.configure(enabled=False, sample_rate=0, routes=set())
+        assert client.get("/debug/profile", headers=auth_headers).status_code == 404
+
+    def test_update_config(self, client: TestClient, auth_headers: dict, enabled):
+        config = {"enabled": True, "sample_rate": 1.0, "routes": ["/tasks"]}
+        res = client.put("/debug/profiler", json=config, headers=auth_headers)
+        assert res.status_code == 200
+        assert res.json() == config
+        assert client.get("/debug/profiler", headers=auth_headers).json() == config
+        with patch.object(profiler, "start", wraps=profiler.start) as start:
+            client.get("/tasks", headers=auth_headers)
+            client.get("/statuses", headers=auth_headers)
+        # 同期 Session では run_db でスレッドプールに渡した処理も同じルートで登録される
+        assert {call.args[0] for call in start.call_args_list} == {"GET /tasks"}
+
+        res = client.put("/debug/profiler", json={**config, "enabled": False}, headers=auth_headers)
+        assert res.json()["enabled"] is False
+        assert client.get("/debug/profile", headers=auth_headers).status_code == 404
+
+    def test_invalid_sample_rate(self, client: TestClient, auth_headers: dict, enabled):
+        res = client.put("/debug/profiler", json={"enabled": True, "sample_rate": 2}, headers=auth_headers)
+        assert res.status_code == 422
+
+    def test_config_requires_admin(self, client: TestClient, auth_headers: dict, enabled, monkeypatch):
+        monkeypatch.setattr(settings, "debug_admin_user_ids", "")
+        config = {"enabled": True, "sample_rate": 1.0}
+        assert client.put("/debug/profiler", json=config, headers=auth_headers).status_code == 403
+        assert profiler.sample_rate == 0
+
+    def test_requires_auth(self, client: TestClient):
+        assert client.get("/debug/profile").status_code == 401
+
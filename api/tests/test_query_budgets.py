@@ -0,0 +1,148 @@
+"""エンドポイントごとの SQL 件数の上限（クエリバジェット）
+
+N+1 になっていないことを確認するため、ステータス・タスクを複数件投入した状態で計測する。
+変更通知（NOTIFY）は tasks / statuses のトリガーから送るため件数に含まれない。クエリを増やす変更をした場合は、理由を確認したうえで BUDGETS を更新する。
+ストリーミングのレスポンス（/tasks/export, /events）は、ヘッダーの送信後に SQL を発行するため対象外。
+"""
+
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.models.status import Status
+from app.models.task import Task
+from app.models.user import User
+from app.query_stats import QueryStats, _current
+from tests.factories import StatusFactory, TaskFactory
+
+TASKS = 10
+
+
+@dataclass
+class Data:
+    statuses: list[Status]
+    tasks: list[Task]
+
+
+def _task_body(data: Data) -> dict[str, Any]:
+    return {"title": "更新", "content": "", "due_date": "2025-06-01", "status_id": data.statuses[1].id}
+
+
+# (上限, リクエスト（メソッド, パス, TestClient.request の追加引数）)
+Case = tuple[int, Callable[[Data], tuple[str, str, dict[str, Any]]]]
+
+BUDGETS: dict[str, Case] = {
+    "login": (1, lambda d: (
+        "POST", "/auth/login", {"data": {"username": "test@example.com", "password": "testpassword"}}
+    )),
+    "me": (1, lambda d: ("GET", "/auth/me", {})),
+    "update_me": (2, lambda d: ("PUT", "/auth/me", {"json": {"username": "renamed"}})),
+    "list_statuses": (2, lambda d: ("GET", "/statuses", {})),
+    "get_status": (1, lambda d: ("GET", f"/statuses/{d.statuses[0].id}", {})),
+    "create_status": (2, lambda d: ("POST", "/statuses", {"json": {"name": "新規", "color": "#000000"}})),
+    "update_status": (2, lambda d: (
+        "PUT", f"/statuses/{d.statuses[0].id}", {"json": {"name": "変更", "color": "#000000"}}
+    )),
+    "reorder_statuses": (1, lambda d: (
+        "PUT", "/statuses/reorder", {"json": {"order": [s.id for s in reversed(d.statuses)]}}
+    )),
+    "move_status": (4, lambda d: (
+        "PUT", f"/statuses/{d.statuses[0].id}/move", {"json": {"after_id": d.statuses[2].id}}
+    )),
+    "delete_status": (1, lambda d: ("DELETE", f"/statuses/{d.statuses[-1].id}", {})),
+    "delete_status_reassign": (2, lambda d: (
+        "DELETE", f"/statuses/{d.statuses[0].id}", {"params": {"reassign_to": d.statuses[1].id}}
+    )),
+    "list_tasks": (2, lambda d: ("GET", "/tasks", {})),
+    "list_tasks_page": (2, lambda d: ("GET", "/tasks", {"params": {"limit": 3}})),
+    "list_tasks_fields": (2, lambda d: ("GET", "/tasks", {"params": {"fields": "title,status_id"}})),
+    "search_tasks": (2, lambda d: ("GET", "/tasks", {"params": {"q": "タスク", "sort": "relevance"}})),
+    "task_changes": (2, lambda d: ("GET", "/tasks/changes", {})),
+    "task_stats": (2, lambda d: ("GET", "/tasks/stats", {})),
+    "import_tasks": (2, lambda d: ("POST", "/tasks/import", {"files": {"file": (
+        "tasks.csv",
+        f"title,due_date,status\nA,2025-01-01,{d.statuses[0].name}\nB,2025-01-02,{d.statuses[1].name}\n".encode(),
+        "text/csv",
+    )}})),
+    "bulk_tasks": (7, lambda d: ("POST", "/tasks/bulk", {"json": {
+        "create": [_task_body(d)],
+        "update": [{"id": d.tasks[0].id, **_task_body(d)}],
+        "move": [{"task_ids": [t.id for t in d.tasks[1:5]], "status_id": d.statuses[2].id}],
+        "delete": [d.tasks[5].id, d.tasks[6].id],
+    }})),
+    "get_task": (1, lambda d: ("GET", f"/tasks/{d.tasks[0].id}", {})),
+    "create_task": (2, lambda d: ("POST", "/tasks", {"json": _task_body(d)})),
+    "update_task": (3, lambda d: ("PUT", f"/tasks/{d.tasks[0].id}", {"json": _task_body(d)})),
+    "delete_task": (4, lambda d: ("DELETE", f"/tasks/{d.tasks[0].id}", {})),
+}
+
+
+@pytest.fixture()
+def data(db, test_user: User) -> Data:
+    statuses = [
+        StatusFactory(name=name, order=(i + 1) * 1024, user_id=test_user.id)
+        for i, name in enumerate(["未着手", "進行中", "完了", "保留"])
+    ]
+    tasks = [
+        TaskFactory(
+            title=f"タスク{i}", due_date=date(2025, 1, i + 1), user_id=test_user.id, status_id=statuses[i % 2].id
+        )
+        for i in range(TASKS)
+    ]
+    return Data(statuses=statuses, tasks=tasks)
+
+
+class TestQueryBudgets:
+    @pytest.mark.parametrize("name", list(BUDGETS))
+    def test_within_budget(self, client: TestClient, auth_headers: dict, data: Data, query_budget, name: str):
+        budget, build = BUDGETS[name]
+        method, path, kwargs = build(data)
+        with query_budget(budget):
+            res = client.request(method, path, headers=auth_headers, **kwargs)
+        assert res.status_code < 400, res.text
+
+
+class TestServerTiming:
+    def test_header(self, client: TestClient, auth_headers: dict, data: Data):
+        res = client.get("/tasks", headers=auth_headers)
+        metrics = res.headers["server-timing"].split(", ")
+        assert metrics[0].startswith("db;dur=")
+        assert metrics[0].endswith('queries"')
+        assert metrics[1].startswith("db-slowest;dur=")
+
+    def test_logs_query_stats(self, client: TestClient, auth_headers: dict, data: Data, caplog):
+        with caplog.at_level(logging.INFO, logger="app.query_stats"):
+            client.get("/tasks", headers=auth_headers)
+        (record,) = [r for r in caplog.records if r.name == "app.query_stats"]
+        assert record.path == "/tasks"
+        assert record.status_code == 200
+        assert record.db_queries == 2
+        assert record.db_slowest_statement.startswith("SELECT")
+
+    def test_budget_exceeded(self, client: TestClient, auth_headers: dict, data: Data, query_budget):
+        with pytest.raises(AssertionError, match="query budget"):
+            with query_budget(0):
+                client.get("/tasks", headers=auth_headers)
+
+
+class TestQueryStats:
+    def test_failed_statement_is_recorded(self, db: Session):
+        stats = QueryStats()
+        token = _current.set(stats)
+        try:
+            with pytest.raises(DBAPIError):
+                db.execute(text("SELECT 1 / 0"))
+            db.rollback()
+            db.execute(text("SELECT 1"))
+        finally:
+            _current.reset(token)
+        assert stats.count == 2
+        assert stats.slowest_statement in ("SELECT 1 / 0", "SELECT 1")
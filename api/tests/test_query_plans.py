@@ -0,0 +1,236 @@
+"""app/crud のクエリが大きなテーブルでシーケンシャルスキャンにならないことを EXPLAIN で確認する
+
+ユーザーごとのデータ量が全体に比べて小さい状態（多数のユーザー）を投入して ANALYZE し、
+各 CRUD 関数が発行した SQL の実行計画に、アプリのテーブルへの Seq Scan が含まれないことを確認する。
+"""
+
+import json
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.crud import status as status_crud
+from app.crud import task as task_crud
+from app.crud import user as user_crud
+from app.database import Base
+from app.models.status import Status
+from app.models.task import Task
+from app.models.task_deletion import TaskDeletion
+from app.models.user import User
+from app.schemas.status import StatusCreate, StatusUpdate
+from app.schemas.task import TaskBulkRequest, TaskCreate, TaskUpdate
+from tests.conftest import TestSessionLocal, engine
+
+USERS = 1000
+STATUSES_PER_USER = 5
+TASKS_PER_USER = 50
+DELETIONS_PER_USER = 5
+TABLES = {"users", "statuses", "tasks", "task_deletions", "user_data_versions"}
+
+
+@dataclass
+class Fixture:
+    """テストケースごとに割り当てるユーザーとそのデータ"""
+    user: User
+    statuses: list[Status]
+    tasks: list[Task]
+
+
+@pytest.fixture(scope="module")
+def plan_db() -> Iterator[Session]:
+    """多数のユーザーのデータを投入したセッション（モジュール内で共有）"""
+    Base.metadata.create_all(bind=engine)
+    session = TestSessionLocal()
+    user_ids = session.scalars(
+        insert(User).returning(User.id, sort_by_parameter_order=True),
+        [
+            {"username": f"plan{i}", "email": f"plan{i}@example.com", "hashed_password": "!"}
+            for i in range(USERS)
+        ],
+    ).all()
+    status_rows = session.execute(
+        insert(Status).returning(Status.id, Status.user_id, sort_by_parameter_order=True),
+        [
+            {"name": f"ステータス{j}", "color": "#6B7280", "order": (j + 1) * 1024, "user_id": user_id}
+            for user_id in user_ids
+            for j in range(STATUSES_PER_USER)
+        ],
+    ).all()
+    first_status = {}
+    for status_id, user_id in status_rows:
+        first_status.setdefault(user_id, status_id)
+    session.execute(
+        insert(Task),
+        [
+            {
+                "title": f"タスク{j}",
+                "content": "内容",
+                "due_date": date(2025, 1, 1) + timedelta(days=j),
+                "status_id": first_status[user_id],
+                "user_id": user_id,
+            }
+            for user_id in user_ids
+            for j in range(TASKS_PER_USER)
+        ],
+    )
+    session.execute(
+        insert(TaskDeletion),
+        [
+            {"task_id": 10_000_000 + j, "user_id": user_id}
+            for user_id in user_ids
+            for j in range(DELETIONS_PER_USER)
+        ],
+    )
+    session.commit()
+    session.execute(text("ANALYZE"))
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def load_fixture(db: Session, index: int) -> Fixture:
+    # ケースごとに別のユーザーを使い、更新系のケースが他のケースに影響しないようにする
+    user = db.scalar(select(User).where(User.username == f"plan{index}"))
+    statuses = status_crud.get_statuses(db, user.id)
+    tasks = db.scalars(select(Task).where(Task.user_id == user.id).order_by(Task.id)).all()
+    return Fixture(user=user, statuses=list(statuses), tasks=list(tasks))
+
+
+def _task_data(status_id: int, title: str = "更新") -> dict:
+    return {"title": title, "content": "", "due_date": date(2025, 6, 1), "status_id": status_id}
+
+
+def _reorder(db: Session, f: Fixture) -> None:
+    ids = [status.id for status in f.statuses]
+    status_crud.reorder_statuses(db, ids[::-1], f.user.id)
+
+
+def _move_with_rebalance(db: Session, f: Fixture) -> None:
+    first, second = f.statuses[0], f.statuses[1]
+    second.order = first.order + 1
+    db.commit()
+    status_crud.move_status(db, f.statuses[-1], after=first)
+
+
+def _delete_unused_status(db: Session, f: Fixture) -> None:
+    status = status_crud.create_status(db, StatusCreate(name="削除用", color="#000000"), f.user.id)
+    status_crud.delete_status(db, status.id, f.user.id)
+
+
+def _delete_status_in_use(db: Session, f: Fixture) -> None:
+    with pytest.raises(status_crud.StatusInUseError):
+        status_crud.delete_status(db, f.statuses[0].id, f.user.id)
+
+
+def _delete_status_reassign(db: Session, f: Fixture) -> None:
+    status_crud.delete_status(db, f.statuses[0].id, f.user.id, reassign_to=f.statuses[1].id)
+
+
+def _changes(db: Session, f: Fixture) -> None:
+    _, _, token = task_crud.get_task_changes(db, f.user.id)
+    task_crud.get_task_changes(db, f.user.id, token)
+
+
+def _bulk(db: Session, f: Fixture) -> None:
+    status_id = f.statuses[1].id
+    task_crud.bulk_tasks(db, f.user.id, TaskBulkRequest(
+        create=[TaskCreate(**_task_data(status_id))],
+        update=[{"id": f.tasks[0].id, **_task_data(status_id)}],
+        move=[{"task_ids": [f.tasks[1].id], "status_id": status_id}],
+        delete=[f.tasks[2].id],
+    ))
+
+
+def _import(db: Session, f: Fixture) -> None:
+    rows = iter([(2, {"title": "インポート", "due_date": "2025-01-01", "status": f.statuses[0].name})])
+    validator = task_crud.TaskImportValidator(f.user.id, task_crud.get_import_statuses(db, f.user.id))
+    task_crud.insert_tasks(db, validator.validate(rows))
+    task_crud.finish_import(db, validator)
+
+
+CASES: dict[str, Callable[[Session, Fixture], object]] = {
+    "get_tasks": lambda db, f: task_crud.get_tasks(db, f.user.id),
+    "get_tasks_keyword": lambda db, f: task_crud.get_tasks(db, f.user.id, keyword="タスク1", sort="relevance"),
+    "get_tasks_due_date_range": lambda db, f: task_crud.get_tasks(
+        db, f.user.id, due_date_from=date(2025, 1, 10), due_date_to=date(2025, 1, 20)
+    ),
+    "get_tasks_page": lambda db, f: task_crud.get_tasks_page(
+        db, f.user.id, limit=10, cursor=task_crud.get_tasks_page(db, f.user.id, limit=10)[1]
+    ),
+    "export": lambda db, f: db.execute(task_crud.build_export_query(f.user.id)).all(),
+    "get_tasks_version": lambda db, f: task_crud.get_tasks_version(db, f.user.id),
+    "get_task_stats": lambda db, f: task_crud.get_task_stats(db, f.user.id, today=date(2025, 1, 15)),
+    "get_task": lambda db, f: task_crud.get_task(db, f.tasks[0].id, f.user.id),
+    "get_task_changes": _changes,
+    "create_task": lambda db, f: task_crud.create_task(db, TaskCreate(**_task_data(f.statuses[0].id)), f.user.id),
+    "update_task": lambda db, f: task_crud.update_task(
+        db, f.tasks[0], TaskUpdate(**_task_data(f.statuses[0].id)), expected_updated_at=f.tasks[0].updated_at
+    ),
+    "delete_task": lambda db, f: task_crud.delete_task(db, f.tasks[0]),
+    "bulk_tasks": _bulk,
+    "import_tasks": _import,
+    "get_statuses": lambda db, f: status_crud.get_statuses(db, f.user.id),
+    "get_statuses_version": lambda db, f: status_crud.get_statuses_version(db, f.user.id),
+    "get_status": lambda db, f: status_crud.get_status(db, f.statuses[0].id, f.user.id),
+    "get_owned_status_ids": lambda db, f: status_crud.get_owned_status_ids(
+        db, [status.id for status in f.statuses], f.user.id
+    ),
+    "create_status": lambda db, f: status_crud.create_status(
+        db, StatusCreate(name="新規", color="#000000"), f.user.id
+    ),
+    "update_status": lambda db, f: status_crud.update_status(
+        db, f.statuses[0], StatusUpdate(name="変更", color="#000000")
+    ),
+    "reorder_statuses": _reorder,
+    "move_status": lambda db, f: status_crud.move_status(db, f.statuses[0], after=f.statuses[2]),
+    "move_status_rebalance": _move_with_rebalance,
+    "has_tasks_with_status": lambda db, f: status_crud.has_tasks_with_status(db, f.statuses[0].id),
+    "delete_status": _delete_unused_status,
+    "delete_status_in_use": _delete_status_in_use,
+    "delete_status_reassign": _delete_status_reassign,
+    "get_user": lambda db, f: user_crud.get_user(db, f.user.id),
+    "get_user_by_email": lambda db, f: user_crud.get_user_by_email(db, f.user.email),
+    "update_username": lambda db, f: user_crud.update_username(db, f.user, f"renamed{f.user.id}"),
+}
+
+
+def capture_statements(db: Session, fn: Callable[[], object]) -> list[tuple[str, object]]:
+    """fn の実行中に発行された SQL（executemany を除く）を記録する"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if executemany:
+            return
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def seq_scans(plan: dict) -> Iterator[str]:
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in TABLES:
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from seq_scans(child)
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_no_seq_scan(plan_db: Session, name: str):
+    fixture = load_fixture(plan_db, list(CASES).index(name))
+    statements = capture_statements(plan_db, lambda: CASES[name](plan_db, fixture))
+    plan_db.rollback()
+    assert statements, "no statements captured"
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            (plan,) = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+            tables = list(seq_scans(plan["Plan"]))
+            assert not tables, f"Seq Scan on {tables}:\n{statement}\n{json.dumps(plan, indent=1)}"
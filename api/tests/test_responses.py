@@ -0,0 +1,32 @@
+import json
+from unittest.mock import patch
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app.models.task import Task
+from app.responses import get_default_response_class, model_response
+from app.schemas.task import TaskListResponse, TaskResponse
+
+
+class TestModelResponse:
+    def test_body_matches_model(self, test_tasks: list[Task]):
+        model = TaskListResponse(tasks=test_tasks)
+        res = model_response(model, headers={"ETag": '"x"'})
+        assert res.media_type == "application/json"
+        assert res.headers["etag"] == '"x"'
+        assert json.loads(res.body) == model.model_dump(mode="json")
+
+    def test_list_endpoint_schema_unchanged(self, client, test_tasks: list[Task], auth_headers: dict):
+        body = client.get("/tasks", headers=auth_headers).json()
+        assert [TaskResponse.model_validate(t) for t in body["tasks"]]
+        assert body["next_cursor"] is None
+
+
+class TestDefaultResponseClass:
+    def test_json(self):
+        with patch("app.responses.settings.json_response_class", "json"):
+            assert get_default_response_class() is JSONResponse
+
+    def test_orjson(self):
+        with patch("app.responses.settings.json_response_class", "orjson"):
+            assert get_default_response_class() is ORJSONResponse
@@ -0,0 +1,83 @@
+from unittest.mock import patch
+
+import pytest
+import uvicorn
+
+from app.config import Settings
+from app.server import Arbiter, max_requests, share_resources
+
+
+def make_settings(**kwargs) -> Settings:
+    return Settings(database_url="postgresql://u:p@db/x", cors_origins="*", secret_key="s", **kwargs)
+
+
+class TestShareResources:
+    def test_splits_db_connections(self):
+        config = make_settings(db_max_connections=40, db_pool_size=5, db_max_overflow=10)
+        share_resources(config, workers=4)
+        # ワーカーあたり10本（常時5本 + 一時的に5本）
+        assert (config.db_pool_size, config.db_max_overflow) == (5, 5)
+
+    def test_small_budget_shrinks_pool(self):
+        config = make_settings(db_max_connections=10, db_pool_size=5, db_max_overflow=10)
+        share_resources(config, workers=4)
+        assert (config.db_pool_size, config.db_max_overflow) == (2, 0)
+
+    def test_one_connection_per_worker(self):
+        config = make_settings(db_max_connections=8)
+        share_resources(config, workers=8)
+        assert (config.db_pool_size, config.db_max_overflow) == (1, 0)
+
+    def test_fewer_connections_than_workers(self):
+        config = make_settings(db_max_connections=2)
+        with pytest.raises(ValueError, match="DB_MAX_CONNECTIONS"):
+            share_resources(config, workers=8)
+
+    def test_keeps_smaller_overflow(self):
+        config = make_settings(db_max_connections=100, db_pool_size=5, db_max_overflow=3)
+        share_resources(config, workers=4)
+        # ワーカーあたり25本まで使えるが、設定値（常時5本 + 一時的に3本）より増やさない
+        assert (config.db_pool_size, config.db_max_overflow) == (5, 3)
+
+    def test_unlimited_keeps_pool_settings(self):
+        config = make_settings(db_pool_size=5, db_max_overflow=10)
+        share_resources(config, workers=4)
+        assert (config.db_pool_size, config.db_max_overflow) == (5, 10)
+
+    def test_splits_password_hash_workers(self):
+        config = make_settings()
+        with patch("app.server.available_cpus", return_value=8):
+            share_resources(config, workers=4)
+        assert config.password_hash_workers == 2
+
+    def test_keeps_explicit_password_hash_workers(self):
+        config = make_settings(password_hash_workers=3)
+        share_resources(config, workers=4)
+        assert config.password_hash_workers == 3
+
+
+class TestMaxRequests:
+    def test_disabled(self):
+        assert max_requests(make_settings()) is None
+
+    def test_jitter(self):
+        config = make_settings(max_requests=1000, max_requests_jitter=50)
+        values = {max_requests(config) for _ in range(200)}
+        assert min(values) >= 1000
+        assert max(values) <= 1050
+        assert len(values) > 1
+
+
+class TestArbiter:
+    def test_respawn_keeps_worker_slot(self):
+        config = make_settings()
+        arbiter = Arbiter(uvicorn.Config("app.main:app"), config, workers=3)
+        arbiter.pids = {101: 0, 102: 1, 103: 2}
+        with (
+            patch("app.server.os.waitpid", side_effect=[(102, 0), (0, 0)]),
+            patch.object(arbiter, "spawn") as spawn,
+        ):
+            arbiter.reap(respawn=True)
+        spawn.assert_called_once_with(1)
+        assert arbiter.pids == {101: 0, 103: 2}
+
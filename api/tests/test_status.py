@@ -1,5 +1,6 @@
 from fastapi.testclient import TestClient
 
+from app.crud.status import ORDER_GAP
 from app.models.status import Status
 from app.models.task import Task
 
@@ -18,7 +19,7 @@ class TestCreateStatus:
         body = res.json()
         assert body["name"] == STATUS_JSON["name"]
         assert body["color"] == STATUS_JSON["color"]
-        assert body["order"] == 1
+        assert body["order"] == ORDER_GAP
         assert "id" in body
         assert "created_at" in body
         assert "updated_at" in body
@@ -27,9 +28,9 @@ class TestCreateStatus:
         r1 = client.post("/statuses", json={**STATUS_JSON, "name": "A"}, headers=auth_headers)
         r2 = client.post("/statuses", json={**STATUS_JSON, "name": "B"}, headers=auth_headers)
         r3 = client.post("/statuses", json={**STATUS_JSON, "name": "C"}, headers=auth_headers)
-        assert r1.json()["order"] == 1
-        assert r2.json()["order"] == 2
-        assert r3.json()["order"] == 3
+        assert r1.json()["order"] == ORDER_GAP
+        assert r2.json()["order"] == ORDER_GAP * 2
+        assert r3.json()["order"] == ORDER_GAP * 3
 
     def test_name_empty_returns_422(self, client: TestClient, auth_headers: dict):
         res = client.post("/statuses", json={**STATUS_JSON, "name": ""}, headers=auth_headers)
@@ -116,6 +117,70 @@ class TestReorderStatuses:
         res = client.put("/statuses/reorder", json={"order": [test_status.id, NONEXISTENT_ID]}, headers=auth_headers)
         assert res.status_code == 400
 
+    def test_duplicate_ids_returns_400(self, client: TestClient, test_statuses: list[Status], auth_headers: dict):
+        s1, s2, s3 = test_statuses
+        res = client.put("/statuses/reorder", json={"order": [s1.id, s2.id, s3.id, s1.id]}, headers=auth_headers)
+        assert res.status_code == 400
+
+    def test_other_user_id_returns_400(
+        self, client: TestClient, test_statuses: list[Status], other_user_status: Status, auth_headers: dict
+    ):
+        s1, s2, _ = test_statuses
+        res = client.put(
+            "/statuses/reorder", json={"order": [s1.id, s2.id, other_user_status.id]}, headers=auth_headers
+        )
+        assert res.status_code == 400
+        names = [s["name"] for s in client.get("/statuses", headers=auth_headers).json()["statuses"]]
+        assert names == ["未着手", "進行中", "完了"]
+
+
+class TestMoveStatus:
+    def names(self, client: TestClient, auth_headers: dict) -> list[str]:
+        return [s["name"] for s in client.get("/statuses", headers=auth_headers).json()["statuses"]]
+
+    def test_move_after(self, client: TestClient, test_statuses: list[Status], auth_headers: dict):
+        s1, s2, s3 = test_statuses
+        res = client.put(f"/statuses/{s1.id}/move", json={"after_id": s2.id}, headers=auth_headers)
+        assert res.status_code == 200
+        assert self.names(client, auth_headers) == ["進行中", "未着手", "完了"]
+
+    def test_move_to_first(self, client: TestClient, test_statuses: list[Status], auth_headers: dict):
+        s1, s2, s3 = test_statuses
+        res = client.put(f"/statuses/{s3.id}/move", json={"after_id": None}, headers=auth_headers)
+        assert res.status_code == 200
+        assert self.names(client, auth_headers) == ["完了", "未着手", "進行中"]
+
+    def test_move_to_last(self, client: TestClient, test_statuses: list[Status], auth_headers: dict):
+        s1, s2, s3 = test_statuses
+        client.put(f"/statuses/{s1.id}/move", json={"after_id": s3.id}, headers=auth_headers)
+        assert self.names(client, auth_headers) == ["進行中", "完了", "未着手"]
+
+    def test_updates_only_moved_row(self, client: TestClient, auth_headers: dict):
+        ids = [client.post("/statuses", json={**STATUS_JSON, "name": n}, headers=auth_headers).json()["id"] for n in "ABC"]
+        res = client.put(f"/statuses/{ids[2]}/move", json={"after_id": ids[0]}, headers=auth_headers)
+        assert res.json()["order"] == ORDER_GAP + ORDER_GAP // 2
+        orders = {s["name"]: s["order"] for s in client.get("/statuses", headers=auth_headers).json()["statuses"]}
+        assert orders["A"] == ORDER_GAP
+        assert orders["B"] == ORDER_GAP * 2
+
+    def test_rebalance_when_no_gap(self, client: TestClient, test_statuses: list[Status], auth_headers: dict):
+        # test_statuses は order=1,2,3 で間隔がない
+        s1, s2, s3 = test_statuses
+        client.put(f"/statuses/{s3.id}/move", json={"after_id": s1.id}, headers=auth_headers)
+        assert self.names(client, auth_headers) == ["未着手", "完了", "進行中"]
+
+    def test_after_self_returns_400(self, client: TestClient, test_status: Status, auth_headers: dict):
+        res = client.put(f"/statuses/{test_status.id}/move", json={"after_id": test_status.id}, headers=auth_headers)
+        assert res.status_code == 400
+
+    def test_other_user_after_returns_404(
+        self, client: TestClient, test_status: Status, other_user_status: Status, auth_headers: dict
+    ):
+        res = client.put(
+            f"/statuses/{test_status.id}/move", json={"after_id": other_user_status.id}, headers=auth_headers
+        )
+        assert res.status_code == 404
+
 
 class TestDeleteStatus:
     def test_delete(self, client: TestClient, test_status: Status, auth_headers: dict):
@@ -132,3 +197,52 @@ class TestDeleteStatus:
     def test_delete_with_tasks_returns_409(self, client: TestClient, test_task: Task, auth_headers: dict):
         res = client.delete(f"/statuses/{test_task.status_id}", headers=auth_headers)
         assert res.status_code == 409
+
+    def test_other_users_status_returns_404(self, client: TestClient, other_user_status: Status, auth_headers: dict):
+        res = client.delete(f"/statuses/{other_user_status.id}", headers=auth_headers)
+        assert res.status_code == 404
+
+    def test_reassign_tasks_then_delete(
+        self, client: TestClient, test_statuses: list[Status], auth_headers: dict
+    ):
+        s1, s2, _ = test_statuses
+        for title in ("タスクA", "タスクB"):
+            client.post(
+                "/tasks",
+                json={"title": title, "content": "", "due_date": "2025-12-31", "status_id": s1.id},
+                headers=auth_headers,
+            )
+        res = client.delete(f"/statuses/{s1.id}", params={"reassign_to": s2.id}, headers=auth_headers)
+        assert res.status_code == 204
+        tasks = client.get("/tasks", headers=auth_headers).json()["tasks"]
+        assert {t["status_id"] for t in tasks} == {s2.id}
+        assert client.get(f"/statuses/{s1.id}", headers=auth_headers).status_code == 404
+
+    def test_reassign_to_other_users_status_returns_404(
+        self, client: TestClient, test_task: Task, other_user_status: Status, auth_headers: dict
+    ):
+        res = client.delete(
+            f"/statuses/{test_task.status_id}", params={"reassign_to": other_user_status.id}, headers=auth_headers
+        )
+        assert res.status_code == 404
+        # 付け替え・削除のどちらも行われない
+        assert client.get(f"/tasks/{test_task.id}", headers=auth_headers).json()["status_id"] == test_task.status_id
+
+    def test_reassign_to_self_returns_400(self, client: TestClient, test_status: Status, auth_headers: dict):
+        res = client.delete(f"/statuses/{test_status.id}", params={"reassign_to": test_status.id}, headers=auth_headers)
+        assert res.status_code == 400
+
+
+class TestStatusETag:
+    def test_list_not_modified(self, client: TestClient, test_statuses: list[Status], auth_headers: dict):
+        etag = client.get("/statuses", headers=auth_headers).headers["etag"]
+        res = client.get("/statuses", headers={**auth_headers, "If-None-Match": etag})
+        assert res.status_code == 304
+
+    def test_list_etag_changes_on_reorder(self, client: TestClient, test_statuses: list[Status], auth_headers: dict):
+        s1, s2, s3 = test_statuses
+        etag = client.get("/statuses", headers=auth_headers).headers["etag"]
+        client.put("/statuses/reorder", json={"order": [s3.id, s2.id, s1.id]}, headers=auth_headers)
+        res = client.get("/statuses", headers={**auth_headers, "If-None-Match": etag})
+        assert res.status_code == 200
+        assert res.json()["statuses"][0]["name"] == "完了"
@@ -1,7 +1,18 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
 from fastapi.testclient import TestClient
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
 
+from app.cache import task_stats_cache
 from app.models.status import Status
 from app.models.task import Task
+from app.pagination import encode_cursor
+from tests.conftest import TestSessionLocal
+from tests.factories import TaskFactory
 
 NONEXISTENT_ID = 9999
 
@@ -82,6 +93,29 @@ class TestListTasks:
         tasks = client.get("/tasks", params={"q": "存在しない"}, headers=auth_headers).json()["tasks"]
         assert len(tasks) == 0
 
+    def test_search_sort_by_relevance(self, client: TestClient, test_status: Status, auth_headers: dict):
+        for title, content, due_date in [
+            ("議事録", "資料を添付する", "2025-12-01"),
+            ("古い資料の整理", "", "2025-11-01"),
+            ("資料作成", "", "2025-10-01"),
+            ("資料", "", "2025-09-01"),
+        ]:
+            client.post(
+                "/tasks",
+                json={"title": title, "content": content, "due_date": due_date, "status_id": test_status.id},
+                headers=auth_headers,
+            )
+        tasks = client.get("/tasks", params={"q": "資料", "sort": "relevance"}, headers=auth_headers).json()["tasks"]
+        assert [t["title"] for t in tasks] == ["資料", "資料作成", "古い資料の整理", "議事録"]
+
+    def test_relevance_with_cursor_returns_400(self, client: TestClient, auth_headers: dict):
+        res = client.get("/tasks", params={"q": "資料", "sort": "relevance", "limit": 10}, headers=auth_headers)
+        assert res.status_code == 400
+
+    def test_relevance_without_q_returns_422(self, client: TestClient, auth_headers: dict):
+        res = client.get("/tasks", params={"sort": "relevance"}, headers=auth_headers)
+        assert res.status_code == 422
+
     def test_search_without_q_returns_all(self, client: TestClient, test_tasks: list[Task], auth_headers: dict):
         tasks = client.get("/tasks", headers=auth_headers).json()["tasks"]
         assert len(tasks) == 3
@@ -113,6 +147,96 @@ class TestListTasks:
         assert res.status_code == 401
 
 
+class TestListTasksFields:
+    def test_only_selected_fields(self, client: TestClient, test_tasks: list[Task], auth_headers: dict):
+        res = client.get("/tasks", params={"fields": "title,status_id"}, headers=auth_headers)
+        assert res.status_code == 200
+        tasks = res.json()["tasks"]
+        assert len(tasks) == 3
+        assert set(tasks[0]) == {"id", "title", "status_id"}
+        assert tasks[0]["title"] == "タスク3"
+
+    def test_without_fields_returns_all(self, client: TestClient, test_task: Task, auth_headers: dict):
+        tasks = client.get("/tasks", headers=auth_headers).json()["tasks"]
+        assert set(tasks[0]) == {"id", "title", "content", "due_date", "status_id", "created_at", "updated_at"}
+
+    def test_with_cursor(self, client: TestClient, test_tasks: list[Task], auth_headers: dict):
+        params = {"limit": 2, "fields": "title"}
+        first = client.get("/tasks", params=params, headers=auth_headers).json()
+        # カーソル生成用の締切日は出力されない
+        assert [set(t) for t in first["tasks"]] == [{"id", "title"}] * 2
+        rest = client.get(
+            "/tasks", params={**params, "cursor": first["next_cursor"]}, headers=auth_headers
+        ).json()
+        assert rest["tasks"] == [{"id": test_tasks[0].id, "title": "タスク1"}]
+        assert rest["next_cursor"] is None
+
+    def test_etag_depends_on_fields(self, client: TestClient, test_task: Task, auth_headers: dict):
+        full = client.get("/tasks", headers=auth_headers)
+        res = client.get(
+            "/tasks",
+            params={"fields": "title"},
+            headers={**auth_headers, "If-None-Match": full.headers["ETag"]},
+        )
+        assert res.status_code == 200
+
+    def test_unknown_field_returns_400(self, client: TestClient, auth_headers: dict):
+        res = client.get("/tasks", params={"fields": "title,user_id"}, headers=auth_headers)
+        assert res.status_code == 400
+
+
+class TestListTasksPagination:
+    def test_without_limit_has_no_cursor(self, client: TestClient, test_tasks: list[Task], auth_headers: dict):
+        body = client.get("/tasks", headers=auth_headers).json()
+        assert len(body["tasks"]) == 3
+        assert body["next_cursor"] is None
+
+    def test_first_page(self, client: TestClient, test_tasks: list[Task], auth_headers: dict):
+        # test_tasks: タスク1(6/1), タスク2(9/15), タスク3(12/31)
+        body = client.get("/tasks", params={"limit": 2}, headers=auth_headers).json()
+        assert [t["title"] for t in body["tasks"]] == ["タスク3", "タスク2"]
+        assert body["next_cursor"] is not None
+
+    def test_follow_cursor_desc(self, client: TestClient, test_tasks: list[Task], auth_headers: dict):
+        first = client.get("/tasks", params={"limit": 2}, headers=auth_headers).json()
+        body = client.get(
+            "/tasks", params={"limit": 2, "cursor": first["next_cursor"]}, headers=auth_headers
+        ).json()
+        assert [t["title"] for t in body["tasks"]] == ["タスク1"]
+        assert body["next_cursor"] is None
+
+    def test_follow_cursor_asc(self, client: TestClient, test_tasks: list[Task], auth_headers: dict):
+        params = {"limit": 1, "order": "asc"}
+        titles = []
+        while True:
+            body = client.get("/tasks", params=params, headers=auth_headers).json()
+            titles += [t["title"] for t in body["tasks"]]
+            if body["next_cursor"] is None:
+                break
+            params["cursor"] = body["next_cursor"]
+        assert titles == ["タスク1", "タスク2", "タスク3"]
+
+    def test_same_due_date_uses_id_as_tiebreaker(self, client: TestClient, test_task: Task, auth_headers: dict):
+        # test_task と同じ締切日のタスクを追加
+        second = client.post(
+            "/tasks", json={**TASK_JSON, "status_id": test_task.status_id}, headers=auth_headers
+        ).json()
+        first = client.get("/tasks", params={"limit": 1}, headers=auth_headers).json()
+        assert first["tasks"][0]["id"] == second["id"]
+        rest = client.get(
+            "/tasks", params={"limit": 1, "cursor": first["next_cursor"]}, headers=auth_headers
+        ).json()
+        assert rest["tasks"][0]["id"] == test_task.id
+
+    def test_invalid_cursor_returns_400(self, client: TestClient, auth_headers: dict):
+        res = client.get("/tasks", params={"limit": 2, "cursor": "invalid"}, headers=auth_headers)
+        assert res.status_code == 400
+
+    def test_limit_out_of_range_returns_422(self, client: TestClient, auth_headers: dict):
+        res = client.get("/tasks", params={"limit": 0}, headers=auth_headers)
+        assert res.status_code == 422
+
+
 class TestGetTask:
     def test_get(self, client: TestClient, test_task: Task, auth_headers: dict):
         res = client.get(f"/tasks/{test_task.id}", headers=auth_headers)
@@ -183,3 +307,464 @@ class TestDeleteTask:
     def test_not_found(self, client: TestClient, auth_headers: dict):
         res = client.delete(f"/tasks/{NONEXISTENT_ID}", headers=auth_headers)
         assert res.status_code == 404
+
+
+class TestTaskStats:
+    def test_empty(self, client: TestClient, auth_headers: dict):
+        res = client.get("/tasks/stats", headers=auth_headers)
+        assert res.status_code == 200
+        assert res.json() == {"total": 0, "overdue": 0, "by_status": [], "interval": "week", "histogram": []}
+
+    def test_counts(self, client: TestClient, test_statuses: list[Status], auth_headers: dict):
+        todo, doing, _ = test_statuses
+        for status, due_date in [(todo, "2025-06-01"), (todo, "2025-06-10"), (doing, "2025-07-01")]:
+            client.post(
+                "/tasks", json={**TASK_JSON, "due_date": due_date, "status_id": status.id}, headers=auth_headers
+            )
+        body = client.get("/tasks/stats", params={"today": "2025-06-10"}, headers=auth_headers).json()
+        assert body["total"] == 3
+        assert body["overdue"] == 1
+        assert body["by_status"] == [
+            {"status_id": todo.id, "count": 2},
+            {"status_id": doing.id, "count": 1},
+        ]
+
+    def test_histogram_by_interval(self, client: TestClient, test_tasks: list[Task], auth_headers: dict):
+        # test_tasks: タスク1(6/1 日曜), タスク2(9/15 月曜), タスク3(12/31)
+        def histogram(interval: str) -> list:
+            params = {"interval": interval}
+            return client.get("/tasks/stats", params=params, headers=auth_headers).json()["histogram"]
+
+        assert histogram("day") == [
+            {"start": "2025-06-01", "count": 1},
+            {"start": "2025-09-15", "count": 1},
+            {"start": "2025-12-31", "count": 1},
+        ]
+        assert [b["start"] for b in histogram("week")] == ["2025-05-26", "2025-09-15", "2025-12-29"]
+        assert [b["start"] for b in histogram("month")] == ["2025-06-01", "2025-09-01", "2025-12-01"]
+
+    def test_due_date_filter(self, client: TestClient, test_tasks: list[Task], auth_headers: dict):
+        params = {"due_date_from": "2025-09-01", "today": "2026-01-01"}
+        body = client.get("/tasks/stats", params=params, headers=auth_headers).json()
+        assert body["total"] == 2
+        assert body["overdue"] == 2
+
+    def test_cache_invalidated_on_write(self, client: TestClient, test_task: Task, auth_headers: dict):
+        hits = task_stats_cache.hits
+        assert client.get("/tasks/stats", headers=auth_headers).json()["total"] == 1
+        assert client.get("/tasks/stats", headers=auth_headers).json()["total"] == 1
+        assert task_stats_cache.hits == hits + 1
+        client.post("/tasks", json={**TASK_JSON, "status_id": test_task.status_id}, headers=auth_headers)
+        assert client.get("/tasks/stats", headers=auth_headers).json()["total"] == 2
+        client.delete(f"/tasks/{test_task.id}", headers=auth_headers)
+        assert client.get("/tasks/stats", headers=auth_headers).json()["total"] == 1
+
+    def test_invalid_interval_returns_422(self, client: TestClient, auth_headers: dict):
+        res = client.get("/tasks/stats", params={"interval": "year"}, headers=auth_headers)
+        assert res.status_code == 422
+
+    def test_unauthenticated_returns_401(self, client: TestClient):
+        res = client.get("/tasks/stats")
+        assert res.status_code == 401
+
+
+class TestExportTasks:
+    def test_csv(self, client: TestClient, test_tasks: list[Task], test_status: Status, auth_headers: dict):
+        res = client.get("/tasks/export", headers=auth_headers)
+        assert res.status_code == 200
+        assert res.headers["content-type"].startswith("text/csv")
+        assert res.headers["content-disposition"] == 'attachment; filename="tasks.csv"'
+        rows = list(csv.DictReader(io.StringIO(res.content.decode("utf-8-sig"))))
+        assert [row["title"] for row in rows] == ["タスク1", "タスク2", "タスク3"]
+        assert rows[0]["due_date"] == "2025-06-01"
+        assert rows[0]["status"] == test_status.name
+        assert rows[0]["status_id"] == str(test_status.id)
+
+    def test_csv_without_tasks_has_header(self, client: TestClient, auth_headers: dict):
+        res = client.get("/tasks/export", headers=auth_headers)
+        assert res.content.decode("utf-8-sig").splitlines() == [
+            "id,title,content,due_date,status_id,status,created_at,updated_at"
+        ]
+
+    def test_csv_quotes_special_characters(self, client: TestClient, test_status: Status, auth_headers: dict):
+        content = '改行を含む\n"引用符",カンマ'
+        client.post(
+            "/tasks", json={**TASK_JSON, "content": content, "status_id": test_status.id}, headers=auth_headers
+        )
+        res = client.get("/tasks/export", headers=auth_headers)
+        rows = list(csv.DictReader(io.StringIO(res.content.decode("utf-8-sig"))))
+        assert rows[0]["content"] == content
+
+    def test_csv_escapes_formulas(self, client: TestClient, test_status: Status, auth_headers: dict):
+        client.post(
+            "/tasks",
+            json={**TASK_JSON, "title": "=1+2", "content": "@SUM(A1)", "status_id": test_status.id},
+            headers=auth_headers,
+        )
+        res = client.get("/tasks/export", headers=auth_headers)
+        rows = list(csv.DictReader(io.StringIO(res.content.decode("utf-8-sig"))))
+        assert rows[0]["title"] == "'=1+2"
+        assert rows[0]["content"] == "'@SUM(A1)"
+
+    def test_ndjson(self, client: TestClient, test_tasks: list[Task], auth_headers: dict):
+        res = client.get("/tasks/export", params={"format": "ndjson"}, headers=auth_headers)
+        assert res.status_code == 200
+        assert res.headers["content-type"] == "application/x-ndjson"
+        tasks = [json.loads(line) for line in res.text.splitlines()]
+        assert [t["title"] for t in tasks] == ["タスク1", "タスク2", "タスク3"]
+        assert tasks[0]["id"] == test_tasks[0].id
+        assert "status" in tasks[0]
+
+    def test_filters(self, client: TestClient, test_tasks: list[Task], auth_headers: dict):
+        res = client.get(
+            "/tasks/export",
+            params={"format": "ndjson", "q": "タスク", "due_date_from": "2025-09-01", "due_date_to": "2025-10-01"},
+            headers=auth_headers,
+        )
+        assert [json.loads(line)["title"] for line in res.text.splitlines()] == ["タスク2"]
+
+    def test_other_users_tasks_excluded(
+        self, client: TestClient, test_task: Task, other_user_status: Status, auth_headers: dict
+    ):
+        TaskFactory(title="他ユーザーのタスク", user_id=other_user_status.user_id, status_id=other_user_status.id)
+        res = client.get("/tasks/export", params={"format": "ndjson"}, headers=auth_headers)
+        assert [json.loads(line)["id"] for line in res.text.splitlines()] == [test_task.id]
+
+    def test_invalid_format_returns_422(self, client: TestClient, auth_headers: dict):
+        res = client.get("/tasks/export", params={"format": "xml"}, headers=auth_headers)
+        assert res.status_code == 422
+
+    def test_unauthenticated_returns_401(self, client: TestClient):
+        res = client.get("/tasks/export")
+        assert res.status_code == 401
+
+
+def upload(content: str, filename: str = "tasks.csv") -> dict:
+    return {"file": (filename, content.encode(), "text/csv")}
+
+
+class TestImportTasks:
+    def test_csv_with_status_name(self, client: TestClient, test_status: Status, auth_headers: dict):
+        content = f"title,content,due_date,status\nタスクA,内容A,2025-01-01,{test_status.name}\nタスクB,,2025-02-01,{test_status.name}\n"
+        res = client.post("/tasks/import", files=upload(content), headers=auth_headers)
+        assert res.status_code == 200
+        assert res.json() == {"imported": 2, "error_count": 0, "errors": []}
+        tasks = client.get("/tasks", params={"order": "asc"}, headers=auth_headers).json()["tasks"]
+        assert [(t["title"], t["content"], t["status_id"]) for t in tasks] == [
+            ("タスクA", "内容A", test_status.id),
+            ("タスクB", "", test_status.id),
+        ]
+
+    def test_ndjson_with_status_id(self, client: TestClient, test_status: Status, auth_headers: dict):
+        lines = [
+            json.dumps({"title": "タスクA", "due_date": "2025-01-01", "status_id": test_status.id}),
+            "",
+            json.dumps({"title": "タスクB", "due_date": "2025-02-01", "status_id": test_status.id}),
+        ]
+        res = client.post(
+            "/tasks/import",
+            params={"format": "ndjson"},
+            files=upload("\n".join(lines), "tasks.ndjson"),
+            headers=auth_headers,
+        )
+        assert res.status_code == 200
+        assert res.json()["imported"] == 2
+
+    def test_round_trip_export(self, client: TestClient, test_tasks: list[Task], auth_headers: dict):
+        exported = client.get("/tasks/export", headers=auth_headers).content
+        res = client.post(
+            "/tasks/import", files={"file": ("tasks.csv", exported, "text/csv")}, headers=auth_headers
+        )
+        assert res.json()["imported"] == 3
+        tasks = client.get("/tasks", headers=auth_headers).json()["tasks"]
+        assert sorted(t["title"] for t in tasks) == ["タスク1", "タスク1", "タスク2", "タスク2", "タスク3", "タスク3"]
+
+    def test_round_trip_formula_values(self, client: TestClient, test_status: Status, auth_headers: dict):
+        titles = ["=1+1", "'=1+1", "-メモ", "'引用"]
+        for title in titles:
+            client.post("/tasks", json={**TASK_JSON, "title": title, "status_id": test_status.id}, headers=auth_headers)
+        exported = client.get("/tasks/export", headers=auth_headers).content
+        client.post("/tasks/import", files={"file": ("tasks.csv", exported, "text/csv")}, headers=auth_headers)
+        tasks = client.get("/tasks", headers=auth_headers).json()["tasks"]
+        assert sorted(t["title"] for t in tasks) == sorted(titles * 2)
+
+    def test_invalid_rows_import_nothing(self, client: TestClient, test_status: Status, auth_headers: dict):
+        content = (
+            "title,due_date,status_id\n"
+            f"タスクA,2025-01-01,{test_status.id}\n"
+            f",2025-01-01,{test_status.id}\n"
+            f"タスクC,not-a-date,{test_status.id}\n"
+            f"タスクD,2025-01-01,{NONEXISTENT_ID}\n"
+        )
+        res = client.post("/tasks/import", files=upload(content), headers=auth_headers)
+        assert res.status_code == 422
+        body = res.json()
+        assert body["imported"] == 0
+        assert body["error_count"] == 3
+        assert [e["row"] for e in body["errors"]] == [3, 4, 5]
+        assert client.get("/tasks", headers=auth_headers).json()["tasks"] == []
+
+    def test_error_after_inserted_batch_imports_nothing(
+        self, monkeypatch, client: TestClient, test_status: Status, auth_headers: dict
+    ):
+        monkeypatch.setattr("app.crud.task.IMPORT_BATCH_SIZE", 2)
+        rows = "".join(f"タスク{i},2025-01-01,{test_status.id}\n" for i in range(3))
+        content = f"title,due_date,status_id\n{rows},2025-01-01,{test_status.id}\n"
+        res = client.post("/tasks/import", files=upload(content), headers=auth_headers)
+        assert res.status_code == 422
+        assert res.json()["imported"] == 0
+        # エラー行より前に登録したバッチも取り消される
+        assert client.get("/tasks", headers=auth_headers).json()["tasks"] == []
+        res = client.post(
+            "/tasks/import", params={"skip_invalid": True}, files=upload(content), headers=auth_headers
+        )
+        assert res.json()["imported"] == 3
+
+    def test_error_row_after_multiline_value(self, client: TestClient, test_status: Status, auth_headers: dict):
+        content = (
+            "title,content,due_date,status_id\n"
+            f'タスクA,"1行目\n2行目\n3行目",2025-01-01,{test_status.id}\n'
+            f"タスクB,,not-a-date,{test_status.id}\n"
+        )
+        res = client.post("/tasks/import", files=upload(content), headers=auth_headers)
+        assert [e["row"] for e in res.json()["errors"]] == [5]
+
+    def test_skip_invalid(self, client: TestClient, test_status: Status, auth_headers: dict):
+        content = f"title,due_date,status_id\n,2025-01-01,{test_status.id}\nタスクB,2025-01-01,{test_status.id}\n"
+        res = client.post(
+            "/tasks/import", params={"skip_invalid": True}, files=upload(content), headers=auth_headers
+        )
+        assert res.status_code == 200
+        assert res.json()["imported"] == 1
+        assert res.json()["error_count"] == 1
+
+    def test_other_users_status_rejected(
+        self, client: TestClient, test_status: Status, other_user_status: Status, auth_headers: dict
+    ):
+        content = f"title,due_date,status_id\nタスクA,2025-01-01,{other_user_status.id}\n"
+        res = client.post("/tasks/import", files=upload(content), headers=auth_headers)
+        assert res.status_code == 422
+        assert res.json()["errors"][0]["errors"] == ["ステータスが見つかりません"]
+
+    def test_ndjson_invalid_line(self, client: TestClient, test_status: Status, auth_headers: dict):
+        res = client.post(
+            "/tasks/import",
+            params={"format": "ndjson"},
+            files=upload("not json\n[1, 2]\n", "tasks.ndjson"),
+            headers=auth_headers,
+        )
+        assert res.status_code == 422
+        assert [e["row"] for e in res.json()["errors"]] == [1, 2]
+
+    def test_non_utf8_returns_400(self, client: TestClient, test_status: Status, auth_headers: dict):
+        content = "title,due_date,status\nタスクA,2025-01-01,未着手\n".encode("shift_jis")
+        res = client.post(
+            "/tasks/import", files={"file": ("tasks.csv", content, "text/csv")}, headers=auth_headers
+        )
+        assert res.status_code == 400
+
+    def test_unauthenticated_returns_401(self, client: TestClient):
+        res = client.post("/tasks/import", files=upload("title\n"))
+        assert res.status_code == 401
+
+
+class TestBulkTasks:
+    def test_create(self, client: TestClient, test_status: Status, auth_headers: dict):
+        res = client.post("/tasks/bulk", json={
+            "create": [
+                {**TASK_JSON, "title": "一括1", "status_id": test_status.id},
+                {**TASK_JSON, "title": "一括2", "status_id": test_status.id},
+            ],
+        }, headers=auth_headers)
+        assert res.status_code == 200
+        body = res.json()
+        assert [t["title"] for t in body["created"]] == ["一括1", "一括2"]
+        assert all("id" in t and "created_at" in t for t in body["created"])
+        assert len(client.get("/tasks", headers=auth_headers).json()["tasks"]) == 2
+
+    def test_update(self, client: TestClient, test_tasks: list[Task], auth_headers: dict):
+        updates = [
+            {**TASK_JSON, "id": task.id, "title": f"更新{i}", "status_id": task.status_id}
+            for i, task in enumerate(reversed(test_tasks))
+        ]
+        res = client.post("/tasks/bulk", json={"update": updates}, headers=auth_headers)
+        assert res.status_code == 200
+        body = res.json()
+        assert [t["id"] for t in body["updated"]] == [u["id"] for u in updates]
+        assert [t["title"] for t in body["updated"]] == ["更新0", "更新1", "更新2"]
+        assert body["updated"][0]["due_date"] == TASK_JSON["due_date"]
+
+    def test_move(self, client: TestClient, test_tasks: list[Task], test_statuses: list[Status], auth_headers: dict):
+        done = test_statuses[2]
+        res = client.post("/tasks/bulk", json={
+            "move": [{"task_ids": [t.id for t in test_tasks], "status_id": done.id}],
+        }, headers=auth_headers)
+        assert res.status_code == 200
+        assert {t["status_id"] for t in res.json()["moved"]} == {done.id}
+        tasks = client.get("/tasks", headers=auth_headers).json()["tasks"]
+        assert {t["status_id"] for t in tasks} == {done.id}
+
+    def test_delete(self, client: TestClient, test_tasks: list[Task], auth_headers: dict):
+        ids = [test_tasks[0].id, test_tasks[1].id]
+        res = client.post("/tasks/bulk", json={"delete": ids}, headers=auth_headers)
+        assert res.status_code == 200
+        assert sorted(res.json()["deleted"]) == sorted(ids)
+        tasks = client.get("/tasks", headers=auth_headers).json()["tasks"]
+        assert [t["id"] for t in tasks] == [test_tasks[2].id]
+
+    def test_invalid_status_rolls_back(self, client: TestClient, test_status: Status, other_user_status: Status, auth_headers: dict):
+        res = client.post("/tasks/bulk", json={
+            "create": [
+                {**TASK_JSON, "status_id": test_status.id},
+                {**TASK_JSON, "status_id": other_user_status.id},
+            ],
+        }, headers=auth_headers)
+        assert res.status_code == 404
+        assert client.get("/tasks", headers=auth_headers).json()["tasks"] == []
+
+    def test_missing_task_rolls_back(self, client: TestClient, test_tasks: list[Task], auth_headers: dict):
+        res = client.post("/tasks/bulk", json={
+            "create": [{**TASK_JSON, "status_id": test_tasks[0].status_id}],
+            "delete": [test_tasks[0].id, NONEXISTENT_ID],
+        }, headers=auth_headers)
+        assert res.status_code == 404
+        tasks = client.get("/tasks", headers=auth_headers).json()["tasks"]
+        assert len(tasks) == 3
+
+    def test_duplicate_task_ids_returns_422(self, client: TestClient, test_task: Task, auth_headers: dict):
+        res = client.post("/tasks/bulk", json={
+            "move": [{"task_ids": [test_task.id], "status_id": test_task.status_id}],
+            "delete": [test_task.id],
+        }, headers=auth_headers)
+        assert res.status_code == 422
+
+    def test_unauthenticated_returns_401(self, client: TestClient):
+        res = client.post("/tasks/bulk", json={})
+        assert res.status_code == 401
+
+
+class TestTaskETag:
+    def test_list_not_modified(self, client: TestClient, test_tasks: list[Task], auth_headers: dict):
+        res = client.get("/tasks", headers=auth_headers)
+        etag = res.headers["etag"]
+        res = client.get("/tasks", headers={**auth_headers, "If-None-Match": etag})
+        assert res.status_code == 304
+        assert res.content == b""
+        assert res.headers["etag"] == etag
+
+    def test_list_etag_changes_on_write(self, client: TestClient, test_tasks: list[Task], auth_headers: dict):
+        etag = client.get("/tasks", headers=auth_headers).headers["etag"]
+        client.delete(f"/tasks/{test_tasks[0].id}", headers=auth_headers)
+        res = client.get("/tasks", headers={**auth_headers, "If-None-Match": etag})
+        assert res.status_code == 200
+        assert res.headers["etag"] != etag
+        assert len(res.json()["tasks"]) == 2
+
+    def test_list_etag_changes_on_late_commit(
+        self, client: TestClient, test_tasks: list[Task], auth_headers: dict
+    ):
+        # 先に開始したトランザクション（updated_at は開始時刻）が、他の書き込みより後にコミットされる場合
+        slow = TestSessionLocal()
+        try:
+            slow.execute(select(func.now()))
+            client.put(
+                f"/tasks/{test_tasks[0].id}",
+                json={**TASK_JSON, "status_id": test_tasks[0].status_id},
+                headers=auth_headers,
+            )
+            etag = client.get("/tasks", headers=auth_headers).headers["etag"]
+            slow.execute(update(Task).where(Task.id == test_tasks[1].id).values(title="遅いコミット"))
+            slow.commit()
+        finally:
+            slow.close()
+        res = client.get("/tasks", headers={**auth_headers, "If-None-Match": etag})
+        assert res.status_code == 200
+        assert "遅いコミット" in [task["title"] for task in res.json()["tasks"]]
+
+    def test_list_etag_depends_on_params(self, client: TestClient, test_tasks: list[Task], auth_headers: dict):
+        etag = client.get("/tasks", headers=auth_headers).headers["etag"]
+        res = client.get("/tasks", params={"order": "asc"}, headers={**auth_headers, "If-None-Match": etag})
+        assert res.status_code == 200
+
+    def test_get_not_modified(self, client: TestClient, test_task: Task, auth_headers: dict):
+        etag = client.get(f"/tasks/{test_task.id}", headers=auth_headers).headers["etag"]
+        res = client.get(f"/tasks/{test_task.id}", headers={**auth_headers, "If-None-Match": etag})
+        assert res.status_code == 304
+
+    def test_update_with_matching_if_match(self, client: TestClient, test_task: Task, auth_headers: dict):
+        etag = client.get(f"/tasks/{test_task.id}", headers=auth_headers).headers["etag"]
+        res = client.put(
+            f"/tasks/{test_task.id}",
+            json={**TASK_JSON, "title": "更新タイトル", "status_id": test_task.status_id},
+            headers={**auth_headers, "If-Match": etag},
+        )
+        assert res.status_code == 200
+        assert res.headers["etag"] != etag
+
+    def test_update_with_stale_if_match_returns_412(self, client: TestClient, test_task: Task, auth_headers: dict):
+        etag = client.get(f"/tasks/{test_task.id}", headers=auth_headers).headers["etag"]
+        client.put(
+            f"/tasks/{test_task.id}",
+            json={**TASK_JSON, "title": "別の更新", "status_id": test_task.status_id},
+            headers=auth_headers,
+        )
+        res = client.put(
+            f"/tasks/{test_task.id}",
+            json={**TASK_JSON, "title": "上書き", "status_id": test_task.status_id},
+            headers={**auth_headers, "If-Match": etag},
+        )
+        assert res.status_code == 412
+        assert client.get(f"/tasks/{test_task.id}", headers=auth_headers).json()["title"] == "別の更新"
+
+
+class TestTaskChanges:
+    @staticmethod
+    def backdate(db: Session, tasks: list[Task]) -> None:
+        """同期トークンの重複取得期間に入らないよう、既存タスクの更新日時を過去にずらす"""
+        db.execute(
+            update(Task)
+            .where(Task.id.in_([t.id for t in tasks]))
+            .values(updated_at=datetime.now(timezone.utc) - timedelta(hours=1))
+        )
+        db.commit()
+
+    def test_without_since_returns_all(self, client: TestClient, test_tasks: list[Task], auth_headers: dict):
+        body = client.get("/tasks/changes", headers=auth_headers).json()
+        assert len(body["tasks"]) == 3
+        assert body["deleted"] == []
+        assert body["next_token"]
+
+    def test_returns_only_changes(self, client: TestClient, db: Session, test_tasks: list[Task], auth_headers: dict):
+        self.backdate(db, test_tasks)
+        token = client.get("/tasks/changes", headers=auth_headers).json()["next_token"]
+
+        client.put(
+            f"/tasks/{test_tasks[0].id}",
+            json={**TASK_JSON, "title": "更新", "status_id": test_tasks[0].status_id},
+            headers=auth_headers,
+        )
+        client.delete(f"/tasks/{test_tasks[1].id}", headers=auth_headers)
+        created = client.post(
+            "/tasks", json={**TASK_JSON, "status_id": test_tasks[0].status_id}, headers=auth_headers
+        ).json()
+
+        body = client.get("/tasks/changes", params={"since": token}, headers=auth_headers).json()
+        assert {t["id"] for t in body["tasks"]} == {test_tasks[0].id, created["id"]}
+        assert body["deleted"] == [test_tasks[1].id]
+
+    def test_bulk_delete_recorded(self, client: TestClient, db: Session, test_tasks: list[Task], auth_headers: dict):
+        self.backdate(db, test_tasks)
+        token = client.get("/tasks/changes", headers=auth_headers).json()["next_token"]
+        client.post("/tasks/bulk", json={"delete": [t.id for t in test_tasks]}, headers=auth_headers)
+        body = client.get("/tasks/changes", params={"since": token}, headers=auth_headers).json()
+        assert body["tasks"] == []
+        assert sorted(body["deleted"]) == sorted(t.id for t in test_tasks)
+
+    def test_invalid_token_returns_400(self, client: TestClient, auth_headers: dict):
+        res = client.get("/tasks/changes", params={"since": "invalid"}, headers=auth_headers)
+        assert res.status_code == 400
+
+    def test_expired_token_returns_410(self, client: TestClient, auth_headers: dict):
+        token = encode_cursor([datetime(2000, 1, 1, tzinfo=timezone.utc).isoformat()])
+        res = client.get("/tasks/changes", params={"since": token}, headers=auth_headers)
+        assert res.status_code == 410